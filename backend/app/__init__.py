@@ -96,6 +96,11 @@ def createapp():
         app.register_blueprint(core, url_prefix="/")
         app.register_blueprint(auth, url_prefix="/auth")
 
+    # flask CLI commands (ex. `flask catalog compile`, `flask model train`)
+    from app.commands import catalog_cli, model_cli
+    app.cli.add_command(catalog_cli)
+    app.cli.add_command(model_cli)
+
     from app.models import (
         User, UserPreferences, UserProgram, 
         Courses, UserTermPlanning, RefreshTokens
@@ -2,13 +2,23 @@ import os
 import json
 import subprocess
 from dotenv import load_dotenv
-from scripts import model
+from scripts import predictor
 from scripts import prereqs
+from scripts import filters
+from scripts import search
+from scripts import eligibility
+from scripts import unlocks
+from scripts import planner
+from scripts import plan_optimizer
+from scripts import conflicts
+from scripts import schedules
+from scripts import ranking
+from scripts.catalog import catalog_registry, get_catalog
 from app import db, login_manager
 from app.models import * 
 from app.utils import tokens
 from datetime import datetime
-from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify
+from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify, Response, stream_with_context
 from werkzeug.security import check_password_hash, generate_password_hash  
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from flask_jwt_extended import (
@@ -21,11 +31,13 @@ from flask_jwt_extended import (
 )
 import logging #will give us better errors printed in the console
 
-# load in course data 
+# load in env paths; course data itself is served by scripts.catalog
 load_dotenv()
-COURSE_DATA = os.environ.get("DATA_FILE")
 RMP_PATH = os.environ.get("RMP_PATH")
 
+# most seconds a /degree-plan request may let the exact planner run
+MAX_PLAN_TIME_LIMIT = 10.0
+
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -34,10 +46,6 @@ logger = logging.getLogger(__name__)
 # create blueprint
 auth = Blueprint("auth", __name__)
 
-#open open the course data file and load it into a variable
-with open(COURSE_DATA) as f:
-    course_data = json.load(f)
-    
 @login_manager.user_loader
 def load_user(pid):
     return User.query.get(int(pid)) #Converts the pid (primary_key) to an integer and fetches the user from the database
@@ -346,6 +354,18 @@ def get_professor_rating():
         return jsonify({"error": str(e)}), 500
 
 
+def add_probability_scores(course_info: list[dict], gpa: float):
+    """
+    ### sets "probability_score" (0-100, None if the model doesn't know the CRN) on every
+    section dict with one batched prediction; returns the first section's score
+    (what the single probability_score the frontend shows used to be)
+    """
+    probabilities = predictor.predict_success_probabilities(gpa, [section["crn"] for section in course_info])
+    for section, probability in zip(course_info, probabilities):
+        section["probability_score"] = int(probability * 100) if probability is not None else None
+    return course_info[0]["probability_score"] if course_info else None
+
+
 # basic endpoint no authentication quite yet   
 @auth.route("/course-retriever", methods=["GET", "POST"])
 def course_retriever():
@@ -354,7 +374,7 @@ def course_retriever():
     endpoint will receive data when user types in the searchbar a 
     course with its course subject code and number; it returns ALL
     instances of course if found and the probability of success
-    for course by feeding the model the course CRN and student's gpa. Returns and displays error
+    for every section by feeding the model the CRNs and student's gpa. Returns and displays error
     if not found.
     """
     # get data from user search
@@ -362,25 +382,31 @@ def course_retriever():
 
     gpa = data.get("gpa")
     course = data.get("course")
+    term_id = data.get("term_id")  # optional; defaults to the current term's catalog
+
+    # one snapshot for the whole request; a catalog reload mid-request won't mix versions
+    try:
+        catalog = get_catalog(term_id)
+    except LookupError as e:
+        return jsonify({"msg": "No course catalog for this term.", "error": str(e)}), 404
 
     try:
         # get one course's entire CRN for the quarter 
-        course_crns = prereqs.get_course_crn(course_name=course, find_all=True) 
-        course_info = prereqs.get_crns_info(course_crns)
+        course_crns = prereqs.get_course_crn(course_name=course, find_all=True, catalog=catalog) 
+        course_info = prereqs.get_crns_info(course_crns, catalog=catalog)
         
-        # get model to calculate probability 
+        # get model to calculate probability; every section scored in one batch
         try:
             gpa = float(gpa)
-            course_crn = str(course_crns[0])
-            probability = model.predict_success_probability(gpa, course_crn)
+            probability = add_probability_scores(course_info, gpa)
             # return list of dicts back to frontend
             return jsonify({
                 "course_data": course_info,
-                "probability_score": int(probability * 100)
+                "probability_score": probability
             }), 200
 
         # error if type or crn is not found
-        except ValueError as e:
+        except (TypeError, ValueError) as e:
             return jsonify({
                 "msg": "enter valid crn or gpa types",
                 "error": str(e),
@@ -395,11 +421,329 @@ def course_retriever():
 
 
 
+@auth.route("/course-search", methods=["GET", "POST"])
+def course_search():
+    """
+    ### Endpoint behind the search bar's autocomplete; called on every keystroke
+    matches course code prefixes ("cs 17" -> CS171, CS172..) and course titles
+    with typo tolerance, returning the top-k courses best first
+
+    #### query args or json:
+    - q: what the user has typed so far
+    - k: how many results to return (default 10, max 50)
+    - term_id: which term's catalog to search (defaults to the current term)
+    """
+    data = request.get_json(silent=True) or {}
+    query = request.args.get("q", data.get("q", ""))
+    term_id = request.args.get("term_id", data.get("term_id"))
+
+    if not isinstance(query, str):
+        return jsonify({"msg": "q must be a string"}), 400
+
+    try:
+        k = min(int(request.args.get("k", data.get("k", 10))), 50)
+        if k <= 0:
+            raise ValueError("k must be positive")
+    except (TypeError, ValueError) as e:
+        return jsonify({"msg": "k must be a positive number", "error": str(e)}), 400
+
+    if not query.strip():
+        return jsonify({"results": []}), 200
+
+    try:
+        index = get_catalog(term_id).derived("search_index")
+    except LookupError as e:
+        return jsonify({"msg": "No course catalog for this term.", "error": str(e)}), 404
+
+    return jsonify({"results": index.search(query, k=k)}), 200
+
+
+@auth.route("/eligible-courses", methods=["POST"])
+def eligible_courses():
+    """
+    ### Endpoint that returns every course a student can take next
+    one pass over the whole catalog instead of checking courses one at a time
+
+    #### json:
+    - completed_courses: course codes the student has passed ex. ["CS171", "CS172"]
+    - term_id: which term's catalog to check against (defaults to the current term)
+    - include_completed: also list courses already completed (default false)
+    """
+    data = request.get_json(silent=True) or {}
+    completed_courses = data.get("completed_courses", [])
+
+    if not isinstance(completed_courses, list) or not all(isinstance(course, str) for course in completed_courses):
+        return jsonify({"msg": "completed_courses must be a list of course codes"}), 400
+
+    try:
+        result = eligibility.eligible_courses(
+            completed_courses,
+            term=data.get("term_id"),
+            include_completed=bool(data.get("include_completed", False)),
+        )
+    except LookupError as e:
+        return jsonify({"msg": "No course catalog for this term.", "error": str(e)}), 404
+
+    return jsonify({**result, "count": len(result["eligible"])}), 200
+
+
+@auth.route("/course-unlocks", methods=["GET", "POST"])
+def course_unlocks():
+    """
+    ### Endpoint that returns what taking a course unlocks
+    answers come from a reverse-prereq index built once per catalog snapshot
+
+    #### json (or query string for GET):
+    - course: course code ex. "CS171"
+    - mode: "direct" (courses whose prereqs mention it, default) or "transitive" (everything downstream)
+    - completed_courses: optional list of passed course codes; adds newly_eligible, the offered
+      courses taking this one would make eligible right now
+    - term_id: which term's catalog to check against (defaults to the current term)
+    """
+    data = request.get_json(silent=True) or request.args.to_dict()
+    course = data.get("course")
+    mode = data.get("mode", unlocks.DIRECT)
+    completed_courses = data.get("completed_courses")
+
+    if not isinstance(course, str) or not course.strip():
+        return jsonify({"msg": "course is required"}), 400
+    if mode not in unlocks.MODES:
+        return jsonify({"msg": f"mode must be one of {', '.join(unlocks.MODES)}"}), 400
+    if completed_courses is not None and (
+        not isinstance(completed_courses, list) or not all(isinstance(code, str) for code in completed_courses)
+    ):
+        return jsonify({"msg": "completed_courses must be a list of course codes"}), 400
+
+    try:
+        catalog = get_catalog(data.get("term_id"))
+    except LookupError as e:
+        return jsonify({"msg": "No course catalog for this term.", "error": str(e)}), 404
+
+    try:
+        result = unlocks.course_unlocks(course, mode=mode, completed_courses=completed_courses, catalog=catalog)
+    except LookupError as e:
+        return jsonify({"msg": "Course not found in the catalog.", "error": str(e)}), 404
+
+    return jsonify({**result, "count": len(result["unlocks"])}), 200
+
+
+@auth.route("/degree-plan", methods=["POST"])
+@jwt_required()
+def degree_plan():
+    """
+    ### Endpoint that plans the student's remaining courses term by term
+    uses their program's calendar (quarters/semesters), co-op cycle and dates;
+    co-op terms get no courses
+
+    #### json:
+    - target_courses: course codes the student wants to have taken ex. ["CS277", "SE310"]
+    - completed_courses: course codes the student has passed
+    - credit_cap: most credits per term (default: the pace the program's credits_min needs)
+    - start_date: first term to plan from, "YYYY-MM-DD" (default today)
+    - optimize: solve exactly with the MILP solver instead of greedily (default false)
+    - time_limit: seconds the exact solver gets before falling back to the greedy plan
+    - term_id: which term's catalog to plan against (defaults to the current term)
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+
+    program = UserProgram.query.filter_by(student_pid=current_user_id).order_by(UserProgram.id.desc()).first()
+    if program is None:
+        return jsonify({"msg": "No program details saved for this student yet."}), 404
+
+    target_courses = data.get("target_courses", [])
+    completed_courses = data.get("completed_courses", [])
+    for name, codes in (("target_courses", target_courses), ("completed_courses", completed_courses)):
+        if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+            return jsonify({"msg": f"{name} must be a list of course codes"}), 400
+
+    try:
+        credit_cap = float(data["credit_cap"]) if data.get("credit_cap") is not None else planner.program_credit_cap(program)
+        start = datetime.strptime(data["start_date"], "%Y-%m-%d").date() if data.get("start_date") else datetime.now().date()
+        time_limit = min(float(data.get("time_limit", plan_optimizer.TIME_LIMIT)), MAX_PLAN_TIME_LIMIT)
+        if credit_cap <= 0 or time_limit <= 0:
+            raise ValueError("credit_cap and time_limit must be positive")
+    except (TypeError, ValueError) as e:
+        return jsonify({"msg": "Invalid credit_cap, time_limit or start_date (use YYYY-MM-DD)", "error": str(e)}), 400
+
+    try:
+        result = planner.plan_for_program(
+            program, target_courses, completed_courses, credit_cap,
+            start=start,
+            optimize=bool(data.get("optimize", False)),
+            time_limit=time_limit,
+            term=data.get("term_id"),
+        )
+    except LookupError as e:
+        return jsonify({"msg": "No course catalog for this term.", "error": str(e)}), 404
+
+    return jsonify(result), 200
+
+
+@auth.route("/validate-schedule", methods=["POST"])
+def validate_schedule():
+    """
+    ### Endpoint that checks a proposed schedule for time conflicts
+    every section is a precomputed weekly bitmask, so each pair is one AND
+
+    #### json:
+    - crns: the schedule's CRNs ex. [31522, 30222]
+    - schedule: or the same section dicts schedule-saver takes (needs "crn")
+    - term_id: which term's catalog the CRNs are from (defaults to the current term)
+
+    ### returns:
+    - valid, conflicts: [{"crns": [a, b], "overlap": [{"day", "start", "end"}]}], unknown CRNs
+    """
+    data = request.get_json(silent=True) or {}
+    entries = data.get("crns", data.get("schedule"))
+
+    if not isinstance(entries, list) or not all(isinstance(entry, (int, dict)) for entry in entries):
+        return jsonify({"msg": "crns must be a list of CRNs (or schedule a list of sections)"}), 400
+
+    try:
+        result = conflicts.find_conflicts(entries, term=data.get("term_id"))
+    except LookupError as e:
+        return jsonify({"msg": "No course catalog for this term.", "error": str(e)}), 404
+
+    return jsonify(result), 200
+
+
+@auth.route("/generate-schedules", methods=["POST"])
+def generate_schedules():
+    """
+    ### Endpoint that lists conflict-free schedules for a bundle of courses
+    one section of every component (Lecture, Lab, ...) of every course, found
+    by backtracking over the sections' occupancy bitmasks
+
+    #### json:
+    - courses: course codes ex. ["CS171", "CS172", "MATH121"]
+    - limit: most schedules to return (default 50, at most 500)
+    - stream: true to get newline-delimited json, one schedule per line, as they're found
+    - term_id: which term's catalog to use (defaults to the current term)
+
+    ### returns:
+    - schedules, count, missing course codes, truncated (there were more than limit schedules),
+    complete (false when the search's node limit stopped it, so schedules may be missing)
+    - streamed: one schedule (a list) per line, then a last line {"truncated", "complete", "missing"}
+    """
+    data = request.get_json(silent=True) or {}
+    courses = data.get("courses")
+
+    if not isinstance(courses, list) or not courses or not all(isinstance(code, str) for code in courses):
+        return jsonify({"msg": "courses must be a non-empty list of course codes"}), 400
+
+    try:
+        limit = int(data.get("limit", schedules.DEFAULT_SCHEDULES))
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+    except (TypeError, ValueError) as e:
+        return jsonify({"msg": "Invalid limit", "error": str(e)}), 400
+
+    try:
+        problem, found, stats = schedules.find_schedules(courses, limit=limit, term=data.get("term_id"))
+    except LookupError as e:
+        return jsonify({"msg": "No course catalog for this term.", "error": str(e)}), 404
+
+    if data.get("stream"):
+        def lines():
+            for schedule in found:
+                yield json.dumps(schedule) + "\n"
+            # stats are only final once the search is exhausted, so they trail the schedules
+            yield json.dumps({"truncated": stats["truncated"], "complete": stats["complete"], "missing": problem.missing}) + "\n"
+        return Response(stream_with_context(lines()), mimetype="application/x-ndjson")
+
+    found = list(found)
+    return jsonify({
+        "schedules": found,
+        "count": len(found),
+        "missing": problem.missing,
+        "truncated": stats["truncated"],
+        "complete": stats["complete"],
+    }), 200
+
+
+@auth.route("/rank-schedules", methods=["POST"])
+@jwt_required(optional=True)
+def rank_schedules():
+    """
+    ### Endpoint that returns the best conflict-free schedules for a bundle of courses
+    scored on preferred time of day, class size, instruction method, the model's
+    success probability, days on campus and gaps between classes; a signed-in
+    student's saved user_timing is used when class_time isn't given
+
+    #### json:
+    - courses: course codes ex. ["CS171", "CS172", "MATH121"]
+    - k: how many schedules to return (default 50, at most 500)
+    - class_time / class_size / instruction_type: same values get-interests takes
+    - gpa: scores sections by the model's success probability for this gpa
+    - weights: point overrides ex. {"day": 300, "gap": 0} (see scripts/ranking.py)
+    - parallel: true to split the search across the worker's search processes (big bundles)
+    - term_id: which term's catalog to use (defaults to the current term)
+    """
+    data = request.get_json(silent=True) or {}
+    courses = data.get("courses")
+
+    if not isinstance(courses, list) or not courses or not all(isinstance(code, str) for code in courses):
+        return jsonify({"msg": "courses must be a non-empty list of course codes"}), 400
+
+    user_timing = None
+    current_user_id = get_jwt_identity()
+    if current_user_id is not None:
+        saved = UserPreferences.query.filter_by(student_pid=current_user_id).order_by(UserPreferences.id.desc()).first()
+        user_timing = saved.user_timing if saved else None
+
+    try:
+        catalog = get_catalog(data.get("term_id"))
+    except LookupError as e:
+        return jsonify({"msg": "No course catalog for this term.", "error": str(e)}), 404
+
+    try:
+        k = int(data.get("k", schedules.DEFAULT_SCHEDULES))
+        if k <= 0:
+            raise ValueError("k must be positive")
+
+        probabilities = None
+        if data.get("gpa") is not None:
+            gpa = float(data["gpa"])
+            crns = [section.crn for code in courses for section in catalog.sections_for(search.normalize_code(code))]
+            probabilities = {
+                crn: probability
+                for crn, probability in zip(crns, predictor.predict_success_probabilities(gpa, crns))
+                if probability is not None
+            }
+
+        preferences = ranking.SchedulePreferences.from_user_timing(
+            user_timing,
+            class_time=data.get("class_time"),
+            class_size=data.get("class_size"),
+            instruction_type=data.get("instruction_type"),
+            probabilities=probabilities,
+            weights=data.get("weights"),
+        )
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify({"msg": "Invalid k, gpa, weights or preferences", "error": str(e)}), 400
+
+    workers = ranking.SCHEDULE_WORKERS if data.get("parallel") else 1
+    result = ranking.rank_schedules(courses, preferences, k=k, catalog=catalog, workers=workers)
+    return jsonify(result), 200
+
+
+@auth.route("/catalog-status", methods=["GET"])
+def catalog_status():
+    """
+    ### Endpoint that reports which catalog snapshots this worker is serving
+    per term: the reload counter and how long the last index build took,
+    plus the worker's catalog memory budget and how many terms were evicted
+    """
+    return jsonify(catalog_registry.stats()), 200
+
+
 @auth.route("/get-interests", methods=["GET", "POST"])
 def get_interests():
     """
     API endpoint to filter courses based on user preferences.
-    Accepts JSON input with filtering criteria and returns matching course CRNs.
+    Accepts JSON input with filtering criteria and returns matching course CRNs,
+    each with the student's probability_score for that section.
     """
     
     # ====================== REQUEST VALIDATION ======================
@@ -420,121 +764,23 @@ def get_interests():
     instruction_type = data.get("instruction_type")  # Expected: "Online", "In Person"
     preferred_course = data.get("course")  # Expected format: "CS172" or "UNIVCI101"
     gpa = data.get("gpa")
+    term_id = data.get("term_id")  # Expected: a Term id; defaults to the current term
 
-    subject_match = course_number_match = None
-    
-    if preferred_course:
-        preferred_course = preferred_course.strip().upper()
-        
-        for i, char in enumerate(preferred_course):
-            if char.isdigit():
-                subject_match = preferred_course[:i]
-                course_number_match = preferred_course[i:]
-                break
-            
-    matching_crns = []
+    # one snapshot for the whole request; a catalog reload mid-request won't mix versions
+    try:
+        catalog = get_catalog(term_id)
+    except LookupError as e:
+        return jsonify({"msg": "No course catalog for this term.", "error": str(e)}), 404
 
     # ====================== COURSE FILTERING LOGIC ======================
-    # Iterate through all courses in course_data (key=CRN, value=course details)
-    for crn, course in course_data.items():
-        match = True  # Start by assuming the course matches all criteria
-
-        # --------------------- COURSE CODE FILTER ---------------------
-        if preferred_course:
-            
-            subject = course.get("subject_code", "").upper()
-            number = course.get("course_number", "").upper()
-            
-            if subject != subject_match or number != course_number_match:
-                match = False
-
-        # --------------------- CLASS TIME FILTER ---------------------
-        if class_time:  # Only apply filter if class_time was specified
-            start_time = course.get('start_time')
-            
-            # If course has no start time, exclude it
-            if not start_time:
-                match = False
-            else:
-                try:
-                    # Extract the hour from start time (format "HH:MM")
-                    start_hour = int(start_time.split(":")[0])
-                    
-                    # Convert class_time to list if it's a single string
-                    time_filters = class_time if isinstance(class_time, list) else [class_time]
-                        
-                    # The course must match at least one of the specified time filters
-                    time_match = False
-                    
-                    for time_filter in time_filters:
-                        if time_filter == "Morning" and (8 <= start_hour < 12):
-                            time_match = True
-                            break
-                        elif time_filter == "Afternoon" and (12 <= start_hour < 16):
-                            time_match = True
-                            break
-                        elif time_filter == "Evening" and (16 <= start_hour <= 22):
-                            time_match = True
-                            break
-                    
-                    # If none of the time filters matched, exclude the course
-                    if not time_match:
-                        match = False
-                        
-                except (ValueError, AttributeError):
-                    match = False # Handle invalid time format or missing data
-        
-        # --------------------- CLASS SIZE FILTER ---------------------
-        # Only check size if previous filters haven't disqualified the course
-        if match and class_size:
-            enrollment = course.get('max_enroll')
-            
-            if not enrollment:  # No enrollment data available
-                match = False
-            else:
-                try:
-                    enrollment = int(enrollment)  # Convert to integer
-                    
-                    # Convert class_size to list if it's a single string
-                    if isinstance(class_size, list):
-                        size_filters = class_size
-                    else:
-                        size_filters = [class_size]
-                    
-                    # The course must match at least one of the specified size filters
-                    size_match = False
-                    
-                    for size_filter in size_filters:
-                        if size_filter == "Large" and enrollment > 50:
-                            size_match = True
-                            break
-                        elif size_filter == "Small" and enrollment <= 50:
-                            size_match = True
-                            break
-                    
-                    # If none of the size filters matched, exclude the course
-                    if not size_match:
-                        match = False
-                        
-                except ValueError:
-                    # Handle invalid size data
-                    match = False
-                    
-        # --------------------- INSTRUCTION TYPE FILTER ---------------------
-        if match and instruction_type:
-            # Normalize strings for case-insensitive comparison
-            instruction_method = course.get('instruction_method', '').lower()
-            requested_type = instruction_type.lower()
-            
-            # Check instruction method matches request
-            if requested_type == "online" and instruction_method != "online-asynchronous":
-                match = False
-            elif requested_type == "in person" and instruction_method != "face to face":
-                match = False
-        
-        # finally match all of our criteria then append crn to our list
-        if match:
-            matching_crns.append(int(crn))
+    # every filter is a boolean mask over the catalog's numpy columns (see scripts/filters.py)
+    matching_crns = filters.filter_sections(
+        catalog,
+        class_time=class_time,
+        class_size=class_size,
+        instruction_type=instruction_type,
+        course=preferred_course,
+    )
     
     # Check if we found any matching courses
     if not matching_crns:
@@ -553,24 +799,20 @@ def get_interests():
     # copy exact same logic as course_retriever except now we have filtered crns 
     try:
         # get one course's entire CRN for the quarter 
-        course_info = prereqs.get_crns_info(matching_crns)
+        course_info = prereqs.get_crns_info(matching_crns, catalog=catalog)
         
-        # get model to calculate probability 
+        # get model to calculate probability; every matching section scored in one batch
         try:
             gpa = float(gpa)
-            course_crn = str(matching_crns[0])
-
-            # random probability for certain course (if user
-            # applies filters with no course search) but can be ignored for now..
-            probability = model.predict_success_probability(gpa, course_crn)
+            probability = add_probability_scores(course_info, gpa)
             # return list of dicts back to frontend
             return jsonify({
                 "course_data": course_info,
-                "probability_score": int(probability * 100)
+                "probability_score": probability
             }), 200
 
         # error if type or crn is not found
-        except ValueError as e:
+        except (TypeError, ValueError) as e:
             return jsonify({
                 "msg": "enter valid crn or gpa types",
                 "error": str(e),
@@ -604,6 +846,33 @@ def schedule_saver():
         student_pid=current_user_id,
         term_id=term_id
     ).first()
+
+    # reject time conflicts within the schedule and with courses already saved for this term
+    try:
+        occupancy = get_catalog(term_id).derived("occupancy")
+    except LookupError:
+        # no catalog for this term; the sections' own days/times still get checked
+        occupancy = None
+
+    entries = list(schedule)
+    if term_plan:
+        # saved courses are checked from their own rows; the term usually has no catalog to look them up in
+        saved = (
+            db.session.query(Courses.crn, Courses.start_time, Courses.end_time, Day.name)
+            .join(UserTermCourse, UserTermCourse.course_id == Courses.id)
+            .outerjoin(CourseDay, CourseDay.course_id == Courses.id)
+            .outerjoin(Day, Day.id == CourseDay.day_id)
+            .filter(UserTermCourse.term_plan_id == term_plan.id)
+        )
+        entries += conflicts.sections_from_rows(saved)
+
+    masks, unknown = conflicts.schedule_masks(entries, occupancy)
+    if unknown:
+        return jsonify({"error": "No meeting times for these CRNs; send their days, start_time and end_time", "unknown": unknown}), 400
+
+    report = conflicts.conflict_report(masks)
+    if not report["valid"]:
+        return jsonify({"error": "Schedule has time conflicts", "conflicts": report["conflicts"]}), 409
     
     if not term_plan:
         term_plan = UserTermPlanning(student_pid=current_user_id, term_id=term_id)
@@ -644,10 +913,12 @@ def schedule_saver():
                 db.session.add(course_instructor)
             
             # Add days
-            for day_data in course_data.get("days", []):
-                day = Day.query.filter_by(name=day_data.get("day")).first()
+            for day_data in course_data.get("days") or []:
+                # the json data lists day names; {"day": name} is accepted too
+                day_name = day_data.get("day") if isinstance(day_data, dict) else day_data
+                day = Day.query.filter_by(name=day_name).first()
                 if not day:
-                    day = Day(name=day_data.get("day"))
+                    day = Day(name=day_name)
                     db.session.add(day)
                     db.session.flush()
                 
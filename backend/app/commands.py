@@ -0,0 +1,172 @@
+import click
+from flask.cli import AppGroup
+from scripts import catalog
+from scripts.catalog_store import compiled_path
+
+# flask CLI commands; registered on the app in createapp()
+# ex. `flask catalog compile` from the backend directory
+catalog_cli = AppGroup("catalog", help="Build and inspect the course catalog.")
+model_cli = AppGroup("model", help="Train and inspect the course success model.")
+
+
+@catalog_cli.command("compile")
+@click.option("--source", default=None, help="json catalog to compile (defaults to DATA_FILE)")
+@click.option("--out", default=None, help="where to write the compiled catalog (defaults to next to the json)")
+def compile_catalog(source, out):
+    """
+    ### compiles the json catalog into the memory-mapped binary format workers load at startup
+    """
+    source = source or catalog.DATA_FILE
+    out_path = catalog.compile_catalog(source, out)
+    click.echo(f"Compiled {source} -> {out_path}")
+
+    from scripts.prereq_store import write_prereq_store
+    click.echo(f"Compiled pre-reqs -> {write_prereq_store(source)}")
+
+
+@catalog_cli.command("ingest")
+@click.option("--source", default=None, help="scraped json catalog to ingest (defaults to DATA_FILE)")
+@click.option("--batch-size", default=catalog.INGEST_BATCH_SIZE, show_default=True, help="sections written per batch")
+@click.option("--compile/--no-compile", "compile_", default=True, help="also write the compiled catalog next to the json")
+@click.option("--db/--no-db", "to_db", default=True, help="sync the sections into the course tables")
+def ingest_catalog(source, batch_size, compile_, to_db):
+    """
+    ### streams a freshly scraped catalog into the compiled catalog and the database in batches
+    """
+    from scripts.ingest import CompiledSink, ingest
+    from app.utils.catalog_sync import CatalogSyncSink
+
+    source = source or catalog.DATA_FILE
+    sinks = []
+    if compile_:
+        sinks.append(CompiledSink(compiled_path(source)))
+    if to_db:
+        sinks.append(CatalogSyncSink())
+
+    report = ingest(source, sinks, batch_size=batch_size)
+    echo_report(source, report)
+
+    if compile_:
+        from scripts.prereq_store import write_prereq_store
+        click.echo(f"Compiled pre-reqs -> {write_prereq_store(source)}")
+
+
+@catalog_cli.command("sync")
+@click.option("--source", default=None, help="json catalog to load (defaults to DATA_FILE)")
+@click.option("--batch-size", default=catalog.INGEST_BATCH_SIZE, show_default=True, help="sections upserted per transaction")
+def sync_catalog(source, batch_size):
+    """
+    ### bulk-loads the catalog into the courses / instructors / days tables
+    only new or changed sections are written, so re-syncing an unchanged catalog is nearly free
+    """
+    from scripts.ingest import ingest
+    from app.utils.catalog_sync import CatalogSyncSink
+
+    source = source or catalog.DATA_FILE
+    report = ingest(source, [CatalogSyncSink()], batch_size=batch_size)
+    echo_report(source, report)
+
+
+def echo_report(source: str, report: dict):
+    click.echo(
+        f"Ingested {report['sections']} sections from {source} in {report['batches']} batches"
+        f" ({report['seconds']}s); rejected {report['rejected']}"
+    )
+    for error in report["errors"]:
+        click.echo(f"  rejected {error}")
+
+    if "courses_inserted" in report:
+        click.echo(
+            f"Courses: {report['courses_inserted']} inserted, {report['courses_updated']} updated,"
+            f" {report['courses_unchanged']} unchanged | instructors inserted: {report['instructors_inserted']}"
+            f" | days inserted: {report['days_inserted']} | links: +{report['links_inserted']} -{report['links_deleted']}"
+        )
+
+
+@model_cli.command("train")
+@click.option("--source", default=None, help="json catalog to train on (defaults to DATA_FILE)")
+@click.option("--out", default=None, help="where to write the artifact (defaults to MODEL_FILE)")
+@click.option("--samples-per-course", default=None, type=int, help="synthetic students per course (defaults to MODEL_SAMPLES_PER_COURSE)")
+@click.option("--chunk-courses", default=None, type=int, help="generate students this many courses at a time to bound memory")
+@click.option("--compiled-out", default=None, help="where to write the compiled model (defaults to COMPILED_MODEL_FILE)")
+def train_model(source, out, samples_per_course, chunk_courses, compiled_out):
+    """
+    ### fits the success model and writes the versioned artifact + the compiled export workers predict with
+    """
+    from scripts import model
+
+    artifact = model.train(
+        source,
+        samples_per_course=samples_per_course or model.SAMPLES_PER_COURSE,
+        chunk_courses=chunk_courses,
+    )
+    path = model.save_artifact(artifact, out)
+    compiled_path = model.save_compiled_model(artifact, compiled_out)
+    click.echo(
+        f"Trained on {len(artifact['courses'])} sections from {artifact['source']}"
+        f" (accuracy {artifact['accuracy']:.2f}%) -> {path}, compiled -> {compiled_path}"
+    )
+
+
+@model_cli.command("export")
+@click.option("--path", default=None, help="artifact to export (defaults to MODEL_FILE)")
+@click.option("--out", default=None, help="where to write the compiled model (defaults to COMPILED_MODEL_FILE)")
+def export_model(path, out):
+    """
+    ### flattens a trained artifact's trees into the numpy arrays the app predicts with
+    """
+    from scripts import model
+    from scripts.compiled_model import CompiledModel
+
+    artifact = model.load_artifact(path)
+    compiled_path = model.save_compiled_model(artifact, out)
+    compiled = CompiledModel.load(compiled_path)
+    click.echo(
+        f"{compiled.roots.size} trees ({compiled.feature.size} nodes, depth {compiled.depth}) and"
+        f" {len(compiled)} sections -> {compiled_path} ({compiled.nbytes() / 1024:.1f}KB)"
+    )
+
+
+@model_cli.command("info")
+@click.option("--path", default=None, help="artifact to inspect (defaults to MODEL_FILE)")
+def model_info(path):
+    """
+    ### shows what's in a trained artifact
+    """
+    from scripts import model
+
+    artifact = model.load_artifact(path)
+    click.echo(
+        f"version {artifact['version']} | trained {artifact['trained_at']} on {artifact['source']}"
+        f" | {len(artifact['courses'])} sections | accuracy {artifact['accuracy']:.2f}%"
+        f" | scikit-learn {artifact['sklearn']}"
+    )
+
+
+@model_cli.command("table")
+@click.option("--dtype", type=click.Choice(["float32", "float16", "uint8"]), default="float32", show_default=True, help="storage type of each cell")
+@click.option("--out", default=None, help="where to write the table (defaults to SUCCESS_TABLE_FILE)")
+@click.option("--check/--no-check", default=True, help="compare lookups against the live model at random GPAs and every threshold")
+def build_table(dtype, out, check):
+    """
+    ### precomputes the model between each of its gpa thresholds for every CRN so predictions become an array lookup
+    """
+    from scripts import model
+
+    artifact = model.load_artifact()
+    table = model.build_success_table(artifact, dtype)
+    path = table.save(out or model.TABLE_FILE)
+
+    memory = table.memory_report()
+    click.echo(
+        f"{memory['crns']} CRNs x {memory['columns']} gpa intervals ({memory['dtype']}) -> {path} | table"
+        f" {memory['table_bytes'] / 1024:.1f}KB (float64 would be {memory['float64_bytes'] / 1024:.1f}KB)"
+        f" + CRN index ~{memory['index_bytes'] / 1024:.1f}KB"
+    )
+    if check:
+        report = model.check_success_table(table, artifact)
+        click.echo(
+            f"  max error {report['max_error']:.2e}, mean {report['mean_error']:.2e},"
+            f" probability_score changed in {report['percent_changed'] * 100:.2f}% of"
+            f" {report['samples']} lookups"
+        )
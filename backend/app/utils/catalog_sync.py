@@ -0,0 +1,191 @@
+from app import db
+from app.models import Courses, Instructor, CourseInstructor, Day, CourseDay
+from sqlalchemy import tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+"""
+Database side of catalog ingestion (see scripts/ingest.py).
+
+CatalogSyncSink bulk-loads streamed batches of sections into the courses,
+instructors, course_instructors, days and course_days tables. Each batch is
+diffed against the rows already in the database first, so only new or changed
+sections are written (multi-row INSERT ... ON CONFLICT upserts) and re-syncing an
+unchanged catalog is a handful of SELECTs per batch and no writes.
+"""
+
+# course columns compared when diffing a section against its existing row
+COURSE_FIELDS = (
+    "subject_code", "course_number", "course_title", "credits",
+    "instruction_type", "start_time", "end_time",
+)
+
+
+def course_row(section) -> dict:
+    """
+    ### Section -> column values for the courses table
+    the table doesn't allow null times, so sections without a meeting time store ""
+    """
+    return {
+        "subject_code": section.subject_code,
+        "course_number": section.course_number,
+        "course_title": section.course_title,
+        "crn": section.crn,
+        "credits": section.credits or "",
+        "instruction_type": section.instruction_type,
+        "start_time": section.start_time or "",
+        "end_time": section.end_time or "",
+    }
+
+
+def upsert(session, model, rows: list[dict], conflict: list[str], update: list[str] | None = None):
+    """
+    ### multi-row INSERT ... ON CONFLICT for rows
+    (sqlalchemy's insertmanyvalues packs the rows into as few VALUES statements as the driver allows)
+    updates the update columns on conflict, or leaves the existing row alone when update is None
+
+    #### args:
+    - conflict: columns of the unique constraint rows may collide on
+    """
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(session.get_bind().dialect.name)
+    if dialect is None:
+        raise ValueError(f"catalog sync needs postgresql or sqlite, not {session.get_bind().dialect.name}")
+
+    statement = dialect.insert(model)
+    if update:
+        statement = statement.on_conflict_do_update(
+            index_elements=conflict,
+            set_={column: statement.excluded[column] for column in update},
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=conflict)
+    session.execute(statement, rows)
+
+
+class CatalogSyncSink:
+    """
+    ### upserts every streamed batch of sections into the course tables, one transaction per batch
+    - courses: inserted when new, updated only when a column changed
+    - instructors / days: resolved to ids in bulk (cached for the whole sync)
+    - course_instructors / course_days: missing links inserted, stale ones deleted
+
+    counts of everything written end up in the ingest report
+
+    #### args:
+    - session: sqlalchemy session to write with (defaults to db.session)
+    """
+    def __init__(self, session=None):
+        self.session = session or db.session
+        self.instructor_ids = {}
+        self.day_ids = {}
+        self.counts = {
+            "courses_inserted": 0, "courses_updated": 0, "courses_unchanged": 0,
+            "instructors_inserted": 0, "days_inserted": 0,
+            "links_inserted": 0, "links_deleted": 0,
+        }
+
+    def _resolve_ids(self, model, names: set[str], cache: dict[str, int], counter: str) -> dict[str, int]:
+        """
+        ### name -> id for every name, inserting the names the table doesn't have yet
+        """
+        missing = names - cache.keys()
+        if missing:
+            found = self.session.query(model.name, model.id).filter(model.name.in_(missing)).all()
+            cache.update(found)
+
+            new_names = missing - cache.keys()
+            if new_names:
+                upsert(self.session, model, [{"name": name} for name in sorted(new_names)], conflict=["name"])
+                cache.update(self.session.query(model.name, model.id).filter(model.name.in_(new_names)).all())
+                self.counts[counter] += len(new_names)
+        return cache
+
+    def _sync_links(self, link_model, column: str, wanted: set[tuple[int, int]], course_ids: list[int]):
+        """
+        ### makes link_model hold exactly the wanted (course_id, <column>) pairs for these courses
+        """
+        existing = set(
+            self.session.query(link_model.course_id, getattr(link_model, column))
+            .filter(link_model.course_id.in_(course_ids))
+            .all()
+        )
+
+        added = wanted - existing
+        if added:
+            upsert(
+                self.session, link_model,
+                [{"course_id": course_id, column: other_id} for course_id, other_id in sorted(added)],
+                conflict=["course_id", column],
+            )
+
+        stale = existing - wanted
+        if stale:
+            self.session.query(link_model).filter(
+                tuple_(link_model.course_id, getattr(link_model, column)).in_(sorted(stale))
+            ).delete(synchronize_session=False)
+
+        self.counts["links_inserted"] += len(added)
+        self.counts["links_deleted"] += len(stale)
+
+    def write(self, batch):
+        try:
+            self._write(batch)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def _write(self, batch):
+        rows = {section.crn: course_row(section) for section in batch}
+
+        # diff against what's already stored for these CRNs
+        existing = {
+            course.crn: course
+            for course in self.session.query(Courses.id, Courses.crn, *[getattr(Courses, field) for field in COURSE_FIELDS])
+            .filter(Courses.crn.in_(rows.keys()))
+        }
+
+        changed = []
+        for crn, row in rows.items():
+            course = existing.get(crn)
+            if course is None:
+                self.counts["courses_inserted"] += 1
+                changed.append(row)
+            elif any(getattr(course, field) != row[field] for field in COURSE_FIELDS):
+                self.counts["courses_updated"] += 1
+                changed.append(row)
+            else:
+                self.counts["courses_unchanged"] += 1
+
+        if changed:
+            upsert(self.session, Courses, changed, conflict=["crn"], update=list(COURSE_FIELDS))
+
+        # ids for the courses just inserted
+        course_ids = {crn: course.id for crn, course in existing.items()}
+        new_crns = [row["crn"] for row in changed if row["crn"] not in course_ids]
+        if new_crns:
+            course_ids.update(self.session.query(Courses.crn, Courses.id).filter(Courses.crn.in_(new_crns)).all())
+
+        instructor_ids = self._resolve_ids(
+            Instructor, {name for section in batch for name in section.instructors or () if name},
+            self.instructor_ids, "instructors_inserted",
+        )
+        day_ids = self._resolve_ids(
+            Day, {day for section in batch for day in section.days or ()},
+            self.day_ids, "days_inserted",
+        )
+
+        batch_course_ids = [course_ids[section.crn] for section in batch]
+        self._sync_links(CourseInstructor, "instructor_id", {
+            (course_ids[section.crn], instructor_ids[name])
+            for section in batch for name in section.instructors or () if name
+        }, batch_course_ids)
+        self._sync_links(CourseDay, "day_id", {
+            (course_ids[section.crn], day_ids[day])
+            for section in batch for day in section.days or ()
+        }, batch_course_ids)
+
+    def close(self, report: dict):
+        report.update(self.counts)
+
+    def abort(self):
+        self.session.rollback()
@@ -0,0 +1,81 @@
+"""catalog sync tables
+
+Revision ID: a54b052d0052
+Revises: e72fc3be6329
+Create Date: 2026-10-18 19:44:12.105011
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a54b052d0052'
+down_revision = 'e72fc3be6329'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the courses columns + unique crn `flask catalog sync` upserts on
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('subject_code', sa.String(length=55), nullable=False))
+        batch_op.add_column(sa.Column('course_number', sa.String(length=55), nullable=False))
+        batch_op.add_column(sa.Column('course_title', sa.String(length=1024), nullable=False))
+        batch_op.add_column(sa.Column('crn', sa.Integer(), nullable=False))
+        batch_op.add_column(sa.Column('credits', sa.String(length=55), nullable=False))
+        batch_op.add_column(sa.Column('instruction_type', sa.String(length=50), nullable=False))
+        batch_op.add_column(sa.Column('start_time', sa.String(length=55), nullable=False))
+        batch_op.add_column(sa.Column('end_time', sa.String(length=55), nullable=False))
+        batch_op.create_unique_constraint('courses_crn_key', ['crn'])
+        batch_op.create_unique_constraint('courses_crn_subject_code_course_number_key', ['crn', 'subject_code', 'course_number'])
+
+    op.create_table('days',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=20), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name', name='days_name_key')
+    )
+    op.create_table('instructors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name', name='instructors_name_key')
+    )
+    op.create_table('course_days',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('day_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.ForeignKeyConstraint(['day_id'], ['days.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('course_id', 'day_id', name='course_days_course_id_day_id_key')
+    )
+    op.create_table('course_instructors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('instructor_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.ForeignKeyConstraint(['instructor_id'], ['instructors.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('course_id', 'instructor_id', name='course_instructors_course_id_instructor_id_key')
+    )
+
+
+def downgrade():
+    op.drop_table('course_instructors')
+    op.drop_table('course_days')
+    op.drop_table('instructors')
+    op.drop_table('days')
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_constraint('courses_crn_subject_code_course_number_key', type_='unique')
+        batch_op.drop_constraint('courses_crn_key', type_='unique')
+        batch_op.drop_column('end_time')
+        batch_op.drop_column('start_time')
+        batch_op.drop_column('instruction_type')
+        batch_op.drop_column('credits')
+        batch_op.drop_column('crn')
+        batch_op.drop_column('course_title')
+        batch_op.drop_column('course_number')
+        batch_op.drop_column('subject_code')
@@ -0,0 +1,913 @@
+import os
+import time
+import sys
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+from datetime import datetime
+from dotenv import load_dotenv
+from scripts.catalog_store import StringTable, CompiledCatalog, CompiledCatalogWriter, compiled_path
+from scripts.json_stream import JsonRecordStream
+load_dotenv()
+
+# global env that stores location of json data
+DATA_FILE = os.getenv("DATA_FILE")
+
+# how often (seconds) the watcher checks DATA_FILE for a refreshed catalog
+CATALOG_POLL_SECONDS = float(os.getenv("CATALOG_POLL_SECONDS", "5"))
+
+# per-term catalogs live here as <term_id>.json; DATA_FILE stays the default (current) term
+TERM_DATA_DIR = os.getenv("TERM_DATA_DIR") or (os.path.dirname(DATA_FILE) if DATA_FILE else ".")
+
+# how much memory the resident term catalogs may use before the least recently used is dropped
+CATALOG_MEMORY_BUDGET_MB = float(os.getenv("CATALOG_MEMORY_BUDGET_MB", "512"))
+
+# sections handled per batch while streaming the json (compile / ingest); bounds their peak memory
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+
+logger = logging.getLogger(__name__)
+
+# days of the week in bit order for the day_mask (Monday = bit 0)
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+DAY_BITS = {day: 1 << i for i, day in enumerate(DAYS)}
+
+
+def time_to_minutes(value: str | None) -> int:
+    """
+    ### "HH:MM" -> minutes after midnight; -1 when the section has no (valid) time
+    """
+    try:
+        hours, minutes = value.split(":")
+        return int(hours) * 60 + int(minutes)
+    except (ValueError, AttributeError):
+        return -1
+
+
+def parse_credits(value: str | None) -> float:
+    """
+    ### "3.00" -> 3.0 and "3.00 TO 6.00" -> 3.0 (lower bound); 0.0 if unreadable
+    """
+    try:
+        return float(value.split()[0])
+    except (ValueError, AttributeError, IndexError):
+        return 0.0
+
+
+def parse_capacity(value: str | None) -> int:
+    """
+    ### max_enroll string -> int; -1 when missing or not a number
+    """
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return -1
+
+
+def days_to_mask(days) -> int:
+    mask = 0
+    for day in days or ():
+        mask |= DAY_BITS.get(day, 0)
+    return mask
+
+
+class Section:
+    """
+    ### One scraped section (one CRN) of a course
+    compact record of the json entries in DATA_FILE; uses __slots__ so
+    a full-university catalog doesn't pay for a dict per section
+    """
+    __slots__ = (
+        "subject_code", "course_number", "instruction_type", "instruction_method",
+        "section", "crn", "enroll", "max_enroll", "course_title", "days",
+        "start_time", "end_time", "instructors", "prereqs", "credits", "code",
+        "start_min", "end_min", "capacity", "credit_hours", "day_mask",
+    )
+
+    def __init__(self, details: dict):
+        self.subject_code = details.get("subject_code", "")
+        self.course_number = details.get("course_number", "")
+        self.instruction_type = details.get("instruction_type", "")
+        self.instruction_method = details.get("instruction_method", "")
+        self.section = details.get("section", "")
+        self.crn = int(details["crn"])
+        self.enroll = details.get("enroll", "")
+        self.max_enroll = details.get("max_enroll", "")
+        self.course_title = details.get("course_title", "")
+        self.start_time = details.get("start_time")
+        self.end_time = details.get("end_time")
+        self.prereqs = details.get("prereqs", "")
+        self.credits = details.get("credits", "")
+
+        # days/instructors can be null in the scraped data; keep that distinction
+        days = details.get("days")
+        self.days = tuple(days) if days is not None else None
+        instructors = details.get("instructors")
+        self.instructors = (
+            tuple(instructor.get("name") for instructor in instructors)
+            if instructors is not None else None
+        )
+
+        # course code used everywhere else in dragonflow ex. "CS172"
+        self.code = self.subject_code + self.course_number
+
+        # numeric forms parsed once here instead of on every request
+        self.start_min = time_to_minutes(self.start_time)
+        self.end_min = time_to_minutes(self.end_time)
+        self.capacity = parse_capacity(self.max_enroll)
+        self.credit_hours = parse_credits(self.credits)
+        self.day_mask = days_to_mask(self.days)
+
+    def to_dict(self) -> dict:
+        """
+        ### rebuilds the same dict the json data file holds for this CRN
+        (this is what gets sent back to svelte)
+        """
+        return {
+            "subject_code": self.subject_code,
+            "course_number": self.course_number,
+            "instruction_type": self.instruction_type,
+            "instruction_method": self.instruction_method,
+            "section": self.section,
+            "crn": self.crn,
+            "enroll": self.enroll,
+            "max_enroll": self.max_enroll,
+            "course_title": self.course_title,
+            "days": list(self.days) if self.days is not None else None,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "instructors": (
+                [{"name": name} for name in self.instructors]
+                if self.instructors is not None else None
+            ),
+            "prereqs": self.prereqs,
+            "credits": self.credits,
+        }
+
+    def __repr__(self):
+        return f"Section({self.code}, crn={self.crn}, {self.instruction_type})"
+
+
+def validate_section(details, key: str | None = None) -> Section:
+    """
+    ### normalizes one scraped record into a Section; raises ValueError saying what's wrong with it
+    - crn must be an integer (matching its key when the json is keyed by crn)
+    - subject_code and course_number can't be empty
+    - start_time / end_time are both null or both "HH:MM" with the end after the start
+    - days are null or weekday names
+    """
+    if not isinstance(details, dict):
+        raise ValueError(f"expected an object but found {type(details).__name__}")
+
+    try:
+        section = Section(details)
+    except (KeyError, ValueError, TypeError, AttributeError) as e:
+        raise ValueError(f"unreadable section ({e!r})")
+
+    if key is not None and key.strip() != str(section.crn):
+        raise ValueError(f"crn {section.crn} is stored under key {key!r}")
+
+    if not section.subject_code or not section.course_number:
+        raise ValueError(f"crn {section.crn} has no subject code / course number")
+
+    if (section.start_time is None) != (section.end_time is None):
+        raise ValueError(f"crn {section.crn} has only one of start_time / end_time")
+
+    if section.start_time is not None and not 0 <= section.start_min < section.end_min < 24 * 60:
+        raise ValueError(f"crn {section.crn} has an invalid meeting time {section.start_time}-{section.end_time}")
+
+    unknown_days = set(section.days or ()) - DAY_BITS.keys()
+    if unknown_days:
+        raise ValueError(f"crn {section.crn} has unknown days {sorted(unknown_days)}")
+
+    return section
+
+
+# CRNs below this are de-duplicated with a bitmap (2MB at most) instead of a set
+SEEN_BITMAP_LIMIT = 1 << 24
+
+
+def iter_sections(stream: JsonRecordStream, on_reject=None):
+    """
+    ### streams validated Sections out of the json one record at a time
+    invalid records (and repeats of a CRN already seen) are logged and skipped
+
+    #### args:
+    - stream: JsonRecordStream over the scraped data file
+    - on_reject: optional callback(key, error) for every skipped record
+    """
+    # CRNs already seen; a bitmap (one bit per crn) keeps this tiny even for a huge catalog
+    seen_bits = bytearray()
+    seen_other = set()
+
+    for key, details in stream.records():
+        try:
+            section = validate_section(details, key)
+            crn = section.crn
+            if 0 <= crn < SEEN_BITMAP_LIMIT:
+                byte, bit = divmod(crn, 8)
+                if byte >= len(seen_bits):
+                    seen_bits.extend(bytes(byte + 1 - len(seen_bits)))
+                seen = seen_bits[byte] >> bit & 1
+                seen_bits[byte] |= 1 << bit
+            else:
+                seen = crn in seen_other
+                seen_other.add(crn)
+
+            if seen:
+                raise ValueError(f"crn {crn} appears more than once")
+
+        except ValueError as e:
+            logger.warning(f"Skipping catalog record {key}: {e}")
+            if on_reject is not None:
+                on_reject(key, e)
+            continue
+
+        yield section
+
+
+def batched(iterable, size: int):
+    """
+    ### yields lists of up to size items
+    """
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# indexes derived from a catalog (filter columns, search index, ...); see register_derived
+DERIVED_BUILDERS = {}
+
+
+def register_derived(name: str):
+    """
+    ### decorator registering a builder for an index derived from a catalog
+    the CatalogManager builds every registered index while it builds a new
+    snapshot (off the request path); catalog.derived(name) returns it
+    """
+    def decorator(builder):
+        DERIVED_BUILDERS[name] = builder
+        return builder
+    return decorator
+
+
+# string fields stored as string-table indexes in the compiled catalog
+STRING_COLUMNS = (
+    "subject_code", "course_number", "instruction_type", "instruction_method", "section",
+    "enroll", "max_enroll", "course_title", "start_time", "end_time", "prereqs", "credits",
+)
+
+# null_flags bits; json null and an empty list are different things in the scraped data
+NULL_DAYS = 1
+NULL_INSTRUCTORS = 2
+
+
+class CourseCatalog:
+    """
+    ### In-memory catalog of every section with hash indexes
+    - by_crn: CRN -> Section
+    - by_code: course code ex. "CS172" -> tuple of that course's sections
+    - by_subject: subject code ex. "CS" -> tuple of that subject's sections
+
+    sections keep the same order as the json data file so any lookup
+    returns results in the order the old linear scans did. A catalog is
+    never mutated after it is built; a refresh builds a new one instead
+    """
+
+    def __init__(self, sections, checksum: str | None = None):
+        by_code = {}
+        by_subject = {}
+        self.by_crn = {}
+
+        for section in sections:
+            self.by_crn[section.crn] = section
+            by_code.setdefault(section.code, []).append(section)
+            by_subject.setdefault(section.subject_code, []).append(section)
+
+        # tuples so nobody can append to a snapshot other requests are reading
+        self.sections = tuple(self.by_crn.values())
+        self.by_code = {code: tuple(group) for code, group in by_code.items()}
+        self.by_subject = {subject: tuple(group) for subject, group in by_subject.items()}
+
+        # set by the CatalogManager that built this snapshot
+        self.checksum = checksum
+        self.version = 0
+        # json data file the catalog came from (set by load_catalog); sidecar files live next to it
+        self.source = None
+        self._derived = {}
+        self._derived_lock = threading.RLock()
+
+    @classmethod
+    def from_dict(cls, course_data: dict, checksum: str | None = None) -> "CourseCatalog":
+        return cls((Section(details) for details in course_data.values()), checksum=checksum)
+
+    @classmethod
+    def from_file(cls, path: str) -> "CourseCatalog":
+        """
+        ### builds a catalog straight from the json stream; the raw file is never held in memory
+        """
+        stream = JsonRecordStream(path)
+        catalog = cls(iter_sections(stream))
+        catalog.checksum = stream.checksum
+        return catalog
+
+    @classmethod
+    def from_compiled(cls, path: str) -> "CourseCatalog":
+        """
+        ### opens a memory-mapped compiled catalog (see scripts/catalog_store.py)
+        """
+        return CompiledCourseCatalog(CompiledCatalog(path))
+
+    def __len__(self):
+        return len(self.sections)
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def __contains__(self, crn):
+        return crn in self.by_crn
+
+    def get(self, crn: int) -> Section | None:
+        return self.by_crn.get(int(crn))
+
+    def sections_for(self, course_code: str) -> tuple[Section, ...]:
+        return self.by_code.get(course_code, ())
+
+    def values_for(self, course_code: str, field: str) -> list:
+        """
+        ### one field (ex. "prereqs") of every section of a course, in catalog order
+        """
+        return [getattr(section, field) for section in self.sections_for(course_code)]
+
+    def sections_for_subject(self, subject_code: str) -> tuple[Section, ...]:
+        return self.by_subject.get(subject_code, ())
+
+    def codes(self):
+        return self.by_code.keys()
+
+    def derived(self, name: str):
+        """
+        ### returns the derived index registered under name, building it once per snapshot
+        a builder may use other derived indexes (the lock is re-entrant)
+        """
+        index = self._derived.get(name)
+        if index is not None:
+            return index
+
+        with self._derived_lock:
+            if name not in self._derived:
+                self._derived[name] = DERIVED_BUILDERS[name](self)
+            return self._derived[name]
+
+    def warm(self):
+        """
+        ### builds every registered derived index up front
+        """
+        for name in DERIVED_BUILDERS:
+            self.derived(name)
+
+    def derived_bytes(self) -> dict[str, int]:
+        """
+        ### name -> rough size in bytes of every derived index built so far (see nbytes() on each)
+        """
+        with self._derived_lock:
+            built = list(self._derived.items())
+        return {name: index.nbytes() if hasattr(index, "nbytes") else 0 for name, index in built}
+
+    def memory_estimate(self) -> int:
+        """
+        ### rough resident size in bytes, derived indexes included; sampled so it stays cheap on big catalogs
+        """
+        return (
+            _sampled_section_bytes(self.sections)
+            + len(self) * INDEX_BYTES_PER_SECTION
+            + sum(self.derived_bytes().values())
+        )
+
+
+class CompiledCourseCatalog(CourseCatalog):
+    """
+    ### CourseCatalog backed by a memory-mapped compiled catalog
+    the CRN/code/subject indexes are built from the integer columns (cheap), and
+    Section objects are only materialized the first time a row is asked for,
+    so opening even a huge catalog is close to instant for a new worker
+    """
+
+    def __init__(self, compiled: CompiledCatalog):
+        # keep the mapping alive for as long as the catalog is; columns point into it
+        self.compiled = compiled
+        self.checksum = compiled.meta.get("source_checksum")
+        self.version = 0
+        self.source = None
+        self._derived = {}
+        self._derived_lock = threading.RLock()
+
+        columns = compiled.columns
+        self._rows = [None] * compiled.rows
+        self._row_by_crn = {crn: row for row, crn in enumerate(columns["crn"].tolist())}
+        self._rows_by_subject = self._group_rows(columns["subject_code"])
+
+        # code = subject + number so group on both string-table indexes at once
+        code_keys = (columns["subject_code"].astype(np.uint64) << np.uint64(32)) | columns["course_number"]
+        self._rows_by_code = {
+            compiled.string(int(key >> 32)) + compiled.string(int(key & 0xFFFFFFFF)): rows
+            for key, rows in self._group_rows(code_keys, decode=False).items()
+        }
+
+    def _group_rows(self, keys: np.ndarray, decode: bool = True) -> dict:
+        """
+        ### key -> tuple of row numbers (in file order) for every distinct key in a column
+        """
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+
+        groups = {}
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            key = int(sorted_keys[start])
+            groups[self.compiled.string(key) if decode else key] = tuple(order[start:end].tolist())
+        return groups
+
+    def _section(self, row: int) -> Section:
+        section = self._rows[row]
+        if section is not None:
+            return section
+
+        compiled = self.compiled
+        columns = compiled.columns
+        details = {name: compiled.string(int(columns[name][row])) for name in STRING_COLUMNS}
+        details["crn"] = int(columns["crn"][row])
+
+        null_flags = int(columns["null_flags"][row])
+        for name, null_bit in (("days", NULL_DAYS), ("instructors", NULL_INSTRUCTORS)):
+            offsets = columns[f"{name}_offsets"]
+            values = [
+                compiled.strings[index]
+                for index in columns[f"{name}_values"][offsets[row]:offsets[row + 1]].tolist()
+            ]
+            details[name] = None if null_flags & null_bit else values
+        details["instructors"] = (
+            None if details["instructors"] is None
+            else [{"name": name} for name in details["instructors"]]
+        )
+
+        # two threads racing here just build the same row twice; either copy is fine
+        section = Section(details)
+        self._rows[row] = section
+        return section
+
+    @property
+    def sections(self) -> tuple[Section, ...]:
+        return tuple(self._section(row) for row in range(len(self._rows)))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return (self._section(row) for row in range(len(self._rows)))
+
+    def __contains__(self, crn):
+        return crn in self._row_by_crn
+
+    def get(self, crn: int) -> Section | None:
+        row = self._row_by_crn.get(int(crn))
+        return self._section(row) if row is not None else None
+
+    def sections_for(self, course_code: str) -> tuple[Section, ...]:
+        return tuple(self._section(row) for row in self._rows_by_code.get(course_code, ()))
+
+    def values_for(self, course_code: str, field: str) -> list:
+        # string columns are read straight from the mapping without materializing the sections
+        if field not in STRING_COLUMNS:
+            return super().values_for(course_code, field)
+        column = self.compiled.columns[field]
+        return [self.compiled.string(int(column[row])) for row in self._rows_by_code.get(course_code, ())]
+
+    def sections_for_subject(self, subject_code: str) -> tuple[Section, ...]:
+        return tuple(self._section(row) for row in self._rows_by_subject.get(subject_code, ()))
+
+    def codes(self):
+        return self._rows_by_code.keys()
+
+    def memory_estimate(self) -> int:
+        # mapped pages are shared page cache; count them once plus the rows materialized so far
+        materialized = [section for section in self._rows if section is not None]
+        return (
+            len(self.compiled._mmap)
+            + _sampled_section_bytes(materialized)
+            + len(self) * INDEX_BYTES_PER_SECTION
+            + sum(self.derived_bytes().values())
+        )
+
+
+def section_columns(sections, strings: StringTable) -> tuple[dict, dict]:
+    """
+    ### flattens a batch of sections into the compiled catalog's columns
+    returns (fixed-width columns, ragged list columns as (lengths, values)) for CompiledCatalogWriter.append
+    """
+    columns = {
+        "crn": np.array([section.crn for section in sections], dtype="<i4"),
+        "start_min": np.array([section.start_min for section in sections], dtype="<i2"),
+        "end_min": np.array([section.end_min for section in sections], dtype="<i2"),
+        "capacity": np.array([section.capacity for section in sections], dtype="<i4"),
+        "credit_hours": np.array([section.credit_hours for section in sections], dtype="<f4"),
+        "day_mask": np.array([section.day_mask for section in sections], dtype="u1"),
+        "null_flags": np.array([
+            (NULL_DAYS if section.days is None else 0)
+            | (NULL_INSTRUCTORS if section.instructors is None else 0)
+            for section in sections
+        ], dtype="u1"),
+    }
+
+    for name in STRING_COLUMNS:
+        columns[name] = np.array(
+            [strings.add(getattr(section, name)) for section in sections],
+            dtype="<u4",
+        )
+
+    # ragged lists (days, instructor names) as per-row lengths + flat values
+    ragged = {}
+    for name in ("days", "instructors"):
+        values = []
+        lengths = []
+        for section in sections:
+            items = getattr(section, name) or ()
+            values.extend(strings.add(value) for value in items)
+            lengths.append(len(items))
+        ragged[name] = (lengths, values)
+
+    return columns, ragged
+
+
+# dict entries + tuple slots each section costs across the crn/code/subject indexes
+INDEX_BYTES_PER_SECTION = 200
+MEMORY_SAMPLE_SIZE = 256
+
+
+def _section_bytes(section: Section) -> int:
+    size = sys.getsizeof(section)
+    for attr in Section.__slots__:
+        value = getattr(section, attr)
+        size += sys.getsizeof(value)
+        if isinstance(value, tuple):
+            size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+def deep_bytes(*values) -> int:
+    """
+    ### rough size in bytes of values and everything they hold (dicts, lists, tuples, sets, plain objects)
+    for a derived index's nbytes(); each object is counted once, and numpy views aren't
+    counted at all (their memory belongs to the array or mapped file they view)
+    """
+    seen = set()
+    total = 0
+    stack = list(values)
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+
+        if isinstance(value, np.ndarray):
+            total += value.nbytes if value.flags.owndata else 0
+            continue
+
+        total += sys.getsizeof(value)
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            stack.extend(value)
+        elif hasattr(value, "__dict__"):
+            stack.append(value.__dict__)
+        elif hasattr(type(value), "__slots__"):
+            stack.extend(getattr(value, slot) for slot in type(value).__slots__ if hasattr(value, slot))
+    return total
+
+
+def _sampled_section_bytes(sections) -> int:
+    if not sections:
+        return 0
+
+    step = max(1, len(sections) // MEMORY_SAMPLE_SIZE)
+    sample = sections[::step]
+    return int(sum(_section_bytes(section) for section in sample) / len(sample) * len(sections))
+
+
+def file_checksum(path: str) -> str:
+    # chunked so checking a big catalog for changes doesn't read it all into memory
+    digest = hashlib.sha1()
+    with open(path, "rb") as data_file:
+        for chunk in iter(lambda: data_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compile_catalog(json_path: str, out_path: str | None = None, batch_size: int = INGEST_BATCH_SIZE) -> str:
+    """
+    ### build step: compiles the json catalog into the memory-mappable binary format
+    streams the json batch by batch, so compiling a huge catalog never holds all of it
+    returns the path written (defaults to the .dfcat file next to the json)
+    """
+    out_path = out_path or compiled_path(json_path)
+    stream = JsonRecordStream(json_path)
+    writer = CompiledCatalogWriter(out_path)
+
+    try:
+        for batch in batched(iter_sections(stream), batch_size):
+            columns, ragged = section_columns(batch, writer.strings)
+            writer.append(len(batch), columns, ragged)
+    except Exception:
+        writer.discard()
+        raise
+
+    return writer.close(meta={"source_checksum": stream.checksum, "source": os.path.basename(json_path)})
+
+
+def load_catalog(json_path: str) -> CourseCatalog:
+    """
+    ### loads the catalog for a json data file, preferring its compiled form
+    the compiled file is only used when it's at least as new as the json;
+    anything wrong with it falls back to parsing the json like before
+    """
+    binary_path = compiled_path(json_path)
+    catalog = None
+
+    try:
+        if os.path.getmtime(binary_path) >= os.path.getmtime(json_path):
+            catalog = CourseCatalog.from_compiled(binary_path)
+        else:
+            logger.info(f"Compiled catalog {binary_path} is older than {json_path}; using json")
+
+    except FileNotFoundError:
+        pass
+
+    except (ValueError, KeyError) as e:
+        logger.error(f"Could not read compiled catalog {binary_path}: {e}")
+
+    if catalog is None:
+        catalog = CourseCatalog.from_file(json_path)
+
+    catalog.source = json_path
+    return catalog
+
+
+class CatalogManager:
+    """
+    ### Owns the live CourseCatalog snapshot for one data file
+    - a daemon thread polls the file's mtime/size every poll_interval seconds
+    - when it changed (and the checksum says the content really changed) a new
+    catalog is built on that thread, off the request path
+    - the finished snapshot is swapped in with a single reference assignment, so
+    a request that grabbed the old snapshot keeps a consistent view until it ends
+
+    #### args:
+    - path: json data file to serve (normally DATA_FILE)
+    - poll_interval: seconds between checks; 0 turns the watcher thread off
+    """
+
+    def __init__(self, path: str, poll_interval: float = CATALOG_POLL_SECONDS):
+        self.path = path
+        self.poll_interval = poll_interval
+
+        self._snapshot = None
+        self._fingerprint = None
+        self._build_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+        # metrics exposed through stats(); reload_count includes the initial load
+        self.reload_count = 0
+        self.last_build_seconds = None
+        self.last_loaded_at = None
+        self.memory_bytes = 0
+
+    def _stat_fingerprint(self) -> tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _build(self, fingerprint: tuple[int, int]) -> CourseCatalog:
+        started = time.perf_counter()
+        catalog = load_catalog(self.path)
+        catalog.warm()
+        build_seconds = time.perf_counter() - started
+
+        catalog.version = self.reload_count + 1
+
+        # the swap: readers either see the old snapshot or the new one, never half of one
+        self._snapshot = catalog
+        self._fingerprint = fingerprint
+        self.reload_count += 1
+        self.last_build_seconds = build_seconds
+        self.last_loaded_at = datetime.now()
+        self.memory_bytes = catalog.memory_estimate()
+
+        logger.info(f"Loaded catalog v{catalog.version} ({len(catalog)} sections) in {build_seconds:.3f}s")
+        return catalog
+
+    def snapshot(self) -> CourseCatalog:
+        """
+        ### returns the current immutable catalog snapshot
+        the very first call loads it synchronously and starts the watcher
+        """
+        catalog = self._snapshot
+        if catalog is not None:
+            return catalog
+
+        with self._build_lock:
+            # another thread could have loaded it while we waited on the lock
+            if self._snapshot is None:
+                self._build(self._stat_fingerprint())
+                self._start_watcher()
+
+        return self._snapshot
+
+    def check_for_update(self) -> bool:
+        """
+        ### rebuilds the catalog if the data file changed; True if a new snapshot was swapped in
+        """
+        fingerprint = self._stat_fingerprint()
+        if fingerprint == self._fingerprint:
+            return False
+
+        with self._build_lock:
+            if fingerprint == self._fingerprint:
+                return False
+
+            # mtime moved but the bytes may be identical (ex. file was touched)
+            current = self._snapshot
+            if current is not None and current.checksum == file_checksum(self.path):
+                self._fingerprint = fingerprint
+                return False
+
+            self._build(fingerprint)
+            return True
+
+    def reload(self) -> CourseCatalog:
+        """
+        ### forces a rebuild and swap regardless of the file fingerprint
+        """
+        with self._build_lock:
+            return self._build(self._stat_fingerprint())
+
+    def _start_watcher(self):
+        if self.poll_interval <= 0 or self._watcher is not None:
+            return
+
+        self._watcher = threading.Thread(
+            target=self._watch, name=f"catalog-watcher:{os.path.basename(self.path)}", daemon=True
+        )
+        self._watcher.start()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check_for_update()
+
+            # a half-written file during a refresh shouldn't kill the watcher; keep old snapshot
+            except Exception as e:
+                logger.error(f"Error reloading catalog {self.path}: {e}")
+
+    def memory_estimate(self) -> int:
+        # measured once per snapshot when it's built
+        return self.memory_bytes if self._snapshot is not None else 0
+
+    def close(self):
+        """
+        ### stops the watcher and drops the snapshot (requests still holding it are unaffected)
+        """
+        self._stop.set()
+        self._snapshot = None
+
+    def stats(self) -> dict:
+        catalog = self._snapshot
+        return {
+            "path": self.path,
+            "version": catalog.version if catalog is not None else None,
+            "sections": len(catalog) if catalog is not None else 0,
+            "checksum": catalog.checksum if catalog is not None else None,
+            "reload_count": self.reload_count,
+            "last_build_seconds": self.last_build_seconds,
+            "last_loaded_at": self.last_loaded_at.isoformat() if self.last_loaded_at else None,
+        }
+
+
+class CatalogRegistry:
+    """
+    ### Per-term catalogs, loaded lazily and kept in an LRU under a memory budget
+    - term None is the default catalog (DATA_FILE); any other term is read from
+    TERM_DATA_DIR/<term_id>.json (or its compiled .dfcat)
+    - each term gets its own CatalogManager, so every term hot-reloads independently
+    - after a term loads, least recently used terms are closed until the resident
+    catalogs fit in memory_budget bytes; the default term is never evicted
+
+    #### args:
+    - default_path: the default term's json data file
+    - term_dir: directory holding the other terms' data files
+    - memory_budget: bytes the resident catalogs may use in this worker
+    """
+
+    def __init__(self, default_path: str, term_dir: str, memory_budget: int):
+        self.default_path = default_path
+        self.term_dir = term_dir
+        self.memory_budget = memory_budget
+
+        self._managers = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def path_for(self, term) -> str:
+        if term is None:
+            return self.default_path
+
+        # term ids come from requests; only plain ids map to files
+        term = str(term)
+        if not term.isalnum():
+            raise LookupError(f"Invalid term: {term}")
+
+        path = os.path.join(self.term_dir, f"{term}.json")
+        if not os.path.exists(path):
+            raise LookupError(f"No catalog found for term {term}")
+        return path
+
+    def _manager(self, term) -> tuple[CatalogManager, bool]:
+        key = None if term is None else str(term)
+
+        with self._lock:
+            manager = self._managers.get(key)
+            if manager is not None:
+                self._managers.move_to_end(key)
+                return manager, False
+
+            manager = CatalogManager(self.path_for(key))
+            self._managers[key] = manager
+            return manager, True
+
+    def manager(self, term=None) -> CatalogManager:
+        return self._manager(term)[0]
+
+    def get(self, term=None) -> CourseCatalog:
+        manager, created = self._manager(term)
+        catalog = manager.snapshot()
+
+        # only a newly loaded term can push us over the budget
+        if created:
+            self._enforce_budget()
+        return catalog
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            managers = list(self._managers.values())
+        return sum(manager.memory_estimate() for manager in managers)
+
+    def _enforce_budget(self):
+        with self._lock:
+            sizes = {key: manager.memory_estimate() for key, manager in self._managers.items()}
+            total = sum(sizes.values())
+
+            # oldest first; never drop the default term or the one just used (the newest)
+            for key in list(self._managers)[:-1]:
+                if total <= self.memory_budget:
+                    break
+                if key is None:
+                    continue
+
+                self._managers.pop(key).close()
+                total -= sizes[key]
+                self.evictions += 1
+                logger.info(f"Evicted catalog for term {key} ({sizes[key] / 1e6:.1f}MB) to stay under budget")
+
+    def stats(self) -> dict:
+        with self._lock:
+            managers = list(self._managers.items())
+        return {
+            "memory_budget": self.memory_budget,
+            "resident_bytes": sum(manager.memory_estimate() for _, manager in managers),
+            "evictions": self.evictions,
+            "terms": {("default" if key is None else key): manager.stats() for key, manager in managers},
+        }
+
+
+# one registry per process; every request reads its term's current snapshot
+catalog_registry = CatalogRegistry(
+    DATA_FILE, TERM_DATA_DIR, memory_budget=int(CATALOG_MEMORY_BUDGET_MB * 1024 * 1024)
+)
+
+
+def get_catalog(term=None) -> CourseCatalog:
+    """
+    ### returns the current CourseCatalog snapshot for a term (None = the DATA_FILE term)
+    grab it once per request and pass it along so the whole request sees
+    one consistent catalog even if a reload lands halfway through
+
+    raises LookupError when there is no catalog for the term
+    """
+    return catalog_registry.get(term)
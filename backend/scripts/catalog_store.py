@@ -0,0 +1,277 @@
+import os
+import mmap
+import json
+import struct
+import shutil
+import tempfile
+import numpy as np
+
+"""
+Compiled catalog format (.dfcat) so gunicorn workers don't each parse and hold
+their own copy of the json catalog. The file is memory-mapped read-only, so every
+worker on the box shares the same page cache pages for the columns.
+
+Layout (little endian, every block starts on an 8 byte boundary):
+    magic      8 bytes  b"DFCAT\\x00\\x00\\x01"
+    header_len 4 bytes  uint32
+    header     json     {"rows", "meta", "columns": {name: {"dtype", "offset", "count"}}}
+    columns    raw arrays referenced by the header offsets
+
+Strings live in one de-duplicated string table (the "strings_offsets" and
+"strings_blob" columns); string columns are uint32 indexes into it with
+NULL_STRING standing in for json null.
+"""
+
+MAGIC = b"DFCAT\x00\x00\x01"
+NULL_STRING = 0xFFFFFFFF
+ALIGNMENT = 8
+
+
+def compiled_path(json_path: str) -> str:
+    """
+    ### where the compiled catalog for a json data file lives (right next to it)
+    """
+    return os.path.splitext(json_path)[0] + ".dfcat"
+
+
+class StringTable:
+    """
+    ### de-duplicates strings while a catalog is being compiled
+    """
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def add(self, value: str | None) -> int:
+        if value is None:
+            return NULL_STRING
+
+        position = self.index.get(value)
+        if position is None:
+            position = len(self.strings)
+            self.index[value] = position
+            self.strings.append(value)
+
+        return position
+
+    def to_columns(self) -> dict[str, np.ndarray]:
+        encoded = [string.encode("utf-8") for string in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+        np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+
+        return {
+            "strings_offsets": offsets,
+            "strings_blob": np.frombuffer(b"".join(encoded), dtype="u1"),
+        }
+
+
+def _padding(position: int) -> int:
+    return (-position) % ALIGNMENT
+
+
+class CompiledCatalogWriter:
+    """
+    ### writes a compiled catalog a batch of sections at a time
+    each column is appended to its own scratch file as batches arrive, so only
+    the string table (distinct strings) is held in memory while compiling; the
+    final file is assembled at close() then renamed into place so a worker never
+    maps a half-written file
+
+    #### args:
+    - path: .dfcat file to write
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self.strings = StringTable()
+
+        self._scratch_dir = tempfile.mkdtemp(prefix=".dfcat-", dir=os.path.dirname(os.path.abspath(path)))
+        self._columns = {}
+        self._ragged_ends = {}
+
+    def _write(self, name: str, column: np.ndarray):
+        column = np.ascontiguousarray(column)
+        entry = self._columns.get(name)
+        if entry is None:
+            entry = self._columns[name] = {
+                "file": open(os.path.join(self._scratch_dir, name), "wb"),
+                "dtype": column.dtype.str,
+                "count": 0,
+            }
+        entry["file"].write(column.tobytes())
+        entry["count"] += column.size
+
+    def append(self, rows: int, columns: dict[str, np.ndarray], ragged: dict[str, tuple] | None = None):
+        """
+        ### appends one batch of rows
+
+        #### args:
+        - rows: sections in the batch
+        - columns: column name -> 1-d numpy array (fixed width dtypes only)
+        - ragged: list column name -> (per-row lengths, flat values); stored as
+        "<name>_offsets" + "<name>_values" with offsets running across batches
+        """
+        for name, column in columns.items():
+            self._write(name, column)
+
+        for name, (lengths, values) in (ragged or {}).items():
+            end = self._ragged_ends.get(name)
+            if end is None:
+                end = 0
+                self._write(f"{name}_offsets", np.zeros(1, dtype="<u4"))
+
+            offsets = end + np.cumsum(np.asarray(lengths, dtype=np.int64))
+            self._write(f"{name}_offsets", offsets.astype("<u4"))
+            self._write(f"{name}_values", np.asarray(values, dtype="<u4"))
+            self._ragged_ends[name] = int(offsets[-1]) if len(offsets) else end
+
+        self.rows += rows
+
+    def close(self, meta: dict) -> str:
+        """
+        ### writes the header + every column into path and cleans up the scratch files
+
+        #### args:
+        - meta: small json-able dict stored in the header (ex. the source checksum)
+        """
+        for name, column in self.strings.to_columns().items():
+            self._write(name, column)
+
+        # work out the header first since every column offset depends on its size
+        layout = {}
+        offset = 0
+        for name, entry in self._columns.items():
+            entry["file"].close()
+            nbytes = entry["count"] * np.dtype(entry["dtype"]).itemsize
+            layout[name] = {"dtype": entry["dtype"], "offset": offset, "count": entry["count"]}
+            offset += nbytes + _padding(nbytes)
+
+        header = json.dumps({"rows": self.rows, "meta": meta, "columns": layout}).encode("utf-8")
+        prefix = len(MAGIC) + 4 + len(header)
+        data_start = prefix + _padding(prefix)
+
+        # offsets in the header are relative to the first column so they don't depend on the header size
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "wb") as compiled_file:
+                compiled_file.write(MAGIC)
+                compiled_file.write(struct.pack("<I", len(header)))
+                compiled_file.write(header)
+                compiled_file.write(b"\x00" * (data_start - prefix))
+
+                for name, entry in self._columns.items():
+                    with open(os.path.join(self._scratch_dir, name), "rb") as scratch:
+                        shutil.copyfileobj(scratch, compiled_file)
+                    nbytes = entry["count"] * np.dtype(entry["dtype"]).itemsize
+                    compiled_file.write(b"\x00" * _padding(nbytes))
+
+            os.replace(temp_path, self.path)
+        finally:
+            self.discard()
+
+        return self.path
+
+    def discard(self):
+        """
+        ### drops the scratch files without writing anything (ex. the source failed to parse)
+        """
+        for entry in self._columns.values():
+            entry["file"].close()
+        shutil.rmtree(self._scratch_dir, ignore_errors=True)
+
+
+class CompiledCatalog:
+    """
+    ### read-only view of a compiled catalog file
+    - columns: name -> numpy array backed directly by the mmap (no copies)
+    - strings: the decoded string table
+    - meta: header metadata written by CompiledCatalogWriter
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+        with open(path, "rb") as compiled_file:
+            self._mmap = mmap.mmap(compiled_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a compiled dragonflow catalog")
+
+        (header_len,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        header = json.loads(self._mmap[header_start:header_start + header_len])
+        prefix = header_start + header_len
+        data_start = prefix + _padding(prefix)
+
+        self.rows = header["rows"]
+        self.meta = header["meta"]
+        self.columns = {
+            name: np.frombuffer(
+                self._mmap, dtype=np.dtype(spec["dtype"]),
+                count=spec["count"], offset=data_start + spec["offset"]
+            )
+            for name, spec in header["columns"].items()
+        }
+
+        # the string table is small next to the columns; decode it once per process
+        offsets = self.columns["strings_offsets"].tolist()
+        blob = self.columns["strings_blob"].tobytes()
+        self.strings = [
+            blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)
+        ]
+
+    def string(self, index: int) -> str | None:
+        if index == NULL_STRING:
+            return None
+        return self.strings[index]
+
+    def string_column(self, name: str) -> list[str | None]:
+        return [self.string(index) for index in self.columns[name].tolist()]
+
+    def list_column(self, name: str) -> list[list[str]]:
+        """
+        ### decodes a ragged list-of-strings column stored as "<name>_offsets" + "<name>_values"
+        """
+        offsets = self.columns[f"{name}_offsets"].tolist()
+        values = [self.strings[index] for index in self.columns[f"{name}_values"].tolist()]
+        return [values[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+# round-trip equivalence check: compile DATA_FILE, map it back and compare with the json
+if __name__ == "__main__":
+    import sys
+    import time
+    from scripts.catalog import DATA_FILE, CourseCatalog, compile_catalog
+
+    source = sys.argv[1] if len(sys.argv) > 1 else DATA_FILE
+
+    with open(source) as data_file:
+        course_data = json.load(data_file)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        target = os.path.join(temp_dir, "catalog.dfcat")
+        compile_catalog(source, target)
+
+        started = time.perf_counter()
+        from_json = CourseCatalog.from_file(source)
+        json_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        from_binary = CourseCatalog.from_compiled(target)
+        binary_seconds = time.perf_counter() - started
+
+        # same sections, same order, same dicts as the raw json
+        assert [section.to_dict() for section in from_binary] == list(course_data.values())
+        assert [section.to_dict() for section in from_json] == list(course_data.values())
+        assert from_binary.checksum == from_json.checksum
+
+        # and the indexes agree for every course code and CRN
+        assert set(from_binary.codes()) == set(from_json.codes())
+        for code in from_json.codes():
+            assert [s.crn for s in from_binary.sections_for(code)] == [s.crn for s in from_json.sections_for(code)]
+        for section in from_json:
+            assert from_binary.get(section.crn).to_dict() == section.to_dict()
+
+        print(f"round trip ok: {len(from_binary)} sections")
+        print(f"json load: {json_seconds * 1000:.2f}ms | compiled load: {binary_seconds * 1000:.2f}ms")
+        print(f"json size: {os.path.getsize(source)} bytes | compiled size: {os.path.getsize(target)} bytes")
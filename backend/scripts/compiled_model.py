@@ -0,0 +1,202 @@
+import os
+import numpy as np
+
+"""
+The success model's gradient-boosted trees as plain numpy arrays.
+
+`flask model train` exports the fitted GradientBoostingClassifier next to
+its joblib artifact. Every tree's nodes go into shared arrays (feature,
+threshold, upper, children, value), with each tree's root offset. The
+course feature table becomes one float32 row per CRN.
+
+The preprocessor's one-hot instruction_type columns are folded away. Each
+CRN keeps an integer category code (in the row's last column), and a split
+on one-hot column c ("is the type c?") becomes a node that goes right when
+c - 0.5 < code <= c + 0.5. Numeric splits go right when threshold < x <=
+inf, so every node is the same comparison. A type the encoder never saw is
+code -1, which matches no column, the same as its all-zero one-hot row.
+
+Leaves point at themselves, so prediction walks all trees for all requested
+CRNs at once: one gather per tree level (three for the shipped model). Then
+it sums the learning-rate scaled leaf values onto the prior's log-odds and
+applies the logistic, as sklearn does. Features are compared as float32,
+which is what sklearn's trees see too. Results therefore match
+predict_proba to float rounding (~1e-16), without pandas or sklearn on the
+request path.
+"""
+
+# model inputs in the order the compiled feature rows store them; the last one is the instruction type code
+FEATURES = ("gpa", "course_level", "credits", "has_prereqs", "course_difficulty", "enrollment", "instruction_type")
+GPA = FEATURES.index("gpa")
+INSTRUCTION_TYPE = FEATURES.index("instruction_type")
+
+
+class CompiledModel:
+    """
+    ### a flattened GradientBoostingClassifier plus the per-CRN inputs it predicts from
+    - feature / threshold / upper / children / value: one entry per node of every tree; a node
+    sends x = row[feature] to children[1] when threshold < x <= upper, else to children[0]
+    (leaves are their own children and value is the learning-rate scaled leaf value)
+    - roots: first node of each tree; depth: deepest tree; init: the prior's log-odds
+    - crns / rows: CRN (str) and its float32 FEATURES row (gpa left 0)
+    - categories: instruction type code -> name
+    - trained_at: the joblib artifact this was exported from
+
+    #### args:
+    - see above (build with scripts.model.export_compiled_model)
+    """
+
+    ARRAYS = ("feature", "threshold", "upper", "children", "value", "roots", "features")
+
+    def __init__(self, feature, threshold, upper, children, value, roots, depth: int, init: float,
+                 crns: list[str], features, categories: list[str], trained_at: str):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+        self.children = np.asarray(children, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.depth = int(depth)
+        self.init = float(init)
+        self.crns = list(crns)
+        self.features = np.asarray(features, dtype=np.float32)
+        self.categories = list(categories)
+        self.trained_at = trained_at
+        self.rows = {crn: row for row, crn in enumerate(self.crns)}
+
+    def __len__(self):
+        return len(self.crns)
+
+    def __contains__(self, crn) -> bool:
+        return str(crn) in self.rows
+
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def gpa_thresholds(self) -> np.ndarray:
+        """
+        ### every gpa the trees split on, increasing: the model is constant between two neighbours
+        """
+        return np.unique(self.threshold[(self.feature == GPA) & np.isfinite(self.threshold)])
+
+    def raw_predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        ### log-odds of success for every float32 FEATURES row of X
+        """
+        # flat index of (row, feature) so each level is one take
+        base = (np.arange(len(X)) * X.shape[1])[:, None]
+        X = X.ravel()
+        node = np.broadcast_to(self.roots, (len(base), len(self.roots)))
+        for _ in range(self.depth):
+            x = X.take(base + self.feature[node])
+            right = (x > self.threshold[node]) & (x <= self.upper[node])
+            node = self.children[node, right.view(np.int8)]
+
+        # sklearn adds the trees one at a time; summing them at once differs only in the last bits
+        return self.init + self.value[node].sum(axis=1)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        ### probability of success for every row (what predict_proba(X)[:, 1] gives)
+        """
+        return 1.0 / (1.0 + np.exp(-self.raw_predict(X)))
+
+    def predict(self, gpa: float, crns) -> list:
+        """
+        ### success probability for each CRN at gpa, lined up with crns (None for unknown CRNs)
+        """
+        keys = [str(crn) for crn in crns]
+        rows = np.array([self.rows.get(key, -1) for key in keys], dtype=np.intp)
+        known = rows >= 0
+
+        X = self.features[rows[known]]
+        X[:, GPA] = gpa
+        values = self.predict_proba(X)
+
+        probabilities = [None] * len(keys)
+        found = iter(values.tolist())
+        for i in np.flatnonzero(known).tolist():
+            probabilities[i] = next(found)
+        return probabilities
+
+    def save(self, path: str) -> str:
+        """
+        ### writes the model as an .npz (temp file + rename, so a worker never reads half of one)
+        """
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            **{name: getattr(self, name) for name in self.ARRAYS},
+            depth=np.int64(self.depth),
+            init=np.float64(self.init),
+            crns=np.array(self.crns),
+            categories=np.array(self.categories),
+            trained_at=np.array(self.trained_at),
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledModel":
+        with np.load(path) as data:
+            return cls(
+                **{name: data[name] for name in cls.ARRAYS},
+                depth=int(data["depth"]),
+                init=float(data["init"]),
+                crns=data["crns"].tolist(),
+                categories=data["categories"].tolist(),
+                trained_at=str(data["trained_at"]),
+            )
+
+
+# compiled vs. sklearn on every CRN at many GPAs + per-request latency, and what the request path imports
+if __name__ == "__main__":
+    import sys
+    import time
+    import tempfile
+    import subprocess
+    from scripts import model
+
+    artifact = model.get_artifact(train_missing=True)
+    compiled = model.export_compiled_model(artifact)
+    crns = list(artifact["courses"]['crn'])
+
+    gpas = np.concatenate([compiled.gpa_thresholds(), np.linspace(0, 4, 401), np.random.default_rng(1).uniform(-0.5, 4.5, 300)])
+    exact = model.success_grid(artifact, gpas)
+    fast = np.array([compiled.predict(gpa, crns) for gpa in gpas]).T
+    difference = np.abs(fast - exact).max()
+    assert difference < 1e-9, difference
+    print(f"{len(crns)} CRNs x {len(gpas)} GPAs: max |compiled - predict_proba| = {difference:.2e}")
+
+    unknown = compiled.predict(3.0, [crns[0], "99999999", crns[1]])
+    assert unknown[1] is None and unknown[::2] == compiled.predict(3.0, crns[:2])
+    print(f"{compiled.roots.size} trees, {compiled.feature.size} nodes, depth {compiled.depth}, {compiled.nbytes() / 1024:.1f}KB of arrays")
+
+    def per_call(function, runs):
+        function()
+        started = time.perf_counter()
+        for _ in range(runs):
+            function()
+        return (time.perf_counter() - started) / runs * 1e6
+
+    for size in (1, 10, 50, len(crns)):
+        batch = crns[:size]
+        sklearn_us = per_call(lambda: model.predict_success_probabilities(3.1, batch), 50)
+        compiled_us = per_call(lambda: compiled.predict(3.1, batch), 1000)
+        print(f"{size:>4} CRNs: pandas + sklearn {sklearn_us:6.0f}us | compiled {compiled_us:5.0f}us ({sklearn_us / compiled_us:.0f}x)")
+
+    # a fresh interpreter predicting the way the app does, from an export, must not pull in pandas or sklearn
+    with tempfile.TemporaryDirectory() as directory:
+        path = compiled.save(os.path.join(directory, "compiled.npz"))
+        assert CompiledModel.load(path).predict(3.1, crns) == compiled.predict(3.1, crns)
+        check = (
+            "import sys; from scripts import predictor;"
+            f"print(predictor.predict_success_probabilities(3.1, {crns[:3]!r}));"
+            "print(sorted({'pandas', 'sklearn'} & set(sys.modules)))"
+        )
+        environment = dict(os.environ, COMPILED_MODEL_FILE=path, SUCCESS_TABLE="0")
+        served, imported = subprocess.run(
+            [sys.executable, "-c", check], capture_output=True, text=True, env=environment, check=True,
+        ).stdout.splitlines()
+    assert served == str(compiled.predict(3.1, crns[:3])) and imported == "[]", (served, imported)
+    print("served from the export without importing pandas or sklearn")
@@ -0,0 +1,245 @@
+from scripts.catalog import (
+    DAYS, CourseCatalog, CompiledCourseCatalog, days_to_mask, deep_bytes, get_catalog, register_derived, time_to_minutes,
+)
+
+"""
+Time conflict detection with weekly occupancy bitmasks.
+
+The week is cut into five-minute slots (288 a day, Monday first) and every
+section becomes one Python int with a bit set for each slot it meets in:
+
+    bit = day * SLOTS_PER_DAY + minute // SLOT_MINUTES
+
+start rounds down and end rounds up to a slot, and the end is exclusive, so
+back-to-back classes (10:50 end, 11:00 start) don't collide. Two sections
+conflict when their masks share a bit, i.e. one AND. Masks are built once per
+catalog snapshot; sections with no meeting time (online async) are 0 and never
+conflict with anything.
+"""
+
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+DAY_SLOTS = (1 << SLOTS_PER_DAY) - 1
+
+
+def occupancy_mask(day_mask: int, start_min: int, end_min: int) -> int:
+    """
+    ### weekly occupancy bitmask for a meeting on the days in day_mask from start to end (minutes)
+    0 when the section has no (valid) meeting time
+    """
+    if start_min < 0 or end_min <= start_min or not day_mask:
+        return 0
+
+    first = start_min // SLOT_MINUTES
+    last = -(-end_min // SLOT_MINUTES)
+    day = ((1 << (last - first)) - 1) << first
+
+    mask = 0
+    for i in range(len(DAYS)):
+        if day_mask >> i & 1:
+            mask |= day << (i * SLOTS_PER_DAY)
+    return mask
+
+
+def section_mask(section: dict) -> int:
+    """
+    ### occupancy mask of a section dict shaped like the json data (days, start_time, end_time)
+    """
+    return occupancy_mask(
+        days_to_mask(section.get("days")),
+        time_to_minutes(section.get("start_time")),
+        time_to_minutes(section.get("end_time")),
+    )
+
+
+def describe_overlap(overlap: int) -> list[dict]:
+    """
+    ### AND of two masks -> [{"day", "start", "end"}] for each day they collide on
+    """
+    collisions = []
+    for i, day in enumerate(DAYS):
+        slots = overlap >> (i * SLOTS_PER_DAY) & DAY_SLOTS
+        if not slots:
+            continue
+        first = (slots & -slots).bit_length() - 1
+        last = slots.bit_length()
+        collisions.append({
+            "day": day,
+            "start": f"{first * SLOT_MINUTES // 60:02d}:{first * SLOT_MINUTES % 60:02d}",
+            "end": f"{last * SLOT_MINUTES // 60:02d}:{last * SLOT_MINUTES % 60:02d}",
+        })
+    return collisions
+
+
+def pairwise_conflicts(masks: dict[int, int]) -> list[tuple[int, int, int]]:
+    """
+    ### (crn, crn, overlap mask) for every pair of sections whose masks intersect
+    """
+    items = [(crn, mask) for crn, mask in masks.items() if mask]
+    conflicts = []
+    for i, (crn, mask) in enumerate(items):
+        for other_crn, other_mask in items[i + 1:]:
+            overlap = mask & other_mask
+            if overlap:
+                conflicts.append((crn, other_crn, overlap))
+    return conflicts
+
+
+class OccupancyIndex:
+    """
+    ### crn -> weekly occupancy bitmask for every section of a catalog
+    sections sharing a meeting pattern share one int
+
+    #### args:
+    - catalog: catalog snapshot to index
+    """
+
+    def __init__(self, catalog: CourseCatalog):
+        if isinstance(catalog, CompiledCourseCatalog):
+            # straight from the fixed-width columns; no sections are materialized
+            columns = catalog.compiled.columns
+            rows = zip(
+                columns["crn"].tolist(), columns["day_mask"].tolist(),
+                columns["start_min"].tolist(), columns["end_min"].tolist(),
+            )
+        else:
+            rows = ((section.crn, section.day_mask, section.start_min, section.end_min) for section in catalog)
+
+        patterns = {}
+        self.masks = {}
+        for crn, day_mask, start_min, end_min in rows:
+            pattern = (day_mask, start_min, end_min)
+            if pattern not in patterns:
+                patterns[pattern] = occupancy_mask(*pattern)
+            self.masks[crn] = patterns[pattern]
+
+    def nbytes(self) -> int:
+        """
+        ### rough resident size in bytes
+        """
+        return deep_bytes(self.masks)
+
+    def __contains__(self, crn) -> bool:
+        return crn in self.masks
+
+    def mask(self, crn: int) -> int:
+        mask = self.masks.get(crn)
+        if mask is None:
+            raise LookupError(f"CRN {crn} is not in the catalog.")
+        return mask
+
+    def conflicts(self, crns) -> list[tuple[int, int, int]]:
+        """
+        ### conflicting pairs among known crns (see pairwise_conflicts)
+        """
+        return pairwise_conflicts({crn: self.masks[crn] for crn in crns if crn in self.masks})
+
+
+@register_derived("occupancy")
+def build_occupancy_index(catalog: CourseCatalog) -> OccupancyIndex:
+    return OccupancyIndex(catalog)
+
+
+def schedule_masks(entries, index: OccupancyIndex | None = None) -> tuple[dict[int, int], list]:
+    """
+    ### (crn -> mask, entries that couldn't be placed) for a schedule
+    entries are CRNs or section dicts like the json data; the catalog's mask wins when
+    it knows the CRN, otherwise a dict's own days/start_time/end_time are used
+
+    #### args:
+    - index: the catalog's OccupancyIndex (None = only use what the dicts say)
+    """
+    masks = {}
+    unknown = []
+    for entry in entries:
+        crn = entry.get("crn") if isinstance(entry, dict) else entry
+        if index is not None and crn in index.masks:
+            masks[crn] = index.masks[crn]
+        elif isinstance(entry, dict) and crn is not None:
+            masks[crn] = section_mask(entry)
+        else:
+            unknown.append(crn)
+    return masks, unknown
+
+
+def sections_from_rows(rows) -> list[dict]:
+    """
+    ### (crn, start_time, end_time, day name) rows -> section dicts section_mask can read
+    one row per meeting day the way the courses / course_days tables join (day None for no days),
+    so saved courses get checked without a catalog for their term
+    """
+    sections = {}
+    for crn, start_time, end_time, day in rows:
+        section = sections.setdefault(crn, {"crn": crn, "days": [], "start_time": start_time, "end_time": end_time})
+        if day is not None:
+            section["days"].append(day)
+    return list(sections.values())
+
+
+def conflict_report(masks: dict[int, int], unknown: list | None = None) -> dict:
+    """
+    ### {"valid": no conflicts, "conflicts": [{"crns": [a, b], "overlap": [{"day", "start", "end"}]}],
+    "unknown": [crns nobody could place]}
+    """
+    conflicts = [
+        {"crns": [crn, other_crn], "overlap": describe_overlap(overlap)}
+        for crn, other_crn, overlap in pairwise_conflicts(masks)
+    ]
+    return {"valid": not conflicts, "conflicts": conflicts, "unknown": unknown or []}
+
+
+def find_conflicts(entries, catalog: CourseCatalog | None = None, term=None) -> dict:
+    """
+    ### time conflicts in a proposed schedule (see conflict_report for what comes back)
+
+    #### args:
+    - entries: the schedule's CRNs, or section dicts with a "crn"
+    - catalog: catalog snapshot to read from; defaults to the live one
+    - term: term id whose catalog to use when no snapshot is passed (None = current term)
+    """
+    catalog = catalog or get_catalog(term)
+    return conflict_report(*schedule_masks(entries, catalog.derived("occupancy")))
+
+
+# masks vs. a direct interval comparison on every pair of real sections + check latency
+if __name__ == "__main__":
+    import time
+    import random
+    from scripts.catalog import DATA_FILE, load_catalog
+
+    catalog = load_catalog(DATA_FILE)
+    index = catalog.derived("occupancy")
+    sections = [section for section in catalog if section.start_min >= 0 and section.day_mask]
+    print(f"{len(catalog)} sections ({len(sections)} with meeting times) | "
+          f"{len(set(index.masks.values()))} distinct meeting patterns")
+
+    def slot_overlap(a, b):
+        # same five-minute rounding the masks use
+        start = max(a.start_min // SLOT_MINUTES, b.start_min // SLOT_MINUTES)
+        end = min(-(-a.end_min // SLOT_MINUTES), -(-b.end_min // SLOT_MINUTES))
+        return bool(a.day_mask & b.day_mask) and start < end
+
+    pairs = 0
+    for i, section in enumerate(sections):
+        for other in sections[i + 1:]:
+            expected = slot_overlap(section, other)
+            assert bool(index.masks[section.crn] & index.masks[other.crn]) == expected, (section, other)
+            pairs += 1
+    print(f"{pairs} section pairs: mask AND agrees with interval overlap")
+
+    # a course saved earlier, read back from the courses / course_days rows, against a new one; no catalog at all
+    saved = sections_from_rows([(90001, "12:00", "13:20", "Monday"), (90001, "12:00", "13:20", "Wednesday"), (90002, None, None, None)])
+    new = {"crn": 90003, "days": ["Wednesday"], "start_time": "13:00", "end_time": "13:50"}
+    masks, unknown = schedule_masks([new, *saved, 90004])
+    report = conflict_report(masks, unknown)
+    assert [conflict["crns"] for conflict in report["conflicts"]] == [[90003, 90001]] and unknown == [90004], report
+    assert report["conflicts"][0]["overlap"] == [{"day": "Wednesday", "start": "13:00", "end": "13:20"}], report
+    print("saved course vs. new course without a term catalog:", report["conflicts"])
+
+    rng = random.Random(1)
+    schedules = [[section.crn for section in rng.sample(sections, 6)] for _ in range(2000)]
+    started = time.perf_counter()
+    for schedule in schedules:
+        find_conflicts(schedule, catalog=catalog)
+    print(f"find_conflicts on a 6-section schedule: {(time.perf_counter() - started) / len(schedules) * 1e6:.1f}us")
+    print(find_conflicts(schedules[0], catalog=catalog))
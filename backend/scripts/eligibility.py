@@ -0,0 +1,334 @@
+import numpy as np
+from scripts.catalog import CourseCatalog, get_catalog, deep_bytes, register_derived
+from scripts.prereq_eval import PrereqEvaluator
+from scripts.prereq_graph import PrereqGraph, bitset_words
+from scripts.prereq_store import COURSE, AND, GROUP
+from scripts.search import normalize_code
+
+"""
+"What can I take next": eligibility of every course in one pass.
+
+Same answers as is_course_available (scripts/prereq_eval.py) for every course:
+    - each level of a prereqs string is read left to right the way
+      check_pre_req_list reads it ("A and B or C" is A and (B or C))
+    - a completed course only counts when its own prereqs hold, all the way down
+
+A student's completed courses become one bitmask over the prereq graph's course
+ids. Each course's prereqs are compiled ahead of time (once per catalog
+snapshot) into AND-of-OR clauses, each clause a bitmask of the courses that
+satisfy it, so
+
+    CS 260 and (MATH 201 or ENGR 231)  ->  [{CS260}, {MATH201, ENGR231}]
+
+A course is eligible when every one of its clauses shares a bit with the
+standing mask: the completed courses whose own clauses are met by the
+courses standing before them, found in one walk over the completed courses in
+topological order. Checking every clause of every course is then a single
+numpy AND over the clause matrix. Minimum grades aren't checked:
+completed courses are passed ones. A prereq cycle only stands with support
+from outside the cycle.
+"""
+
+# a course whose prereqs would expand past this many clauses is evaluated from its AST instead
+MAX_CLAUSES_PER_COURSE = 64
+
+
+def to_clauses(node: tuple, limit: int = MAX_CLAUSES_PER_COURSE) -> list[frozenset] | None:
+    """
+    ### group-free AST -> AND of OR clauses (each a frozenset of course codes)
+    None when the expansion would need more than limit clauses
+    """
+    if node[0] == COURSE:
+        return [frozenset((node[1],))]
+
+    child_clauses = [to_clauses(child, limit) for child in node[1]]
+    if any(clauses is None for clauses in child_clauses):
+        return None
+
+    if node[0] == AND:
+        clauses = [clause for clauses in child_clauses for clause in clauses]
+    else:
+        # or of ands: distribute, one clause per pick of a clause from every child
+        clauses = [frozenset()]
+        for child in child_clauses:
+            clauses = list({clause | other for clause in clauses for other in child})
+            if len(clauses) > limit:
+                return None
+
+    clauses = list(dict.fromkeys(clauses))
+    return clauses if len(clauses) <= limit else None
+
+
+def level_ast(level: tuple) -> tuple:
+    """
+    ### a compiled level (prereq_eval.compile_levels) -> group-free AST with the same answers
+    check_pre_req_list stops at the first "and" miss or "or" hit, so a level reads as a right fold
+    """
+    def operand(kind, payload):
+        return level_ast(payload) if kind == GROUP else (COURSE, payload)
+
+    operands, operators = level
+    node = operand(*operands[-1])
+    for (kind, payload), operator in zip(reversed(operands[:-1]), reversed(operators)):
+        node = (operator, (operand(kind, payload), node))
+    return node
+
+
+def satisfied(node: tuple | None, completed: set[str]) -> bool:
+    """
+    ### plain recursive check of a group-free AST against completed course codes
+    """
+    if node is None:
+        return True
+    if node[0] == COURSE:
+        return node[1] in completed
+    if node[0] == AND:
+        return all(satisfied(child, completed) for child in node[1])
+    return any(satisfied(child, completed) for child in node[1])
+
+
+class EligibilityIndex:
+    """
+    ### every course's prereqs compiled to clause bitmasks over the prereq graph's course ids
+    - asts: per course id, its prereqs as level_ast reads them (None without prereqs)
+    - clauses: (clauses x words) uint64 matrix; clause_course: the course id each clause belongs to
+    - offered: bool per course id, True when the course has sections in the catalog
+    - fallback: course ids too big to expand into clauses (checked from their AST)
+
+    #### args:
+    - graph: the catalog's PrereqGraph
+    - offered_codes: course codes with sections this term
+    - evaluator: the catalog's PrereqEvaluator (its compiled levels are what's turned into clauses)
+    """
+
+    def __init__(self, graph: PrereqGraph, offered_codes, evaluator: PrereqEvaluator):
+        self.graph = graph
+        self.words = bitset_words(len(graph))
+        self.offered = np.zeros(len(graph), dtype=bool)
+        self.offered[[graph.index[code] for code in offered_codes]] = True
+
+        levels = evaluator.levels
+        self.asts = [level_ast(levels[code]) if code in levels else None for code in graph.codes]
+
+        rows = []
+        clause_course = []
+        self.fallback = []
+        # the same clauses as course id tuples, for checking a few courses without numpy
+        self.clause_ids = [()] * len(graph)
+        for course_id, ast in enumerate(self.asts):
+            if ast is None:
+                continue
+
+            clauses = to_clauses(ast)
+            if clauses is None:
+                self.fallback.append(course_id)
+                continue
+
+            for clause in clauses:
+                rows.append(self.mask(clause)[0])
+                clause_course.append(course_id)
+            self.clause_ids[course_id] = tuple(tuple(sorted(graph.index[code] for code in clause)) for clause in clauses)
+
+        # topological position: walking completed courses in this order stands each one in a single pass
+        self.position = [0] * len(graph)
+        for position, course_id in enumerate(graph.order):
+            self.position[course_id] = position
+
+        self.clauses = np.array(rows, dtype=np.uint64).reshape(len(rows), self.words)
+        self.clause_course = np.array(clause_course, dtype=np.int64)
+        self._fallback = set(self.fallback)
+
+    def nbytes(self) -> int:
+        """
+        ### rough resident size in bytes
+        """
+        return deep_bytes(self.asts, self.clause_ids, self.position, self.offered, self.clauses, self.clause_course, self.fallback, self._fallback)
+
+    def mask(self, codes) -> tuple[np.ndarray, list[str]]:
+        """
+        ### course codes -> (bitmask row, codes the catalog has never heard of)
+        """
+        row = np.zeros(self.words, dtype=np.uint64)
+        unknown = []
+        for code in codes:
+            course_id = self.graph.index.get(code)
+            if course_id is None:
+                unknown.append(code)
+            else:
+                row[course_id // 64] |= np.uint64(1) << np.uint64(course_id % 64)
+        return row, unknown
+
+    def meets(self, course_id: int, standing: set[int]) -> bool:
+        """
+        ### are course_id's prereqs met by the standing course ids
+        """
+        if course_id in self._fallback:
+            return satisfied(self.asts[course_id], {self.graph.codes[other] for other in standing})
+        return all(any(other in standing for other in clause) for clause in self.clause_ids[course_id])
+
+    def standing_ids(self, completed_ids) -> set[int]:
+        """
+        ### the completed course ids that count: each one's own prereqs are met by the others that count
+        walked prereqs first; with cycles the walk repeats until nothing more joins (the least
+        fixpoint, so a cycle needs support from outside it)
+        """
+        standing = set()
+        pending = sorted(completed_ids, key=self.position.__getitem__)
+        while pending:
+            left = []
+            for course_id in pending:
+                if self.meets(course_id, standing):
+                    standing.add(course_id)
+                else:
+                    left.append(course_id)
+            if not self.graph.cycles or len(left) == len(pending):
+                break
+            pending = left
+        return standing
+
+    def standing(self, completed: np.ndarray) -> np.ndarray:
+        """
+        ### standing_ids as a bitmask row
+        """
+        ids = np.array(sorted(self.standing_ids(self.ids_of(completed).tolist())), dtype=np.uint64)
+        row = np.zeros(self.words, dtype=np.uint64)
+        np.bitwise_or.at(row, ids // np.uint64(64), np.uint64(1) << (ids % np.uint64(64)))
+        return row
+
+    def evaluate(self, completed: np.ndarray) -> np.ndarray:
+        """
+        ### bool per course id: are its prereqs met by the completed bitmask (as is_course_available sees it)
+        """
+        standing = self.standing(completed)
+        hits = np.bitwise_and(self.clauses, standing).any(axis=1)
+
+        eligible = np.ones(len(self.graph), dtype=bool)
+        eligible[self.clause_course[~hits]] = False
+
+        if self.fallback:
+            standing_codes = self.codes_of(standing)
+            for course_id in self.fallback:
+                eligible[course_id] = satisfied(self.asts[course_id], standing_codes)
+
+        return eligible
+
+    def ids_of(self, completed: np.ndarray) -> np.ndarray:
+        """
+        ### bitmask row -> the course ids set in it
+        """
+        return np.flatnonzero(np.unpackbits(completed.view(np.uint8), bitorder="little")[:len(self.graph)])
+
+    def codes_of(self, completed: np.ndarray) -> set[str]:
+        """
+        ### bitmask row -> the course codes set in it
+        """
+        return {self.graph.codes[course_id] for course_id in self.ids_of(completed)}
+
+
+@register_derived("eligibility")
+def build_eligibility_index(catalog: CourseCatalog) -> EligibilityIndex:
+    return EligibilityIndex(catalog.derived("prereq_graph"), catalog.codes(), catalog.derived("prereq_evaluator"))
+
+
+def eligible_courses(
+        completed_courses: list[str],
+        catalog: CourseCatalog | None = None,
+        term=None,
+        include_completed: bool = False,
+    ) -> dict:
+    """
+    ### every course offered in the catalog whose prereqs the completed courses satisfy
+    returns {"eligible": [course codes, sorted], "unknown": [completed codes not in the catalog]}
+
+    #### args:
+    - completed_courses: course codes the student has passed ex. ["CS171", "cs 172"]
+    - catalog: catalog snapshot to read from; defaults to the live one
+    - term: term id whose catalog to use when no snapshot is passed (None = current term)
+    - include_completed: also list courses the student already completed
+    """
+    catalog = catalog or get_catalog(term)
+    index = catalog.derived("eligibility")
+
+    codes = [normalize_code(code) for code in completed_courses]
+    completed, unknown = index.mask(codes)
+
+    # a completed course is always "available" to is_course_available; it's listed only on request
+    done = np.unpackbits(completed.view(np.uint8), bitorder="little")[:len(index.graph)].astype(bool)
+    eligible = index.evaluate(completed) & index.offered
+    if include_completed:
+        eligible |= done & index.offered
+    else:
+        eligible &= ~done
+
+    return {
+        "eligible": [index.graph.codes[course_id] for course_id in np.flatnonzero(eligible)],
+        "unknown": unknown,
+    }
+
+
+# differential checks against a plain AST walk and is_course_available + one pass vs. one call per course
+if __name__ == "__main__":
+    import time
+    import random
+    from scripts.catalog import DATA_FILE, load_catalog
+    from scripts.prereqs import is_course_available
+    from scripts.prereq_store import PrereqStore
+
+    catalog = load_catalog(DATA_FILE)
+    index = catalog.derived("eligibility")
+    graph = index.graph
+    print(f"{len(graph)} courses -> {len(index.clauses)} clauses ({len(index.fallback)} evaluated from their AST)")
+    print("after CS171, CS172, MATH121:", eligible_courses(["CS171", "cs 172", "MATH121", "NOPE999"], catalog=catalog))
+
+    rng = random.Random(11)
+    for _ in range(2000):
+        completed = index.mask(rng.sample(graph.codes, rng.randint(0, len(graph.codes))))[0]
+        eligible = index.evaluate(completed)
+        standing = index.codes_of(index.standing(completed))
+        for course_id, ast in enumerate(index.asts):
+            assert eligible[course_id] == satisfied(ast, standing), graph.codes[course_id]
+    print("2000 random completed sets: bitset evaluation identical to the AST walk")
+
+    # the bulk answer is is_course_available's answer, for every offered course
+    offered = sorted(catalog.codes())
+    trials = 0
+    for _ in range(300):
+        # half the sets small (a few early courses), where a completed course's own prereqs often fail
+        size = rng.randint(0, 12) if rng.random() < 0.5 else rng.randint(0, len(graph.codes))
+        completed = rng.sample(graph.codes, size)
+        eligible = set(eligible_courses(completed, catalog=catalog, include_completed=True)["eligible"])
+        for code in offered:
+            assert (code in eligible) == is_course_available(code, completed, catalog=catalog), (code, completed)
+            trials += 1
+    print(f"{trials} random (course, completed courses) pairs: eligible_courses identical to is_course_available")
+
+    completed = ["CS171", "CS172", "CS260", "CS265", "MATH121", "MATH122", "INFO101", "INFO110"]
+    codes = sorted(catalog.codes())
+    runs = 5
+
+    started = time.perf_counter()
+    for _ in range(runs):
+        for code in codes:
+            is_course_available(code, completed, catalog=catalog)
+    per_course_ms = (time.perf_counter() - started) / runs * 1000
+
+    started = time.perf_counter()
+    for _ in range(runs * 100):
+        eligible_courses(completed, catalog=catalog)
+    batch_ms = (time.perf_counter() - started) / (runs * 100) * 1000
+    print(f"{len(codes)} courses | is_course_available per course: {per_course_ms:.2f}ms | one bitset pass: {batch_ms:.3f}ms")
+
+    # random catalog-sized graph (same shape as prereq_graph's benchmark)
+    asts = {}
+    for i in range(10_000):
+        earlier = rng.sample(range(i), min(i, rng.randint(0, 4)))
+        leaves = [("course", f"C{j:05d}", "C") for j in earlier]
+        asts[f"C{i:05d}"] = None if not leaves else leaves[0] if len(leaves) == 1 else (rng.choice(["and", "or"]), tuple(leaves))
+    big_store = PrereqStore(asts)
+    big = EligibilityIndex(PrereqGraph(big_store), asts.keys(), PrereqEvaluator(big_store))
+    completed = big.mask(rng.sample(sorted(asts), 3000))[0]
+
+    started = time.perf_counter()
+    for _ in range(100):
+        big.evaluate(completed)
+    print(f"10000 courses ({len(big.clauses)} clauses) | one bitset pass: {(time.perf_counter() - started) / 100 * 1000:.2f}ms")
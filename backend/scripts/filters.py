@@ -0,0 +1,321 @@
+import numpy as np
+from scripts.catalog import CourseCatalog, CompiledCourseCatalog, get_catalog, deep_bytes, register_derived
+
+"""
+Vectorized section filters for /auth/get-interests.
+
+Every filter the endpoint supports becomes a boolean numpy mask over the whole
+catalog (one row per section, in catalog order) and masks are combined with
+& and |. The columns are built once per catalog snapshot, so a request never
+re-splits start times or re-parses max_enroll strings.
+"""
+
+# class_time filter -> [start, end) window on the section's start minute
+TIME_WINDOWS = {
+    "Morning": (8 * 60, 12 * 60),     # 8 <= start hour < 12
+    "Afternoon": (12 * 60, 16 * 60),  # 12 <= start hour < 16
+    "Evening": (16 * 60, 23 * 60),    # 16 <= start hour <= 22
+}
+
+# class_size filter -> [low, high] on max_enroll
+SIZE_LIMITS = {
+    "Small": (0, 50),
+    "Large": (51, np.iinfo(np.int32).max),
+}
+
+# instruction-method enum (lowercased scraped value -> code)
+METHOD_OTHER = 0
+METHOD_FACE_TO_FACE = 1
+METHOD_ONLINE_ASYNC = 2
+METHOD_ONLINE_SYNC = 3
+INSTRUCTION_METHODS = {
+    "face to face": METHOD_FACE_TO_FACE,
+    "online-asynchronous": METHOD_ONLINE_ASYNC,
+    "online-synchronous": METHOD_ONLINE_SYNC,
+}
+
+# instruction_type filter -> the one method it keeps
+INSTRUCTION_FILTERS = {
+    "online": METHOD_ONLINE_ASYNC,
+    "in person": METHOD_FACE_TO_FACE,
+}
+
+
+class FilterColumns:
+    """
+    ### numpy columns (one row per section) the get-interests filters run on
+    - crn, start_min, end_min, capacity (-1 = no/invalid time or size)
+    - method: instruction-method enum
+    - subject / number: integer codes; subject_codes / number_codes map the
+    upper-cased string to the codes that spell it
+    """
+
+    def __init__(self, catalog: CourseCatalog):
+        if isinstance(catalog, CompiledCourseCatalog):
+            # the compiled file already has these as fixed-width columns; no copies
+            columns = catalog.compiled.columns
+            strings = catalog.compiled.strings
+            self.crn = columns["crn"]
+            self.start_min = columns["start_min"]
+            self.end_min = columns["end_min"]
+            self.capacity = columns["capacity"]
+            method_ids = columns["instruction_method"]
+            self.subject = columns["subject_code"]
+            self.number = columns["course_number"]
+
+        else:
+            sections = catalog.sections
+            string_ids = {}
+
+            def encode(values):
+                return np.array(
+                    [string_ids.setdefault(value, len(string_ids)) for value in values], dtype=np.uint32
+                )
+
+            self.crn = np.array([section.crn for section in sections], dtype=np.int32)
+            self.start_min = np.array([section.start_min for section in sections], dtype=np.int16)
+            self.end_min = np.array([section.end_min for section in sections], dtype=np.int16)
+            self.capacity = np.array([section.capacity for section in sections], dtype=np.int32)
+            method_ids = encode(section.instruction_method for section in sections)
+            self.subject = encode(section.subject_code for section in sections)
+            self.number = encode(section.course_number for section in sections)
+            strings = list(string_ids)
+
+        # only the distinct values of each column need their strings normalized
+        distinct_methods, method_rows = np.unique(method_ids, return_inverse=True)
+        method_enum = np.array([
+            INSTRUCTION_METHODS.get(_string(strings, string_id).lower(), METHOD_OTHER)
+            for string_id in distinct_methods.tolist()
+        ], dtype=np.uint8)
+        self.method = method_enum[method_rows]
+
+        self.subject_codes = _codes_by_name(self.subject, strings)
+        self.number_codes = _codes_by_name(self.number, strings)
+
+    def nbytes(self) -> int:
+        """
+        ### rough resident size in bytes; columns viewing a compiled catalog's mapped file aren't counted
+        """
+        return deep_bytes(self.crn, self.start_min, self.end_min, self.capacity, self.method, self.subject, self.number, self.subject_codes, self.number_codes)
+
+    def __len__(self):
+        return len(self.crn)
+
+
+def _string(strings: list[str], string_id: int) -> str:
+    # compiled catalogs use 0xFFFFFFFF for json null
+    return strings[string_id] if string_id < len(strings) else ""
+
+
+def _codes_by_name(ids: np.ndarray, strings: list[str]) -> dict[str, np.ndarray]:
+    codes = {}
+    for string_id in np.unique(ids).tolist():
+        codes.setdefault(_string(strings, string_id).upper(), []).append(string_id)
+    return {name: np.array(found, dtype=ids.dtype) for name, found in codes.items()}
+
+
+@register_derived("filter_columns")
+def build_filter_columns(catalog: CourseCatalog) -> FilterColumns:
+    return FilterColumns(catalog)
+
+
+def _as_list(value) -> list:
+    return value if isinstance(value, list) else [value]
+
+
+def split_course_code(course: str) -> tuple[str | None, str | None]:
+    """
+    ### "cs172 " -> ("CS", "172"); (None, None) if there's no course number in it
+    """
+    course = course.strip().upper()
+    for i, char in enumerate(course):
+        if char.isdigit():
+            return course[:i], course[i:]
+    return None, None
+
+
+def filter_mask(
+        columns: FilterColumns,
+        class_time=None,
+        class_size=None,
+        instruction_type: str | None = None,
+        course: str | None = None,
+    ) -> np.ndarray:
+    """
+    ### boolean mask of the sections that pass every requested filter
+    each filter is skipped when it's empty, exactly like the old per-section loop
+
+    #### args:
+    - class_time: "Morning" | "Afternoon" | "Evening" or a list of them (OR'd)
+    - class_size: "Small" | "Large" or a list of them (OR'd)
+    - instruction_type: "Online" | "In Person"
+    - course: course code ex. "CS172"
+    """
+    mask = np.ones(len(columns), dtype=bool)
+
+    if course:
+        subject, number = split_course_code(course)
+        subject_ids = columns.subject_codes.get(subject, ())
+        number_ids = columns.number_codes.get(number, ())
+        mask &= np.isin(columns.subject, subject_ids) & np.isin(columns.number, number_ids)
+
+    if class_time:
+        time_mask = np.zeros(len(columns), dtype=bool)
+        for time_filter in _as_list(class_time):
+            window = TIME_WINDOWS.get(time_filter)
+            if window is not None:
+                time_mask |= (columns.start_min >= window[0]) & (columns.start_min < window[1])
+        mask &= time_mask
+
+    if class_size:
+        size_mask = np.zeros(len(columns), dtype=bool)
+        for size_filter in _as_list(class_size):
+            limits = SIZE_LIMITS.get(size_filter)
+            if limits is not None:
+                size_mask |= (columns.capacity >= limits[0]) & (columns.capacity <= limits[1])
+        mask &= size_mask
+
+    if instruction_type:
+        method = INSTRUCTION_FILTERS.get(instruction_type.lower())
+        if method is not None:
+            mask &= columns.method == method
+
+    return mask
+
+
+def filter_sections(catalog: CourseCatalog | None = None, term=None, **filters) -> list[int]:
+    """
+    ### CRNs (in catalog order) of every section matching the get-interests filters
+    see filter_mask for the accepted filters
+
+    #### args:
+    - catalog: catalog snapshot to filter; defaults to the live one for term
+    - term: term id whose catalog to use when no snapshot is passed (None = current term)
+    """
+    catalog = catalog or get_catalog(term)
+    columns = catalog.derived("filter_columns")
+    return columns.crn[filter_mask(columns, **filters)].tolist()
+
+
+def filter_sections_loop(catalog: CourseCatalog, class_time=None, class_size=None, instruction_type=None, course=None) -> list[int]:
+    """
+    ### the original per-section get-interests loop; kept as the reference for the equivalence check
+    """
+    subject_match, course_number_match = split_course_code(course) if course else (None, None)
+    matching_crns = []
+
+    for section in catalog:
+        match = True
+
+        if course:
+            if section.subject_code.upper() != subject_match or section.course_number.upper() != course_number_match:
+                match = False
+
+        if class_time:
+            if not section.start_time:
+                match = False
+            else:
+                try:
+                    start_hour = int(section.start_time.split(":")[0])
+                    time_match = False
+                    for time_filter in _as_list(class_time):
+                        if time_filter == "Morning" and (8 <= start_hour < 12):
+                            time_match = True
+                            break
+                        elif time_filter == "Afternoon" and (12 <= start_hour < 16):
+                            time_match = True
+                            break
+                        elif time_filter == "Evening" and (16 <= start_hour <= 22):
+                            time_match = True
+                            break
+                    if not time_match:
+                        match = False
+                except (ValueError, AttributeError):
+                    match = False
+
+        if match and class_size:
+            if not section.max_enroll:
+                match = False
+            else:
+                try:
+                    enrollment = int(section.max_enroll)
+                    size_match = False
+                    for size_filter in _as_list(class_size):
+                        if size_filter == "Large" and enrollment > 50:
+                            size_match = True
+                            break
+                        elif size_filter == "Small" and enrollment <= 50:
+                            size_match = True
+                            break
+                    if not size_match:
+                        match = False
+                except ValueError:
+                    match = False
+
+        if match and instruction_type:
+            instruction_method = section.instruction_method.lower()
+            requested_type = instruction_type.lower()
+            if requested_type == "online" and instruction_method != "online-asynchronous":
+                match = False
+            elif requested_type == "in person" and instruction_method != "face to face":
+                match = False
+
+        if match:
+            matching_crns.append(section.crn)
+
+    return matching_crns
+
+
+def synthetic_catalog(base: CourseCatalog, size: int) -> CourseCatalog:
+    """
+    ### repeats base's sections (new CRNs and subject codes) until there are size of them
+    """
+    sections = []
+    base_sections = base.sections
+    for i in range(size):
+        details = base_sections[i % len(base_sections)].to_dict()
+        copy_number = i // len(base_sections)
+        details["crn"] = 100000 + i
+        if copy_number:
+            details["subject_code"] += chr(65 + copy_number % 26) + chr(65 + copy_number // 26 % 26)
+        sections.append(details)
+    return CourseCatalog.from_dict({str(details["crn"]): details for details in sections})
+
+
+# equivalence check against the old loop + benchmark on a synthetic 50k-section catalog
+if __name__ == "__main__":
+    import time
+    import itertools
+    from scripts.catalog import DATA_FILE, load_catalog
+
+    base = load_catalog(DATA_FILE)
+    big = synthetic_catalog(base, 50_000)
+
+    times = [None, "Morning", "Evening", ["Morning", "Afternoon"], ["Evening", "Night"], []]
+    sizes = [None, "Small", "Large", ["Small", "Large"]]
+    methods = [None, "Online", "In Person", "online", "Hybrid"]
+    courses = [None, "CS172", " cs 172", "info101", "UNIVCI101", "CS", "CSAB172"]
+
+    for catalog in (base, big):
+        checked = 0
+        for class_time, class_size, instruction_type, course in itertools.product(times, sizes, methods, courses):
+            filters = dict(class_time=class_time, class_size=class_size, instruction_type=instruction_type, course=course)
+            assert filter_sections(catalog, **filters) == filter_sections_loop(catalog, **filters), filters
+            checked += 1
+        print(f"{len(catalog)} sections: {checked} filter combinations identical to the loop")
+
+    filters = dict(class_time=["Morning", "Evening"], class_size="Small", instruction_type="In Person")
+    big.derived("filter_columns")
+    runs = 20
+
+    started = time.perf_counter()
+    for _ in range(runs):
+        filter_sections_loop(big, **filters)
+    loop_ms = (time.perf_counter() - started) / runs * 1000
+
+    started = time.perf_counter()
+    for _ in range(runs):
+        filter_sections(big, **filters)
+    vector_ms = (time.perf_counter() - started) / runs * 1000
+
+    print(f"50k sections | loop: {loop_ms:.2f}ms | vectorized: {vector_ms:.2f}ms | speedup: {loop_ms / vector_ms:.1f}x")
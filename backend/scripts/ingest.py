@@ -0,0 +1,147 @@
+import os
+import time
+from scripts.json_stream import JsonRecordStream
+from scripts.catalog_store import CompiledCatalogWriter, compiled_path
+from scripts.catalog import INGEST_BATCH_SIZE, CourseCatalog, batched, iter_sections, section_columns
+
+"""
+Streaming ingestion of a freshly scraped catalog.
+
+The json is read one record at a time (scripts/json_stream.py), every record is
+validated and normalized into a Section (times -> minutes, credits -> float,
+days -> bitmask) and the sections are handed to each sink in bounded batches.
+Nothing keeps the whole file or a dict per section around, so peak memory is set
+by the batch size rather than by how big the catalog is.
+
+A sink is any object with:
+    write(batch)     called with each list of Sections
+    close(report)    called once after the last batch with the finished report
+    abort()          called instead of close() when ingestion fails part way
+"""
+
+# how many rejected records get their error kept in the report
+MAX_REPORTED_ERRORS = 20
+
+
+class CompiledSink:
+    """
+    ### writes the sections into a compiled catalog (.dfcat) as they stream past
+
+    #### args:
+    - out_path: compiled catalog to write
+    """
+    def __init__(self, out_path: str):
+        self.out_path = out_path
+        self.writer = CompiledCatalogWriter(out_path)
+
+    def write(self, batch):
+        columns, ragged = section_columns(batch, self.writer.strings)
+        self.writer.append(len(batch), columns, ragged)
+
+    def close(self, report: dict):
+        self.writer.close(meta={"source_checksum": report["checksum"], "source": os.path.basename(report["source"])})
+
+    def abort(self):
+        self.writer.discard()
+
+
+class CatalogSink:
+    """
+    ### collects the sections into an in-memory CourseCatalog (ex. for tests and benchmarks)
+    unlike the other sinks this one grows with the catalog, since the catalog is the result
+    """
+    def __init__(self):
+        self.sections = []
+        self.catalog = None
+
+    def write(self, batch):
+        self.sections.extend(batch)
+
+    def close(self, report: dict):
+        self.catalog = CourseCatalog(self.sections, checksum=report["checksum"])
+        self.sections = []
+
+    def abort(self):
+        self.sections = []
+
+
+def ingest(path: str, sinks: list, batch_size: int = INGEST_BATCH_SIZE) -> dict:
+    """
+    ### streams a scraped json catalog through every sink in batches of batch_size
+    returns a report: source, checksum, sections, batches, rejected (count), errors (first few), seconds
+
+    #### args:
+    - path: scraped json data file
+    - sinks: CompiledSink, CatalogSink, app.utils.catalog_sync.CatalogSyncSink, ...
+    - batch_size: sections per batch
+    """
+    started = time.perf_counter()
+    stream = JsonRecordStream(path)
+    report = {"source": path, "checksum": None, "sections": 0, "batches": 0, "rejected": 0, "errors": []}
+
+    def reject(key, error):
+        report["rejected"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append(f"{key}: {error}")
+
+    try:
+        for batch in batched(iter_sections(stream, on_reject=reject), batch_size):
+            for sink in sinks:
+                sink.write(batch)
+            report["sections"] += len(batch)
+            report["batches"] += 1
+
+    except Exception:
+        for sink in sinks:
+            sink.abort()
+        raise
+
+    report["checksum"] = stream.checksum
+    for sink in sinks:
+        sink.close(report)
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+# peak memory of json.load vs streaming ingestion as the catalog grows (tracemalloc)
+if __name__ == "__main__":
+    import json
+    import tempfile
+    import tracemalloc
+    from scripts.catalog import DATA_FILE, load_catalog
+    from scripts.filters import synthetic_catalog
+
+    base = load_catalog(DATA_FILE)
+
+    # same sections, same order as the old json.load path
+    catalog_sink = CatalogSink()
+    ingest(DATA_FILE, [catalog_sink])
+    with open(DATA_FILE) as data_file:
+        assert [section.to_dict() for section in catalog_sink.catalog] == list(json.load(data_file).values())
+    print(f"{len(catalog_sink.catalog)} sections ingested identically to json.load")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in (10_000, 50_000, 100_000):
+            source = os.path.join(temp_dir, f"catalog_{size}.json")
+            with open(source, "w") as data_file:
+                json.dump({str(section.crn): section.to_dict() for section in synthetic_catalog(base, size)}, data_file)
+
+            tracemalloc.start()
+            with open(source) as data_file:
+                json.load(data_file)
+            json_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            tracemalloc.start()
+            ingest(source, [CompiledSink(compiled_path(source))])
+            stream_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            # timed separately since tracemalloc slows everything down
+            report = ingest(source, [CompiledSink(compiled_path(source))])
+            assert len(CourseCatalog.from_compiled(compiled_path(source))) == size == report["sections"]
+            print(
+                f"{size} sections ({os.path.getsize(source) / 1e6:.1f}MB) | json.load peak: {json_peak / 1e6:.1f}MB"
+                f" | streaming ingest peak: {stream_peak / 1e6:.1f}MB | ingest time: {report['seconds']}s"
+            )
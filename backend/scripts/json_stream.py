@@ -0,0 +1,115 @@
+import json
+import codecs
+import hashlib
+
+"""
+Incremental reader for the scraped catalog json.
+
+The scraper writes one big object ({"<crn>": {...section...}, ...}) or an array
+of sections. json.load materializes all of it at once; this reader pulls the file
+in fixed-size chunks and hands back one section at a time, so memory used while
+reading stays flat no matter how big the catalog is.
+"""
+
+CHUNK_SIZE = 1 << 16
+_WHITESPACE = " \t\n\r"
+
+
+class JsonRecordStream:
+    """
+    ### iterates the records of a top-level json object (values) or array
+    - records: yields (key, record) pairs; key is None for arrays
+    - checksum: sha1 of the raw bytes, available once the stream is exhausted
+
+    #### args:
+    - path: json file to read
+    - chunk_size: bytes read from disk at a time
+    """
+
+    def __init__(self, path: str, chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.checksum = None
+
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._hash = hashlib.sha1()
+        self._file = None
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """
+        ### appends the next chunk to the buffer; False once the file is exhausted
+        """
+        if self._eof:
+            return False
+
+        chunk = self._file.read(self.chunk_size)
+        self._hash.update(chunk)
+
+        # drop what's already been consumed so the buffer never grows past a chunk or two
+        self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(chunk, final=not chunk)
+        self._pos = 0
+
+        if not chunk:
+            self._eof = True
+            self.checksum = self._hash.hexdigest()
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError(f"{self.path}: unexpected end of json")
+
+    def _expect(self, *chars: str) -> str:
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(f"{self.path}: expected one of {chars} but found {char!r}")
+        self._pos += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+
+                # a value running right up to the end of the buffer could be cut off (ex. a number)
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+
+            self._fill()
+
+    def records(self):
+        with open(self.path, "rb") as self._file:
+            opening = self._expect("{", "[")
+            closing = "}" if opening == "{" else "]"
+
+            if self._peek() == closing:
+                self._pos += 1
+            else:
+                while True:
+                    key = None
+                    if opening == "{":
+                        key = self._value()
+                        self._expect(":")
+
+                    yield key, self._value()
+
+                    if self._expect(",", closing) == closing:
+                        break
+
+            # read to the end so the checksum covers the whole file
+            while self._fill():
+                pass
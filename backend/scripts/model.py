@@ -1,7 +1,12 @@
 import json
 import os
+import logging
 import subprocess
+import threading
+from datetime import datetime, timezone
+import joblib
 import numpy as np
+import sklearn
 from dotenv import load_dotenv
 import pandas as pd
 from sklearn.ensemble import GradientBoostingClassifier
@@ -9,16 +14,47 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.metrics import accuracy_score, classification_report
+from scripts.synthetic import generate_synthetic_data, iter_synthetic_data
+from scripts import success_table
+from scripts import predictor
+from scripts.predictor import ARTIFACT_VERSION, MODEL_FILE, COMPILED_FILE, TABLE_FILE
+from scripts.compiled_model import CompiledModel, FEATURES, GPA, INSTRUCTION_TYPE
+
+"""
+Course success model.
+
+Training (`flask model train`) reads the catalog, builds the course feature
+table, generates synthetic students, fits the model and writes everything a
+prediction needs (the fitted ColumnTransformer, the model and the feature
+table) to one versioned joblib artifact, plus a numpy export of it
+(scripts/compiled_model.py) that the app predicts with. Nothing is trained at
+import; serving goes through scripts/predictor.py, which only falls back to
+the artifact here when there is no export.
+"""
 
 load_dotenv()
 DATA_FILE = os.getenv("DATA_FILE")
 # DATA_FILE = os.getenv("/scripts/course_data.json")
 
-# # Load the course data
-with open(DATA_FILE, 'r') as f:
-    data = json.load(f)
+# synthetic students generated per course
+SAMPLES_PER_COURSE = int(os.getenv("MODEL_SAMPLES_PER_COURSE", "500"))
+
+logger = logging.getLogger(__name__)
+
+# model input columns, in the order the preprocessor was fitted on
+FEATURE_COLUMNS = ('gpa', 'course_level', 'credits', 'has_prereqs', 'instruction_type', 'course_difficulty', 'enrollment')
+
+# Hyperparameter tuning
+best_params = {
+    'n_estimators': 80,
+    'learning_rate': 0.09,
+    'max_depth': 3,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2,
+    'subsample': 0.8,
+    'max_features': 'sqrt'
+}
 
-# data = pd.read_json('scripts/course_data.json')
 
 def fetchProfRating(professor_name):
     """
@@ -27,7 +63,7 @@ def fetchProfRating(professor_name):
     # Ensure the Node.js script is in the correct path
     try:
         js_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "rmp", "rmp-api","rmp-data", "getRating.js"))
-        
+
         #runs the Node.js script with the professor name as an argument
         result = subprocess.run(
             ["node", js_path, professor_name],
@@ -37,7 +73,7 @@ def fetchProfRating(professor_name):
         #returns the output of the script as a JSON object
         output = json.loads(result.stdout)
         return output.get("rating")
-    
+
     #throws an error if the script fails to run or if the output is not valid JSON
     except Exception as e:
         # print(f"Error fetching RMP rating: {e}")
@@ -56,134 +92,369 @@ def extract_credits(credit_str):
     except ValueError:
         return 0.0
 
-# Parse course features
-course_features = []
-for crn, details in data.items():
-    course_number = details.get('course_number', '')
-    course_level = extract_course_level(course_number)
-    credits = extract_credits(details.get('credits', '0'))
-    has_prereqs = 1 if details.get('prereqs', '').strip() else 0
-    instruction_type = details.get('instruction_type', 'Other').split('/')[0].strip()
-    max_enroll = details.get('max_enroll', '0')
-    enrollment = int(max_enroll) if max_enroll.isdigit() else 0
-
-    # Fetch instructor names
-    instructors = details.get('instructors', [])
-    instructor_name = instructors[0]['name'] if instructors else 'Unknown'
-
-    proffesor_rating = fetchProfRating(instructor_name)
-    normalized_rating = proffesor_rating if proffesor_rating else 0
-
-    # Calculate course difficulty based on level, credits, and prerequisites
-    course_difficulty = (credits * 0.5) + (has_prereqs * 0.3) + (normalized_rating * 0.2)
-
-    course_features.append({
-        'crn': str(crn),
-        'course_level': course_level,
-        'credits': credits,
-        'has_prereqs': has_prereqs,
-        'instruction_type': instruction_type,
-        'enrollment': enrollment,
-        'course_difficulty': course_difficulty,
-        'instructor': instructor_name
-    })
-
-# Convert to DataFrame
-courses_df = pd.DataFrame(course_features)
-
-# Generate synthetic data
-np.random.seed(42)
-synthetic_data = []
-for _, course in courses_df.iterrows():
-    for _ in range(500):  # 100 students per course
-        gpa = np.random.normal(loc=2.5, scale=1.0)
-        gpa = np.clip(gpa, 0.0, 4.0)
-
-        # Improved success_score formula
-        success_score = (0.65 * gpa  # GPA has a strong positive impact
-            - 0.8 * course['course_difficulty']  # Higher difficulty reduces success
-            - 0.4 * course['has_prereqs']  # Prerequisites add some difficulty
-            + np.random.normal(scale=0.25)  # Add some randomness
-        )
 
-        # Convert success_score to probability using logistic function
-        success_prob = 1 / (1 + np.exp(-40 * success_score))
-        success_prob = np.clip(success_prob, 0, 1)  # Ensure probability is between 0 and 1
-        success = 1 if success_prob > 0.5 else 0
-
-        synthetic_data.append({
-            'gpa': gpa,
-            'course_level': course['course_level'],
-            'credits': course['credits'],
-            'has_prereqs': course['has_prereqs'],
-            'instruction_type': course['instruction_type'],
-            'course_difficulty': course['course_difficulty'],
-            'enrollment': course['enrollment'],
-            'success': success
+def build_course_features(data: dict, fetch_rating=fetchProfRating) -> pd.DataFrame:
+    """
+    ### one row of model features per CRN in the json course data
+    each instructor's rating is fetched once, not once per section they teach
+
+    #### args:
+    - data: crn -> section dict, as in DATA_FILE
+    - fetch_rating: instructor name -> rating or None (the RateMyProfessors lookup)
+    """
+    ratings = {}
+    course_features = []
+    for crn, details in data.items():
+        course_number = details.get('course_number', '')
+        course_level = extract_course_level(course_number)
+        credits = extract_credits(details.get('credits', '0'))
+        has_prereqs = 1 if details.get('prereqs', '').strip() else 0
+        instruction_type = details.get('instruction_type', 'Other').split('/')[0].strip()
+        max_enroll = details.get('max_enroll', '0')
+        enrollment = int(max_enroll) if max_enroll.isdigit() else 0
+
+        # Fetch instructor names
+        instructors = details.get('instructors', [])
+        instructor_name = instructors[0]['name'] if instructors else 'Unknown'
+
+        if instructor_name not in ratings:
+            ratings[instructor_name] = fetch_rating(instructor_name)
+        proffesor_rating = ratings[instructor_name]
+        normalized_rating = proffesor_rating if proffesor_rating else 0
+
+        # Calculate course difficulty based on level, credits, and prerequisites
+        course_difficulty = (credits * 0.5) + (has_prereqs * 0.3) + (normalized_rating * 0.2)
+
+        course_features.append({
+            'crn': str(crn),
+            'course_level': course_level,
+            'credits': credits,
+            'has_prereqs': has_prereqs,
+            'instruction_type': instruction_type,
+            'enrollment': enrollment,
+            'course_difficulty': course_difficulty,
+            'instructor': instructor_name,
+            'professor_rating': proffesor_rating,
         })
 
-# Create dataframe with the fake student data
-df = pd.DataFrame(synthetic_data)
+    # Convert to DataFrame
+    return pd.DataFrame(course_features)
 
-# Preprocess the data
-preprocessor = ColumnTransformer(
-    transformers=[('cat', OneHotEncoder(handle_unknown='ignore'), ['instruction_type'])],
-    remainder='passthrough'
-)
 
-# Choose which features will be trained and predicted for X and y
-X = preprocessor.fit_transform(df.drop('success', axis=1))
-y = df['success']
+def train(
+        source: str | None = None,
+        samples_per_course: int = SAMPLES_PER_COURSE,
+        fetch_rating=fetchProfRating,
+        chunk_courses: int | None = None,
+    ) -> dict:
+    """
+    ### fits the success model on synthetic students for the catalog in source
+    returns the artifact: {"version", "preprocessor", "model", "courses", "accuracy",
+    "report", "trained_at", "source", "sklearn"}
 
-# Split data into sizes for training and testing
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=0)
+    #### args:
+    - source: json course data to train on (defaults to DATA_FILE)
+    - samples_per_course: synthetic students per course
+    - fetch_rating: instructor name -> rating or None
+    - chunk_courses: generate and encode the synthetic students this many courses at a time,
+    so only the numeric training matrix is ever held whole (None = all at once)
+    """
+    source = source or DATA_FILE
+    with open(source, 'r') as f:
+        data = json.load(f)
 
-# Hyperparameter tuning
-best_params = {
-    'n_estimators': 80,
-    'learning_rate': 0.09,
-    'max_depth': 3,
-    'min_samples_split': 5,
-    'min_samples_leaf': 2,
-    'subsample': 0.8,
-    'max_features': 'sqrt'
-}
+    courses_df = build_course_features(data, fetch_rating)
+
+    # Preprocess the data
+    preprocessor = ColumnTransformer(
+        transformers=[('cat', OneHotEncoder(handle_unknown='ignore'), ['instruction_type'])],
+        remainder='passthrough'
+    )
+
+    # Choose which features will be trained and predicted for X and y
+    if chunk_courses is None:
+        df = generate_synthetic_data(courses_df, samples_per_course)
+        X = preprocessor.fit_transform(df.drop('success', axis=1))
+        y = df['success']
+    else:
+        # one student per course has every column and instruction type, which is all fitting the encoder needs
+        preprocessor.fit(generate_synthetic_data(courses_df, 1).drop('success', axis=1))
+        X_chunks, y_chunks = [], []
+        for chunk in iter_synthetic_data(courses_df, samples_per_course, chunk_courses=chunk_courses):
+            X_chunks.append(preprocessor.transform(chunk.drop('success', axis=1)))
+            y_chunks.append(chunk['success'])
+        X = np.vstack(X_chunks)
+        y = pd.concat(y_chunks, ignore_index=True)
 
-# Train model with best parameters and selected features
-model = GradientBoostingClassifier(**best_params, random_state=42)
-model.fit(X_train, y_train)
+    # Split data into sizes for training and testing
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=0)
+
+    # Train model with best parameters and selected features
+    model = GradientBoostingClassifier(**best_params, random_state=42)
+    model.fit(X_train, y_train)
+
+    # Evaluate model based on accuracy and F1-score
+    y_test_pred = model.predict(X_test)
+
+    return {
+        "version": ARTIFACT_VERSION,
+        "preprocessor": preprocessor,
+        "model": model,
+        "courses": courses_df,
+        "accuracy": accuracy_score(y_test, y_test_pred) * 100,
+        "report": classification_report(y_test, y_test_pred),
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": os.path.abspath(source),
+        "sklearn": sklearn.__version__,
+    }
+
+
+def save_artifact(artifact: dict, path: str | None = None) -> str:
+    """
+    ### writes a trained artifact with joblib; returns the path written
+    written to a temp file and renamed, so a worker never loads half an artifact
+    """
+    path = path or MODEL_FILE
+    tmp_path = path + ".tmp"
+    joblib.dump(artifact, tmp_path, compress=3)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_artifact(path: str | None = None) -> dict:
+    """
+    ### reads an artifact written by save_artifact
+    raises FileNotFoundError when it doesn't exist and ValueError when it's from another ARTIFACT_VERSION
+    """
+    path = path or MODEL_FILE
+    artifact = joblib.load(path)
+    if not isinstance(artifact, dict) or artifact.get("version") != ARTIFACT_VERSION:
+        found = artifact.get("version") if isinstance(artifact, dict) else None
+        raise ValueError(f"{path} is model artifact version {found}, expected {ARTIFACT_VERSION}; run `flask model train`")
+    if artifact.get("sklearn") != sklearn.__version__:
+        logger.warning(f"{path} was trained with scikit-learn {artifact.get('sklearn')}, running {sklearn.__version__}")
+    return artifact
+
+
+def export_compiled_model(artifact: dict) -> CompiledModel:
+    """
+    ### flattens an artifact's preprocessor, trees and course table into a numpy-only CompiledModel
+    one-hot instruction_type columns become category splits on an integer code per CRN
+    """
+    preprocessor, model = artifact["preprocessor"], artifact["model"]
+    if model.n_classes_ != 2 or model.init_ == "zero":
+        raise ValueError("only a binary GradientBoostingClassifier with a prior init can be compiled")
+
+    # preprocessor output column -> input feature (a remainder column) or instruction type code (a one-hot one)
+    categories = [str(category) for category in preprocessor.named_transformers_['cat'].categories_[0]]
+    names = list(preprocessor.get_feature_names_out())
+    columns = {}
+    for code, column in enumerate(range(len(names))[preprocessor.output_indices_['cat']]):
+        columns[column] = (INSTRUCTION_TYPE, code)
+    for column in range(len(names))[preprocessor.output_indices_['remainder']]:
+        columns[column] = (FEATURES.index(names[column].removeprefix('remainder__')), None)
+
+    feature, threshold, upper, children, value, roots = [], [], [], [], [], []
+    for tree in (estimator.tree_ for estimator in model.estimators_[:, 0]):
+        offset = len(feature)
+        roots.append(offset)
+        for node in range(tree.node_count):
+            if tree.children_left[node] == -1:
+                # leaves are their own children, so walking past one stays put
+                feature.append(0)
+                threshold.append(np.inf)
+                upper.append(np.inf)
+                children.append((offset + node, offset + node))
+            else:
+                index, code = columns[tree.feature[node]]
+                if code is None:
+                    low, high = tree.threshold[node], np.inf
+                elif 0 <= tree.threshold[node] < 1:
+                    low, high = code - 0.5, code + 0.5
+                else:
+                    raise ValueError(f"one-hot split at threshold {tree.threshold[node]}, expected one between 0 and 1")
+                feature.append(index)
+                threshold.append(low)
+                upper.append(high)
+                children.append((offset + tree.children_left[node], offset + tree.children_right[node]))
+            value.append(model.learning_rate * tree.value[node, 0, 0])
+
+    # the prior's log-odds, clipped the way scikit-learn clips it
+    eps = np.finfo(np.float32).eps
+    prior = float(np.clip(model.init_.class_prior_[1], eps, 1 - eps))
+
+    courses = artifact["courses"]
+    codes = {name: code for code, name in enumerate(categories)}
+    features = np.zeros((len(courses), len(FEATURES)), dtype=np.float32)
+    for index, name in enumerate(FEATURES[:INSTRUCTION_TYPE]):
+        if index != GPA:
+            features[:, index] = courses[name].to_numpy(dtype=np.float64)
+    features[:, INSTRUCTION_TYPE] = [codes.get(name, -1) for name in courses['instruction_type']]
+
+    return CompiledModel(
+        feature, threshold, upper, children, value, roots,
+        depth=max(estimator.tree_.max_depth for estimator in model.estimators_[:, 0]),
+        init=float(np.log(prior / (1 - prior))),
+        crns=list(courses['crn']),
+        features=features,
+        categories=categories,
+        trained_at=artifact["trained_at"],
+    )
+
+
+def save_compiled_model(artifact: dict, path: str | None = None) -> str:
+    """
+    ### exports an artifact with export_compiled_model and writes it; returns the path written
+    """
+    return export_compiled_model(artifact).save(path or COMPILED_FILE)
+
+
+_artifact = None
+_artifact_lock = threading.Lock()
+
+
+def get_artifact(train_missing: bool = False) -> dict:
+    """
+    ### the artifact predictions use, loaded from MODEL_FILE on first use
+    raises FileNotFoundError when there's no artifact on disk (run `flask model train`)
+
+    #### args:
+    - train_missing: train the model in memory instead of raising (slow; the self-checks
+    use it, never a request)
+    """
+    global _artifact
+    if _artifact is None:
+        with _artifact_lock:
+            if _artifact is None:
+                try:
+                    _artifact = load_artifact()
+                except FileNotFoundError:
+                    if not train_missing:
+                        raise FileNotFoundError(f"No model artifact at {MODEL_FILE}; run `flask model train`") from None
+                    logger.warning(f"No model artifact at {MODEL_FILE}; training in memory.")
+                    _artifact = train()
+    return _artifact
+
+
+def reset_artifact():
+    """
+    ### drops the loaded artifact, compiled model and table so the next prediction reloads them (ex. after retraining)
+    """
+    global _artifact
+    with _artifact_lock:
+        _artifact = None
+    predictor.reset()
+
+
+def course_rows(artifact: dict) -> dict[str, int]:
+    """
+    ### crn (str) -> row of the artifact's course feature table; built once per loaded artifact
+    """
+    rows = artifact.get("rows")
+    if rows is None:
+        rows = artifact["rows"] = {crn: row for row, crn in enumerate(artifact["courses"]['crn'])}
+    return rows
+
+
+def predict_success_probabilities(gpa, crns) -> list:
+    """
+    ### success probability for every CRN in crns, in one transform + predict_proba call on the artifact
+    returns a list lined up with crns; None where a CRN isn't in the model's course table
+    (the app calls scripts/predictor.predict_success_probabilities, which only lands here without an export)
+
+    #### args:
+    - gpa: the student's gpa
+    - crns: CRNs (int or str) ex. a whole filter or search result
+    """
+    gpa = float(gpa)
+    artifact = get_artifact()
+    rows = course_rows(artifact)
+    keys = [str(crn) for crn in crns]
+    known = [rows[key] for key in keys if key in rows]
+
+    probabilities = [None] * len(keys)
+    if not known:
+        return probabilities
+
+    # one frame for the whole result set instead of one per CRN
+    input_df = artifact["courses"].iloc[known][list(FEATURE_COLUMNS[1:])].reset_index(drop=True)
+    input_df.insert(0, 'gpa', gpa)
+    success = artifact["model"].predict_proba(artifact["preprocessor"].transform(input_df))[:, 1]
+
+    found = iter(success.tolist())
+    for i, key in enumerate(keys):
+        if key in rows:
+            probabilities[i] = next(found)
+    return probabilities
+
+
+def success_grid(artifact: dict, gpas: np.ndarray, chunk_crns: int = 2000) -> np.ndarray:
+    """
+    ### (crns x gpas) float64 matrix of the model's success probabilities, every CRN in the artifact
+    evaluated chunk_crns CRNs at a time so a big catalog never builds one giant frame
+    """
+    courses = artifact["courses"][list(FEATURE_COLUMNS[1:])]
+    grid = np.empty((len(courses), len(gpas)))
+    for start in range(0, len(courses), chunk_crns):
+        block = courses.iloc[start:start + chunk_crns]
+        input_df = block.iloc[np.repeat(np.arange(len(block)), len(gpas))].reset_index(drop=True)
+        input_df.insert(0, 'gpa', np.tile(gpas, len(block)))
+        success = artifact["model"].predict_proba(artifact["preprocessor"].transform(input_df))[:, 1]
+        grid[start:start + len(block)] = success.reshape(len(block), len(gpas))
+    return grid
+
+
+def build_success_table(artifact: dict | None = None, dtype: str = "float32"):
+    """
+    ### evaluates the model once per gpa interval between its thresholds, for every CRN, into a SuccessTable
+    """
+    artifact = artifact or get_artifact()
+    edges = export_compiled_model(artifact).gpa_thresholds()
+    return success_table.SuccessTable.from_columns(
+        list(artifact["courses"]['crn']), success_grid(artifact, success_table.column_gpas(edges)), edges, dtype,
+        artifact["trained_at"],
+    )
+
+
+def check_success_table(table, artifact: dict | None = None, samples: int = 200, seed: int = 0) -> dict:
+    """
+    ### how far table lookups land from the live model, for every CRN at samples random GPAs
+    plus every threshold and the float32 just above it (where a lookup would go wrong first)
+    returns the max/mean absolute error and the share of lookups that would change the
+    whole-percent probability_score the endpoints show
+    """
+    artifact = artifact or get_artifact()
+    rng = np.random.default_rng(seed)
+    above = np.nextafter(table.edges.astype(np.float32), np.float32(np.inf)).astype(np.float64)
+    gpas = np.concatenate([rng.uniform(-0.5, 4.5, samples), table.edges, above])
+    exact = success_grid(artifact, gpas)
+    crns = list(artifact["courses"]['crn'])
+
+    looked_up = np.array([table.lookup(gpa, crns) for gpa in gpas]).T
+    error = np.abs(looked_up - exact)
+    return {
+        "samples": error.size,
+        "max_error": float(error.max()),
+        "mean_error": float(error.mean()),
+        "percent_changed": float(np.mean((looked_up * 100).astype(int) != (exact * 100).astype(int))),
+    }
 
-# Evaluate model based on accuracy and F1-score
-y_test_pred = model.predict(X_test)
-test_accuracy = accuracy_score(y_test, y_test_pred) * 100
 
 # Function to predict success probability
 def predict_success_probability(gpa, crn):
-    if crn not in courses_df['crn'].values:
+    artifact = get_artifact()
+    courses_df = artifact["courses"]
+    row = course_rows(artifact).get(str(crn))
+    if row is None:
         return "CRN not found in the dataset."
-    
-    course_info = courses_df[courses_df['crn'] == crn].iloc[0]
-
-    input_data = {
-        'gpa': gpa,
-        'course_level': course_info['course_level'],
-        'credits': course_info['credits'],
-        'has_prereqs': course_info['has_prereqs'],
-        'instruction_type': course_info['instruction_type'],
-        'course_difficulty': course_info['course_difficulty'],
-        'enrollment': course_info['enrollment']
-    }
-    
-    # Store input data in a dataframe so it can be processed smoothly
-    input_df = pd.DataFrame([input_data])
-    input_transformed = preprocessor.transform(input_df)
-    success_probability = model.predict_proba(input_transformed)[0][1]
 
-        # Fetch professor's name and rating
-    professor_name = course_info['instructor']
-    professor_rating = fetchProfRating(professor_name)
+    success_probability = predict_success_probabilities(gpa, [crn])[0]
+
+    # professor's name and the rating fetched when the model was trained
+    professor_name = courses_df['instructor'].iat[row]
+    professor_rating = courses_df['professor_rating'].iat[row]
 
-    if professor_rating:
+    if pd.notna(professor_rating) and professor_rating:
         print(f"Professor Rating for {professor_name}: {professor_rating}")
     else:
         print(f"Professor Rating for {professor_name}: Rating not available.")
@@ -192,9 +463,10 @@ def predict_success_probability(gpa, crn):
 
 # User input of GPA and CRN to be calculated and predicted
 if __name__ == "__main__":
-    print(f"Model Accuracy: {test_accuracy:.2f}%")
+    artifact = get_artifact(train_missing=True)
+    print(f"Model Accuracy: {artifact['accuracy']:.2f}%")
     print("\nClassification Report:")
-    print(classification_report(y_test, y_test_pred))
+    print(artifact["report"])
     try:
         user_gpa = float(input("Enter your GPA: "))
         user_crn = input("Enter the CRN: ")
@@ -205,4 +477,3 @@ if __name__ == "__main__":
             print(probability)
     except ValueError:
         print("Invalid input. Please enter a valid GPA.")
-
@@ -0,0 +1,219 @@
+import time
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import coo_array
+
+"""
+Exact term planning with scipy's MILP solver (the planner's optimize=True mode).
+
+It takes the courses the greedy planner decided on (scripts/planner.py: the
+targets plus the prereqs picked for them) and the open (non co-op, non break)
+terms the greedy plan needed, then solves:
+
+    x[c, t] = 1 when course c is taken in open term t
+    every course exactly once
+    prereq p of c:      term(c) >= term(p) + 1
+    every term:         credits taken <= peak
+                        sum of min(credits, credit cap) <= credit cap
+    every course:       term(c) <= last
+    minimize            (largest load + 1) * last + peak
+
+A course worth more than the cap counts as a full term, so it only fits in a
+term by itself (as in the greedy plan) and every other term stays within the
+cap. The fewest terms wins outright and, among plans that short, the one with
+the lightest heaviest term (the most even load). A course only gets variables
+for the terms its prereq chain (below and above it) leaves room for.
+
+The greedy plan is returned instead whenever the solver doesn't prove an
+optimum within the time limit.
+"""
+
+# seconds the solver gets before falling back to the greedy plan
+TIME_LIMIT = 2.0
+
+
+def chain_windows(planned: dict[int, tuple[int, ...]], order: list[int], term_count: int) -> dict[int, range]:
+    """
+    ### open-term positions each planned course can go in: after its longest chain of
+    planned prereqs, and early enough for its longest chain of planned dependents
+    """
+    below = {}
+    for course_id in order:
+        if course_id in planned:
+            below[course_id] = 1 + max((below[prereq] for prereq in planned[course_id]), default=-1)
+
+    above = dict.fromkeys(planned, 0)
+    for course_id in reversed(order):
+        if course_id in planned:
+            for prereq in planned[course_id]:
+                above[prereq] = max(above[prereq], above[course_id] + 1)
+
+    return {course_id: range(below[course_id], term_count - above[course_id]) for course_id in planned}
+
+
+def optimize(
+        planner,
+        planned: dict[int, tuple[int, ...]],
+        greedy: list[list[int]],
+        open_terms: list[int],
+        credit_cap: float,
+        time_limit: float = TIME_LIMIT,
+    ) -> tuple[list[list[int]], dict]:
+    """
+    ### (courses per term, same shape as greedy) and solver stats
+    stats: "used" ("milp" or "greedy"), "status", "seconds", "variables", "constraints",
+    "nonzeros", "greedy_terms" / "terms" (open terms used), "peak_credits"
+
+    #### args:
+    - planner: the DegreePlanner (for credits and the graph's topological order)
+    - planned: course id -> prereq ids picked for it
+    - greedy: the greedy plan, courses per term including co-op/break terms
+    - open_terms: positions in greedy of the terms that can hold courses
+    - credit_cap: most credits per term (a course worth more still fits alone)
+    - time_limit: solver time limit in seconds
+    """
+    started = time.perf_counter()
+    credits = planner.credits
+    courses = list(planned)
+    term_count = len(open_terms)
+    # the heaviest term any plan can have: the cap, or one oversized course on its own
+    peak_cap = max(credit_cap, max(credits[course_id] for course_id in courses))
+
+    windows = chain_windows(planned, planner.graph.order, term_count)
+    columns = {}
+    for course_id in courses:
+        for slot in windows[course_id]:
+            columns[course_id, slot] = len(columns)
+    last = len(columns)
+    peak = last + 1
+    variable_count = last + 2
+
+    rows, cols, values, lower, upper = [], [], [], [], []
+
+    def constraint(terms, low, high):
+        row = len(lower)
+        for column, value in terms:
+            rows.append(row)
+            cols.append(column)
+            values.append(value)
+        lower.append(low)
+        upper.append(high)
+
+    def term_of(course_id):
+        # sum of slot * x: the open-term position the course lands in
+        return [(columns[course_id, slot], slot) for slot in windows[course_id]]
+
+    for course_id in courses:
+        constraint([(columns[course_id, slot], 1) for slot in windows[course_id]], 1, 1)
+        constraint(term_of(course_id) + [(last, -1)], -np.inf, 0)
+        for prereq in planned[course_id]:
+            constraint(term_of(course_id) + [(column, -slot) for column, slot in term_of(prereq)], 1, np.inf)
+
+    by_slot = [[] for _ in range(term_count)]
+    for (course_id, slot), column in columns.items():
+        by_slot[slot].append((column, credits[course_id]))
+    for slot_columns in by_slot:
+        constraint(slot_columns + [(peak, -1)], -np.inf, 0)
+        # an oversized course counts as exactly the cap: it fits, but only on its own
+        constraint([(column, min(value, credit_cap)) for column, value in slot_columns], -np.inf, credit_cap)
+
+    objective = np.zeros(variable_count)
+    objective[last] = peak_cap + 1
+    objective[peak] = 1
+    integrality = np.ones(variable_count)
+    integrality[[last, peak]] = 0
+
+    matrix = coo_array((values, (rows, cols)), shape=(len(lower), variable_count)).tocsr()
+    result = milp(
+        objective,
+        constraints=LinearConstraint(matrix, lower, upper),
+        integrality=integrality,
+        bounds=Bounds(
+            np.zeros(variable_count),
+            np.concatenate([np.ones(last), [max(term_count - 1, 0), peak_cap]]),
+        ),
+        options={"time_limit": time_limit},
+    )
+
+    stats = {
+        "used": "greedy",
+        "status": result.message,
+        "seconds": round(time.perf_counter() - started, 4),
+        "variables": variable_count,
+        "constraints": len(lower),
+        "nonzeros": matrix.nnz,
+        "greedy_terms": sum(bool(greedy[position]) for position in open_terms),
+        "terms": sum(bool(greedy[position]) for position in open_terms),
+        "peak_credits": max(sum(credits[course_id] for course_id in taken) for taken in greedy),
+    }
+
+    # status 0: proven optimal. Anything else (time limit, solver trouble) keeps the greedy plan
+    if result.status != 0 or result.x is None:
+        return greedy, stats
+
+    plan = [[] for _ in greedy]
+    for (course_id, slot), column in columns.items():
+        if result.x[column] > 0.5:
+            plan[open_terms[slot]].append(course_id)
+    for taken in plan:
+        taken.sort(key=lambda course_id: planner.graph.codes[course_id])
+
+    stats.update(
+        used="milp",
+        terms=sum(bool(plan[position]) for position in open_terms),
+        peak_credits=max(sum(credits[course_id] for course_id in taken) for taken in plan),
+    )
+    return plan, stats
+
+
+# exact vs. greedy plans on synthetic deep-chain catalogs: solve time and problem size as plans grow
+if __name__ == "__main__":
+    import random
+    from datetime import date
+    from scripts.catalog import DATA_FILE, load_catalog
+    from scripts.eligibility import satisfied
+    from scripts.planner import DegreePlanner, plan_degree, program_terms, synthetic_chain_asts
+    from scripts.prereq_graph import PrereqGraph
+    from scripts.prereq_store import PrereqStore
+
+    def check(planner, result):
+        done = set()
+        for term in result["terms"]:
+            for code in term["courses"]:
+                assert satisfied(planner.graph.asts[planner.graph.index[code]], done), code
+            done |= set(term["courses"])
+
+    catalog = load_catalog(DATA_FILE)
+    enrolled = date(2025, 9, 22)
+    for optimize_plan in (False, True):
+        result = plan_degree(["CS277", "SE310", "CS283"], ["CS171"], 8, enrolled, coop_type=True,
+                             optimize=optimize_plan, catalog=catalog)
+        print("exact " if optimize_plan else "greedy", [term["courses"] for term in result["terms"]], result.get("solver", ""))
+
+    # one oversized course: it gets a term to itself and every other term stays within the cap
+    asts = {f"S{i:03d}": None for i in range(9)} | {"BIG000": None}
+    planner = DegreePlanner(PrereqGraph(PrereqStore(asts)), {code: 20.0 if code == "BIG000" else 4.0 for code in asts})
+    result = planner.plan(list(asts), [], 16, program_terms(enrolled, True, True, count=20), optimize=True)
+    assert result["solver"]["used"] == "milp", result["solver"]
+    loaded = [term for term in result["terms"] if term["courses"]]
+    assert all(term["credits"] <= 16 or len(term["courses"]) == 1 for term in loaded), loaded
+    assert len(loaded) == 4, loaded
+    print("oversized course alone, other terms at most 16 credits:", [term["credits"] for term in loaded])
+
+    rng = random.Random(17)
+    print(f"{'catalog':>8} {'chain':>5} {'courses':>7} {'vars':>6} {'rows':>6} | greedy terms/peak | exact terms/peak | solve")
+    for chains, length, targets in ((50, 6, 4), (200, 8, 5), (400, 10, 5), (999, 12, 6), (999, 16, 8)):
+        asts = synthetic_chain_asts(chains, length, rng)
+        planner = DegreePlanner(PrereqGraph(PrereqStore(asts)), {code: rng.choice((3.0, 4.0)) for code in asts})
+        wanted = [f"C{chain:03d}{length - 1:03d}" for chain in rng.sample(range(chains), targets)]
+        terms = program_terms(enrolled, True, True, count=200)
+
+        greedy_peak = max(term["credits"] for term in planner.plan(wanted, [], 16, terms)["terms"])
+        result = planner.plan(wanted, [], 16, terms, optimize=True, time_limit=10)
+        check(planner, result)
+        solver = result["solver"]
+        assert solver["terms"] <= solver["greedy_terms"]
+        planned = sum(len(term["courses"]) for term in result["terms"])
+        print(f"{len(asts):>8} {length:>5} {planned:>7} {solver['variables']:>6} {solver['constraints']:>6} |"
+              f" {solver['greedy_terms']:>12}/{greedy_peak:<4} | {solver['terms']:>11}/{solver['peak_credits']:<4} |"
+              f" {solver['seconds']:.3f}s ({solver['used']}: {solver['status']})")
@@ -0,0 +1,536 @@
+import heapq
+import math
+import numpy as np
+from datetime import date
+from scripts import plan_optimizer
+from scripts.catalog import CourseCatalog, get_catalog, parse_credits, deep_bytes, register_derived
+from scripts.prereq_graph import UNREACHABLE, PrereqGraph
+from scripts.prereq_store import COURSE, AND
+from scripts.search import normalize_code
+
+"""
+Multi-term degree planner over the prerequisite graph.
+
+Given target courses, completed courses and a per-term credit cap it lays the
+remaining courses out term by term:
+    1. requirements: the targets plus every prereq still missing. For an "or"
+       the cheapest branch is picked (already completed / already planned
+       first, then the one with the fewest not-yet-completed courses upstream)
+    2. priority list scheduling: each open term takes the ready courses with the
+       longest chain of planned courses still waiting on them first, until the
+       credit cap is hit. That keeps the critical path moving, so the plan
+       matches the lower bound (longest chain, total credits / cap) whenever the
+       cap isn't what's binding
+
+Terms come from the student's program calendar (UserProgram.calendar_type:
+quarters or semesters) starting at enrollment; co-op terms for the program's
+co-op cycle (UserProgram.coop_type) and the first-year summer break get no
+courses. Minimum grades aren't planned for: a planned course counts as passed.
+
+optimize=True re-solves the same courses exactly with scipy's MILP solver
+(scripts/plan_optimizer.py), falling back to this greedy plan on a timeout.
+"""
+
+QUARTER_SEASONS = ("Fall", "Winter", "Spring", "Summer")
+SEMESTER_SEASONS = ("Fall", "Spring")
+
+# credits assumed for a prereq the catalog doesn't offer (so its credits are unknown)
+DEFAULT_CREDITS = 3.0
+
+# a plan that hasn't finished after this many terms has run into something it can't schedule
+MAX_PLAN_TERMS = 40
+
+# most credits a student may register for per term, and what counts as full time, keyed by calendar_type
+MAX_TERM_CREDITS = {True: 20.0, False: 18.0}
+FULL_TIME_CREDITS = {True: 12.0, False: 12.0}
+
+CLASSES = "classes"
+COOP = "coop"
+BREAK = "break"
+
+# (program year, season) spent on co-op, keyed by (calendar_type, coop_type)
+#   coop_type True = 5 year / 3 co-op, False = 4 year / 1 co-op
+#   calendar_type True = quarters (co-op is two quarters), False = semesters (one semester)
+COOP_CYCLES = {
+    (True, True): {(2, "Spring"), (2, "Summer"), (3, "Spring"), (3, "Summer"), (4, "Spring"), (4, "Summer")},
+    (True, False): {(3, "Spring"), (3, "Summer")},
+    (False, True): {(2, "Spring"), (3, "Spring"), (4, "Spring")},
+    (False, False): {(3, "Spring")},
+}
+
+# quarter-system freshmen have their first summer off
+BREAKS = {
+    True: {(1, "Summer")},
+    False: set(),
+}
+
+
+class Term:
+    """
+    ### one term of a student's program
+    - label: ex. "Winter 2026"
+    - program_year: 1 for the enrollment year (years run Fall to Summer)
+    - status: "classes", "coop" or "break" (only "classes" terms get courses)
+    """
+
+    def __init__(self, season: str, year: int, program_year: int, status: str = CLASSES, key: tuple[int, int] = (0, 0)):
+        self.season = season
+        self.year = year
+        self.program_year = program_year
+        self.status = status
+        self.label = f"{season} {year}"
+        # (academic year, season index), same as season_of; orders terms
+        self.key = key
+
+    def __repr__(self):
+        return f"Term({self.label}, year {self.program_year}, {self.status})"
+
+
+def season_of(day: date, calendar_type: bool) -> tuple[int, int]:
+    """
+    ### date -> (academic year it belongs to (the Fall's calendar year), season index)
+    a date between terms rounds forward to the next one
+    """
+    if calendar_type:
+        # Fall Sep-Dec, Winter Jan-Mar, Spring Apr-Jun, Summer Jul-Aug
+        if day.month >= 9:
+            return day.year, 0
+        return day.year - 1, 1 if day.month <= 3 else 2 if day.month <= 6 else 3
+
+    # Spring Jan-May, otherwise the Fall coming up
+    if day.month <= 5:
+        return day.year - 1, 1
+    return day.year, 0
+
+
+def program_terms(
+        enrollment_date: date,
+        calendar_type: bool,
+        coop_type: bool,
+        start: date | None = None,
+        count: int = MAX_PLAN_TERMS,
+    ) -> list[Term]:
+    """
+    ### the program's terms from start (default enrollment) on, co-op and break terms marked
+
+    #### args:
+    - enrollment_date / calendar_type / coop_type: the UserProgram fields
+    - start: first term to plan for ex. today for a student part way through
+    - count: how many terms to list
+    """
+    seasons = QUARTER_SEASONS if calendar_type else SEMESTER_SEASONS
+    coop = COOP_CYCLES[(bool(calendar_type), bool(coop_type))]
+    breaks = BREAKS[bool(calendar_type)]
+
+    enrolled_year, _ = season_of(enrollment_date, calendar_type)
+    academic_year, season_index = season_of(max(start or enrollment_date, enrollment_date), calendar_type)
+
+    terms = []
+    while len(terms) < count:
+        season = seasons[season_index]
+        program_year = academic_year - enrolled_year + 1
+        status = COOP if (program_year, season) in coop else BREAK if (program_year, season) in breaks else CLASSES
+        terms.append(Term(season, academic_year + (season_index > 0), program_year, status, (academic_year, season_index)))
+
+        season_index += 1
+        if season_index == len(seasons):
+            season_index = 0
+            academic_year += 1
+
+    return terms
+
+
+def program_credit_cap(program) -> float:
+    """
+    ### per-term credit cap from a UserProgram: the pace credits_min needs over the
+    program's class terms, at least full time and at most the registration maximum
+    """
+    calendar_type = bool(program.calendar_type)
+    graduation = season_of(program.graduation_date, calendar_type)
+    terms = program_terms(program.enrollment_date, calendar_type, program.coop_type)
+    class_terms = sum(term.status == CLASSES and term.key <= graduation for term in terms)
+
+    pace = math.ceil(program.credits_min / max(class_terms, 1))
+    return min(MAX_TERM_CREDITS[calendar_type], max(FULL_TIME_CREDITS[calendar_type], float(pace)))
+
+
+class DegreePlanner:
+    """
+    ### plans courses into terms for one catalog snapshot
+    - credits: credit hours per course id (DEFAULT_CREDITS when the catalog doesn't offer it)
+
+    #### args:
+    - graph: the catalog's PrereqGraph
+    - credits: course code -> credit hours
+    """
+
+    def __init__(self, graph: PrereqGraph, credits: dict[str, float]):
+        self.graph = graph
+        self.credits = [credits.get(code) or DEFAULT_CREDITS for code in graph.codes]
+
+    def nbytes(self) -> int:
+        """
+        ### rough resident size in bytes
+        """
+        return deep_bytes(self.credits)
+
+    def requirements(self, targets: list[int], completed: set[int]) -> tuple[dict[int, tuple[int, ...]], list[int]]:
+        """
+        ### course ids to take -> the prereq ids picked for each; plus targets that can't be planned
+        a course blocked by a prereq cycle, and anything needing it, can't be planned
+        """
+        graph = self.graph
+        planned = {}
+        blocked = []
+        stack = [course_id for course_id in reversed(targets) if course_id not in completed]
+
+        # upstream courses not completed yet, counted lazily per "or" branch considered
+        not_completed = np.full(graph.ancestors.shape[1], np.uint64(0xFFFFFFFFFFFFFFFF), dtype=np.uint64)
+        for course_id in completed:
+            not_completed[course_id // 64] &= ~(np.uint64(1) << np.uint64(course_id % 64))
+        upstream_left = {}
+
+        def cost(node):
+            # (can it be met, courses it would add) for picking between "or" branches
+            if node[0] == COURSE:
+                course_id = graph.index[node[1]]
+                if course_id in completed or course_id in planned:
+                    return 0, 0
+                if graph.depth[course_id] == UNREACHABLE:
+                    return math.inf, math.inf
+                if course_id not in upstream_left:
+                    upstream_left[course_id] = int(np.bitwise_count(graph.ancestors[course_id] & not_completed).sum())
+                return 0, 1 + upstream_left[course_id]
+            costs = [cost(child) for child in node[1]]
+            if node[0] == AND:
+                return max(unmet for unmet, _ in costs), sum(size for _, size in costs)
+            return min(costs)
+
+        def pick(node, picked):
+            if node[0] == COURSE:
+                picked.append(graph.index[node[1]])
+            elif node[0] == AND:
+                for child in node[1]:
+                    pick(child, picked)
+            else:
+                pick(min(node[1], key=cost), picked)
+
+        while stack:
+            course_id = stack.pop()
+            if course_id in planned or course_id in completed:
+                continue
+            if graph.depth[course_id] == UNREACHABLE:
+                blocked.append(course_id)
+                continue
+
+            picked = []
+            if graph.asts[course_id] is not None:
+                pick(graph.asts[course_id], picked)
+            prereqs = tuple(dict.fromkeys(prereq for prereq in picked if prereq not in completed))
+            planned[course_id] = prereqs
+            stack.extend(prereq for prereq in prereqs if prereq not in planned)
+
+        return planned, blocked
+
+    def chains(self, planned: dict[int, tuple[int, ...]], dependents: dict[int, list[int]]) -> dict[int, int]:
+        """
+        ### per planned course, the terms its longest chain of planned dependents needs (itself included)
+        completed courses aren't planned, so they don't count
+        """
+        chain = {}
+        for course_id in reversed(self.graph.order):
+            if course_id in planned:
+                chain[course_id] = 1 + max((chain[dependent] for dependent in dependents[course_id]), default=0)
+        return chain
+
+    def schedule(self, planned: dict[int, tuple[int, ...]], terms: list[Term], credit_cap: float) -> tuple[list[list[int]], list[int]]:
+        """
+        ### courses per term (same order as terms) + course ids that never became ready
+        a course worth more than the cap still gets a term to itself
+        """
+        graph = self.graph
+        dependents = {course_id: [] for course_id in planned}
+        waiting = {}
+        for course_id, prereqs in planned.items():
+            waiting[course_id] = len(prereqs)
+            for prereq in prereqs:
+                dependents[prereq].append(course_id)
+
+        # terms of planned courses still waiting on each course (critical path first)
+        chain = self.chains(planned, dependents)
+
+        smallest = min((self.credits[course_id] for course_id in planned), default=0.0)
+        ready = [(-chain[course_id], -self.credits[course_id], graph.codes[course_id], course_id)
+                 for course_id, count in waiting.items() if count == 0]
+        heapq.heapify(ready)
+
+        plan = []
+        remaining = len(planned)
+        for term in terms:
+            if not remaining:
+                break
+            if term.status != CLASSES:
+                plan.append([])
+                continue
+
+            taken = []
+            deferred = []
+            load = 0.0
+            # stop once not even the lightest course would fit
+            while ready and (load + smallest <= credit_cap or not taken):
+                entry = heapq.heappop(ready)
+                credits = self.credits[entry[3]]
+                if load + credits <= credit_cap or not taken:
+                    taken.append(entry[3])
+                    load += credits
+                else:
+                    deferred.append(entry)
+            for entry in deferred:
+                heapq.heappush(ready, entry)
+
+            # prereqs have to be finished the term before
+            for course_id in taken:
+                for dependent in dependents[course_id]:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        heapq.heappush(ready, (-chain[dependent], -self.credits[dependent], graph.codes[dependent], dependent))
+            remaining -= len(taken)
+            plan.append(taken)
+
+        scheduled = {course_id for taken in plan for course_id in taken}
+        return plan, [course_id for course_id in planned if course_id not in scheduled]
+
+    def plan(
+            self,
+            targets: list[str],
+            completed: list[str],
+            credit_cap: float,
+            terms: list[Term],
+            optimize: bool = False,
+            time_limit: float = plan_optimizer.TIME_LIMIT,
+        ) -> dict:
+        """
+        ### minimum-term plan for targets given completed courses (codes normalized already)
+        see plan_degree for what comes back
+        """
+        graph = self.graph
+        unknown = [code for code in dict.fromkeys(targets + completed) if code not in graph.index]
+        completed_ids = {graph.index[code] for code in completed if code in graph.index}
+        target_ids = [graph.index[code] for code in dict.fromkeys(targets) if code in graph.index]
+
+        planned, blocked = self.requirements(target_ids, completed_ids)
+        plan, unscheduled = self.schedule(planned, terms, credit_cap)
+
+        solver = None
+        if optimize and planned and not unscheduled:
+            # the greedy plan's length bounds the exact one; the solver only gets its open terms
+            open_terms = [position for position, term in enumerate(terms[:len(plan)]) if term.status == CLASSES]
+            plan, solver = plan_optimizer.optimize(self, planned, plan, open_terms, credit_cap, time_limit)
+
+        # the last term with courses in it is when the plan finishes
+        while plan and not plan[-1]:
+            plan.pop()
+
+        # the longest chain of courses still to take, and the load (a course over the cap fills one term)
+        dependents = {course_id: [] for course_id in planned}
+        for course_id, prereqs in planned.items():
+            for prereq in prereqs:
+                dependents[prereq].append(course_id)
+        chain = max(self.chains(planned, dependents).values(), default=0)
+        load = sum(self.credits[course_id] for course_id in planned)
+        capped = sum(min(self.credits[course_id], credit_cap) for course_id in planned)
+        lower_bound = max(chain, math.ceil(capped / credit_cap)) if planned else 0
+
+        result = {
+            "terms": [
+                {
+                    "term": term.label,
+                    "status": term.status,
+                    "courses": [graph.codes[course_id] for course_id in taken],
+                    "credits": sum(self.credits[course_id] for course_id in taken),
+                }
+                for term, taken in zip(terms, plan)
+            ],
+            "class_terms": sum(term.status == CLASSES for term in terms[:len(plan)]),
+            "lower_bound": lower_bound,
+            "total_credits": load,
+            "blocked": [graph.codes[course_id] for course_id in blocked],
+            "unscheduled": [graph.codes[course_id] for course_id in unscheduled],
+            "unknown": unknown,
+        }
+        if optimize:
+            result["solver"] = solver
+        return result
+
+
+@register_derived("planner")
+def build_degree_planner(catalog: CourseCatalog) -> DegreePlanner:
+    credits = {}
+    for code in catalog.codes():
+        hours = [parse_credits(value) for value in catalog.values_for(code, "credits")]
+        credits[code] = max(hours, default=0.0)
+    return DegreePlanner(catalog.derived("prereq_graph"), credits)
+
+
+def plan_degree(
+        target_courses: list[str],
+        completed_courses: list[str],
+        credit_cap: float,
+        enrollment_date: date,
+        calendar_type: bool = True,
+        coop_type: bool = False,
+        graduation_date: date | None = None,
+        start: date | None = None,
+        optimize: bool = False,
+        time_limit: float = plan_optimizer.TIME_LIMIT,
+        catalog: CourseCatalog | None = None,
+        term=None,
+    ) -> dict:
+    """
+    ### term-by-term plan that takes every target course in as few terms as possible
+    returns {"terms": [{"term", "status", "courses", "credits"}, ...] up to the last term
+    with courses, "class_terms", "lower_bound" (no plan can use fewer class terms),
+    "total_credits", "finishes", "on_time" (finishes by graduation_date; None without one),
+    "blocked" (stuck behind a prereq cycle), "unscheduled", "unknown" (codes not in the catalog)}
+    plus "solver" (see plan_optimizer.optimize) when optimize is set
+
+    #### args:
+    - target_courses / completed_courses: course codes ex. ["CS 277", "cs260"]
+    - credit_cap: most credits per class term
+    - enrollment_date / graduation_date / calendar_type / coop_type: the student's UserProgram fields
+    - start: first term to plan (default: the term after enrollment_date, i.e. the whole program)
+    - optimize: solve exactly (fewest terms, then the most even load) instead of greedily
+    - time_limit: seconds the exact solver gets before the greedy plan is used
+    - catalog: catalog snapshot to read from; defaults to the live one
+    - term: term id whose catalog to use when no snapshot is passed (None = current term)
+    """
+    if credit_cap <= 0:
+        raise ValueError("credit_cap must be positive")
+
+    catalog = catalog or get_catalog(term)
+    planner = catalog.derived("planner")
+
+    terms = program_terms(enrollment_date, calendar_type, coop_type, start=start)
+    result = planner.plan(
+        [normalize_code(code) for code in target_courses],
+        [normalize_code(code) for code in completed_courses],
+        credit_cap,
+        terms,
+        optimize=optimize,
+        time_limit=time_limit,
+    )
+
+    finishes = result["terms"][-1]["term"] if result["terms"] else None
+    on_time = None
+    if graduation_date is not None:
+        on_time = not result["terms"] or terms[len(result["terms"]) - 1].key <= season_of(graduation_date, calendar_type)
+
+    return {**result, "finishes": finishes, "on_time": on_time}
+
+
+def plan_for_program(
+        program,
+        target_courses: list[str],
+        completed_courses: list[str],
+        credit_cap: float | None = None,
+        **kwargs,
+    ) -> dict:
+    """
+    ### plan_degree with the calendar, co-op cycle and dates of a student's UserProgram
+    credit_cap defaults to program_credit_cap(program); kwargs go to plan_degree
+    (start, optimize, time_limit, catalog, term)
+    """
+    return plan_degree(
+        target_courses,
+        completed_courses,
+        credit_cap or program_credit_cap(program),
+        program.enrollment_date,
+        calendar_type=program.calendar_type,
+        coop_type=program.coop_type,
+        graduation_date=program.graduation_date,
+        **kwargs,
+    )
+
+
+def synthetic_chain_asts(chains: int, length: int, rng) -> dict[str, tuple | None]:
+    """
+    ### benchmark catalog: chains of courses C<chain><level>, each level needing the one below
+    and, half the time, an "or" of two lower-level courses from a random other chain
+    """
+    asts = {}
+    for chain in range(chains):
+        for level in range(length):
+            code = f"C{chain:03d}{level:03d}"
+            if level == 0:
+                asts[code] = None
+                continue
+            own = (COURSE, f"C{chain:03d}{level - 1:03d}", "C")
+            other = rng.randrange(chains)
+            cross = ("or", tuple((COURSE, f"C{other:03d}{rng.randrange(level):03d}", "C") for _ in range(2)))
+            asts[code] = (AND, (own, cross)) if rng.random() < 0.5 else own
+    return asts
+
+
+# correctness checks on the real catalog + planner timing on synthetic deep-chain catalogs
+if __name__ == "__main__":
+    import time
+    import random
+    from scripts.catalog import DATA_FILE, load_catalog
+    from scripts.prereq_store import PrereqStore
+    from scripts.eligibility import satisfied
+
+    def check(planner, result, completed):
+        # every course's prereqs are met by what was completed or planned in an earlier term
+        graph = planner.graph
+        done = set(completed)
+        for term in result["terms"]:
+            assert term["status"] == CLASSES or not term["courses"], term
+            for code in term["courses"]:
+                assert satisfied(graph.asts[graph.index[code]], done), (code, term)
+            done |= set(term["courses"])
+        return done
+
+    catalog = load_catalog(DATA_FILE)
+    planner = catalog.derived("planner")
+    enrolled = date(2025, 9, 22)
+
+    result = plan_degree(["CS277", "CS283", "SE310"], ["CS171"], 16, enrolled, catalog=catalog, graduation_date=date(2030, 6, 1))
+    check(planner, result, ["CS171"])
+    assert result["class_terms"] >= result["lower_bound"], result
+
+    # completed courses shorten the chain the lower bound counts
+    completed = ["CS171", "CS172", "CS265", "CS260", "CS270"]
+    for cap in (16, 3):
+        bounded = plan_degree(["CS277"], completed, cap, enrolled, catalog=catalog)
+        check(planner, bounded, completed)
+        assert 1 <= bounded["lower_bound"] <= bounded["class_terms"], bounded
+    print(f"CS277 after {completed}: {bounded['class_terms']} class terms, lower bound {bounded['lower_bound']}")
+    for term in result["terms"]:
+        print(f"  {term['term']:<12} {term['status']:<8} {term['credits']:>5} {term['courses']}")
+    print({key: value for key, value in result.items() if key != "terms"})
+
+    for coop_type in (True, False):
+        for calendar_type in (True, False):
+            terms = program_terms(enrolled, calendar_type, coop_type, count=20)
+            print(f"quarters={calendar_type} 5yr co-op={coop_type}: co-op in",
+                  [term.label for term in terms if term.status == COOP])
+
+    # a 4-5 year program is ~45-60 courses; the last two are stress tests well past any real plan
+    rng = random.Random(3)
+    for chains, length, targets, term_count in ((20, 8, 3, MAX_PLAN_TERMS), (200, 10, 4, MAX_PLAN_TERMS),
+                                                (999, 12, 4, MAX_PLAN_TERMS), (999, 40, 60, 2000)):
+        asts = synthetic_chain_asts(chains, length, rng)
+        graph = PrereqGraph(PrereqStore(asts))
+        synthetic = DegreePlanner(graph, {code: rng.choice((3.0, 4.0)) for code in asts})
+        wanted = [f"C{chain:03d}{length - 1:03d}" for chain in rng.sample(range(chains), targets)]
+        terms = program_terms(enrolled, True, True, count=term_count)
+
+        started = time.perf_counter()
+        result = synthetic.plan(wanted, [], 20, terms)
+        plan_ms = (time.perf_counter() - started) * 1000
+
+        check(synthetic, result, [])
+        assert not result["unscheduled"] and result["class_terms"] >= result["lower_bound"]
+        planned = sum(len(term["courses"]) for term in result["terms"])
+        print(f"{len(asts)} courses, chains of {length} | {planned} planned courses in {result['class_terms']} class terms"
+              f" (lower bound {result['lower_bound']}) over {len(result['terms'])} terms | {plan_ms:.1f}ms")
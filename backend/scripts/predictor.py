@@ -0,0 +1,161 @@
+import os
+import logging
+import threading
+from dotenv import load_dotenv
+from scripts.compiled_model import CompiledModel
+from scripts.success_table import SuccessTable
+
+"""
+Serving side of the course success model: what the routes call.
+
+Predictions come from, in order of preference:
+
+    the success table   (`flask model table`; a gpa interval x crn lookup, the model's own answers)
+    the compiled model  (written by `flask model train` / `flask model export`; numpy tree walk)
+    the joblib artifact (scripts/model.py; pandas + scikit-learn, imported only if needed)
+
+Only numpy is imported here, so a worker with a compiled export never loads
+pandas or scikit-learn. Each file is loaded on first use and kept. With no
+model trained at all, every probability is None: a request never trains one.
+"""
+
+load_dotenv()
+DATA_FILE = os.getenv("DATA_FILE")
+
+# bump when the artifact's contents change shape; older artifacts are refused and must be retrained
+ARTIFACT_VERSION = 1
+
+# where `flask model train` writes the artifact and the app reads it from (defaults to next to DATA_FILE)
+MODEL_FILE = os.getenv("MODEL_FILE") or os.path.join(
+    os.path.dirname(DATA_FILE) if DATA_FILE else ".", f"success_model.v{ARTIFACT_VERSION}.joblib"
+)
+
+# where `flask model train` writes the numpy export of the model (next to MODEL_FILE)
+COMPILED_FILE = os.getenv("COMPILED_MODEL_FILE") or os.path.join(
+    os.path.dirname(MODEL_FILE), f"success_model.v{ARTIFACT_VERSION}.npz"
+)
+
+# where `flask model table` writes the precomputed gpa x crn success table (next to MODEL_FILE)
+TABLE_FILE = os.getenv("SUCCESS_TABLE_FILE") or os.path.join(
+    os.path.dirname(MODEL_FILE), f"success_table.v{ARTIFACT_VERSION}.npz"
+)
+
+# run the compiled export instead of scikit-learn when there is one ("0" = always use the joblib artifact)
+USE_COMPILED_MODEL = os.getenv("COMPILED_MODEL", "1") != "0"
+
+# serve predictions from the success table when one matching the model has been built ("0" = always run the model)
+USE_SUCCESS_TABLE = os.getenv("SUCCESS_TABLE", "1") != "0"
+
+logger = logging.getLogger(__name__)
+
+_compiled = None
+_compiled_checked = False
+_table = None
+_table_checked = False
+# set when the joblib artifact turned out to be missing, so later predictions don't import and look again
+_artifact_missing = False
+# reentrant: checking the success table looks at the compiled model while holding it
+_lock = threading.RLock()
+
+
+def get_compiled_model() -> CompiledModel | None:
+    """
+    ### the CompiledModel predictions run on, loaded from COMPILED_FILE on first use
+    None when compiled models are off or none was exported
+    """
+    global _compiled, _compiled_checked
+    if not _compiled_checked:
+        with _lock:
+            if not _compiled_checked:
+                compiled = None
+                if USE_COMPILED_MODEL and os.path.exists(COMPILED_FILE):
+                    compiled = CompiledModel.load(COMPILED_FILE)
+                _compiled, _compiled_checked = compiled, True
+    return _compiled
+
+
+def model_trained_at() -> str | None:
+    """
+    ### trained_at of the model predictions fall back to (the compiled export, else the joblib artifact)
+    None when neither exists
+    """
+    compiled = get_compiled_model()
+    if compiled is not None:
+        return compiled.trained_at
+
+    from scripts import model
+    try:
+        return model.get_artifact()["trained_at"]
+    except FileNotFoundError:
+        return None
+
+
+def get_success_table() -> SuccessTable | None:
+    """
+    ### the SuccessTable predictions are served from, loaded from TABLE_FILE on first use
+    None when tables are off, none was built, or it was built for a different model
+    """
+    global _table, _table_checked
+    if not _table_checked:
+        with _lock:
+            if not _table_checked:
+                table = None
+                if USE_SUCCESS_TABLE and os.path.exists(TABLE_FILE):
+                    try:
+                        table = SuccessTable.load(TABLE_FILE)
+                    except ValueError as e:
+                        logger.warning(f"{e}; ignoring it")
+                    trained_at = model_trained_at() if table is not None else None
+                    if table is not None and table.trained_at != trained_at:
+                        logger.warning(f"{TABLE_FILE} was built for the model trained {table.trained_at}, not {trained_at}; ignoring it")
+                        table = None
+                _table, _table_checked = table, True
+    return _table
+
+
+def reset():
+    """
+    ### drops the loaded compiled model and table (and a recorded missing artifact) so the next prediction
+    looks again (ex. after retraining)
+    """
+    global _compiled, _compiled_checked, _table, _table_checked, _artifact_missing
+    with _lock:
+        _compiled, _compiled_checked = None, False
+        _table, _table_checked = None, False
+        _artifact_missing = False
+
+
+def predict_success_probabilities(gpa, crns, exact: bool = False) -> list:
+    """
+    ### success probability for every CRN in crns, from the table, compiled model or artifact (see above)
+    returns a list lined up with crns; None where a CRN isn't in the model's course table
+    (all None when no model has been trained)
+
+    #### args:
+    - gpa: the student's gpa
+    - crns: CRNs (int or str) ex. a whole filter or search result
+    - exact: always run the model, even when a success table is loaded
+    """
+    gpa = float(gpa)
+    if not exact:
+        table = get_success_table()
+        if table is not None:
+            return table.lookup(gpa, crns)
+
+    compiled = get_compiled_model()
+    if compiled is not None:
+        return compiled.predict(gpa, crns)
+
+    global _artifact_missing
+    if _artifact_missing:
+        return [None] * len(crns)
+
+    from scripts import model
+    try:
+        return model.predict_success_probabilities(gpa, crns)
+    except FileNotFoundError as e:
+        with _lock:
+            if not _artifact_missing:
+                logger.warning(str(e))
+            _artifact_missing = True
+        return [None] * len(crns)
@@ -0,0 +1,156 @@
+from scripts.catalog import CourseCatalog, deep_bytes, register_derived
+from scripts.prereq_store import COURSE, GROUP, PrereqStore
+
+"""
+Iterative, memoized prerequisite evaluator (what is_course_available runs).
+
+It answers exactly what can_take_course / check_pre_req_list answer:
+    - a required course counts when it's completed and its own prereqs are
+      satisfied by the completed courses (checked all the way down)
+    - operators on one level are read left to right, stopping as soon as an
+      "and" sees a miss or an "or" sees a hit, like the recursive version
+    - a parenthesized group is one requirement
+
+but walks each course's compiled prereqs with an explicit stack instead of one
+Python call per list element, and remembers each course's answer for the rest of
+the evaluation, so a course shared by many branches (or a 1000-course chain) is
+checked once and never runs into the recursion limit.
+"""
+
+
+def compile_levels(node: tuple) -> tuple[tuple, tuple]:
+    """
+    ### AST -> (operands, operators) of one flat level, the way the structured list reads it
+    operands are ("course", code) or ("group", nested level); operators[i] joins operand i and i + 1
+    """
+    operands = []
+    operators = []
+
+    def add(child):
+        if child[0] == COURSE:
+            operands.append((COURSE, child[1]))
+        elif child[0] == GROUP:
+            operands.append((GROUP, compile_levels(child[1])))
+        else:
+            # an unparenthesized "and" inside an "or" sits inline on the same level
+            for i, grandchild in enumerate(child[1]):
+                if i:
+                    operators.append(child[0])
+                add(grandchild)
+
+    add(node)
+    return tuple(operands), tuple(operators)
+
+
+class PrereqEvaluator:
+    """
+    ### evaluates prereqs for any course against a set of completed courses
+    - levels: course code -> compiled level (courses without prereqs aren't in it)
+
+    #### args:
+    - store: the catalog's compiled prereq ASTs
+    """
+
+    def __init__(self, store: PrereqStore):
+        self.levels = {
+            code: compile_levels(ast) for code, ast in store.asts.items() if ast is not None
+        }
+
+    def nbytes(self) -> int:
+        """
+        ### rough resident size in bytes
+        """
+        return deep_bytes(self.levels)
+
+    def can_take(self, course: str, completed_courses) -> bool:
+        """
+        ### same answer as can_take_course(course, completed_courses, traverse_pre_reqs(course))
+
+        #### args:
+        - course: course code ex. "CS277"
+        - completed_courses: course codes the student has completed
+        """
+        completed = completed_courses if isinstance(completed_courses, (set, frozenset)) else set(completed_courses)
+        if course in completed:
+            return True
+
+        level = self.levels.get(course)
+        if level is None:
+            return True
+
+        return self.satisfied(level, completed, owner=course)
+
+    def satisfied(self, level: tuple, completed: set, owner: str | None = None, memo: dict | None = None) -> bool:
+        """
+        ### is one compiled level satisfied; memo maps completed course -> its prereqs satisfied
+
+        #### args:
+        - owner: course whose prereqs level is (so it can be memoized too)
+        - memo: share one dict across calls to reuse answers for the same completed set
+        """
+        memo = {} if memo is None else memo
+        # courses whose prereqs are being evaluated right now; reaching one again means a cycle
+        active = set()
+
+        # frames are [operands, operators, position, owner]
+        stack = [[level[0], level[1], 0, owner]]
+        if owner is not None:
+            active.add(owner)
+        result = None
+
+        while stack:
+            frame = stack[-1]
+            operands, operators, position, frame_owner = frame
+
+            if result is not None:
+                # the sub-level pushed for this operand just finished
+                value = result
+                result = None
+
+            else:
+                kind, payload = operands[position]
+
+                if kind == GROUP:
+                    stack.append([payload[0], payload[1], 0, None])
+                    continue
+
+                if payload not in completed:
+                    value = False
+                elif payload in memo:
+                    value = memo[payload]
+                elif payload in active:
+                    value = False
+                else:
+                    course_level = self.levels.get(payload)
+                    if course_level is None:
+                        value = memo[payload] = True
+                    else:
+                        active.add(payload)
+                        stack.append([course_level[0], course_level[1], 0, payload])
+                        continue
+
+            # short-circuit on this level exactly like check_pre_req_list
+            done = None
+            if position == len(operands) - 1:
+                done = value
+            elif operators[position] == "and" and not value:
+                done = False
+            elif operators[position] == "or" and value:
+                done = True
+
+            if done is None:
+                frame[2] = position + 1
+                continue
+
+            stack.pop()
+            if frame_owner is not None:
+                memo[frame_owner] = done
+                active.discard(frame_owner)
+            result = done
+
+        return result
+
+
+@register_derived("prereq_evaluator")
+def build_prereq_evaluator(catalog: CourseCatalog) -> PrereqEvaluator:
+    return PrereqEvaluator(catalog.derived("prereqs"))
@@ -0,0 +1,322 @@
+import numpy as np
+from scripts.catalog import CourseCatalog, deep_bytes, register_derived
+from scripts.prereq_store import COURSE, AND, OR, PrereqStore, ast_courses, strip_groups
+
+"""
+Catalog-wide prerequisite graph, built once per catalog snapshot from the
+compiled prereq ASTs (scripts/prereq_store.py).
+
+Every course code in the catalog, plus every code only ever mentioned as a
+prereq (ex. MATH 121 when it isn't offered this term), gets an integer id.
+For each course the graph keeps:
+    - requires / unlocks: direct prereqs and the courses listing it as a prereq
+    - ancestors / descendants: everything upstream / downstream of it, as one
+      row of a packed uint64 bit matrix, so "is A anywhere upstream of B" is
+      one word lookup and "everything upstream of CS277" is one row
+    - depth: prereq levels below it ("and" takes the deepest branch, "or" the
+      shallowest), i.e. the fewest terms of prereqs before it can be taken
+
+A topological order (prereqs first) and any prereq cycles come out of one pass
+of Tarjan's strongly connected components.
+"""
+
+# depth of a course whose prereq chain runs into a cycle (can't be satisfied)
+UNREACHABLE = -1
+
+
+def bitset_words(size: int) -> int:
+    """
+    ### uint64 words needed for a bitset over size ids
+    """
+    return (size + 63) // 64
+
+
+def bitset_indices(row: np.ndarray) -> np.ndarray:
+    """
+    ### ids whose bits are set in a packed uint64 bitset row
+    """
+    return np.flatnonzero(np.unpackbits(row.view(np.uint8), bitorder="little"))
+
+
+def strongly_connected(requires: list[tuple[int, ...]]) -> list[list[int]]:
+    """
+    ### Tarjan's strongly connected components over course -> prereq edges (iterative)
+    components come out prereqs first, so their concatenation is a topological order
+    """
+    size = len(requires)
+    index_of = [-1] * size
+    low = [0] * size
+    on_stack = [False] * size
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(size):
+        if index_of[root] != -1:
+            continue
+
+        work = [(root, 0)]
+        while work:
+            node, child_position = work[-1]
+            if child_position == 0 and index_of[node] == -1:
+                index_of[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+
+            children = requires[node]
+            if child_position < len(children):
+                work[-1] = (node, child_position + 1)
+                child = children[child_position]
+                if index_of[child] == -1:
+                    work.append((child, 0))
+                elif on_stack[child]:
+                    low[node] = min(low[node], index_of[child])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+
+            if low[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+class PrereqGraph:
+    """
+    ### prerequisite DAG over every course code in a catalog
+    - codes / index: id -> course code and back
+    - requires / unlocks: id -> tuple of direct prereq ids / ids it's a direct prereq of
+    - order: ids in topological order (prereqs first)
+    - cycles: lists of course codes that require each other
+    - ancestors / descendants: (courses x words) uint64 bit matrices
+    - depth: int32 prereq levels per course (UNREACHABLE when a cycle blocks it)
+
+    #### args:
+    - store: the catalog's compiled prereq ASTs
+    """
+
+    def __init__(self, store: PrereqStore):
+        mentioned = {code for ast in store.asts.values() for code in ast_courses(ast)}
+        self.codes = sorted(store.asts.keys() | mentioned)
+        self.index = {code: course_id for course_id, code in enumerate(self.codes)}
+        size = len(self.codes)
+
+        # "group" wrappers only matter for the legacy list form
+        self.asts = [strip_groups(store.get(code)) for code in self.codes]
+
+        self.requires = [
+            tuple(dict.fromkeys(self.index[code] for code in ast_courses(ast)))
+            for ast in self.asts
+        ]
+        unlocks = [[] for _ in range(size)]
+        for course_id, prereq_ids in enumerate(self.requires):
+            for prereq_id in prereq_ids:
+                unlocks[prereq_id].append(course_id)
+        self.unlocks = [tuple(course_ids) for course_ids in unlocks]
+
+        components = strongly_connected(self.requires)
+        self.order = [course_id for component in components for course_id in component]
+
+        component_of = np.empty(size, dtype=np.int64)
+        cyclic = []
+        for component_id, component in enumerate(components):
+            component_of[component] = component_id
+            only = component[0]
+            cyclic.append(len(component) > 1 or only in self.requires[only])
+        self.cycles = [
+            sorted(self.codes[course_id] for course_id in component)
+            for component, is_cyclic in zip(components, cyclic) if is_cyclic
+        ]
+
+        words = bitset_words(size)
+        self.ancestors = np.zeros((size, words), dtype=np.uint64)
+        self.descendants = np.zeros((size, words), dtype=np.uint64)
+        self.depth = np.zeros(size, dtype=np.int32)
+        bits = np.uint64(1) << (np.arange(size, dtype=np.uint64) % np.uint64(64))
+        word_of = np.arange(size) // 64
+
+        def closure(matrix, component, is_cyclic, neighbours):
+            # a component's members all share one closure row
+            row = np.zeros(words, dtype=np.uint64)
+            for member in component:
+                for other in neighbours[member]:
+                    if component_of[other] != component_of[member]:
+                        row |= matrix[other]
+                        row[word_of[other]] |= bits[other]
+            if is_cyclic:
+                for member in component:
+                    row[word_of[member]] |= bits[member]
+            matrix[component] = row
+
+        # ancestors prereqs first, descendants in reverse
+        for component, is_cyclic in zip(components, cyclic):
+            closure(self.ancestors, component, is_cyclic, self.requires)
+            for member in component:
+                self.depth[member] = self._depth(member, component_of, is_cyclic)
+        for component, is_cyclic in zip(reversed(components), reversed(cyclic)):
+            closure(self.descendants, component, is_cyclic, self.unlocks)
+
+    def nbytes(self) -> int:
+        """
+        ### rough resident size in bytes; the ancestor/descendant bitsets are len(self)^2 / 4 bytes
+        """
+        return deep_bytes(self.codes, self.index, self.asts, self.requires, self.unlocks, self.order, self.cycles, self.ancestors, self.descendants, self.depth)
+
+    def _depth(self, course_id: int, component_of: np.ndarray, is_cyclic: bool) -> int:
+        ast = self.asts[course_id]
+        if ast is None:
+            return 0
+
+        # post-order over the AST with an explicit stack; prereqs in the same cycle can't be met
+        values = []
+        stack = [(ast, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node[0] == COURSE:
+                prereq_id = self.index[node[1]]
+                blocked = is_cyclic and component_of[prereq_id] == component_of[course_id]
+                depth = UNREACHABLE if blocked else int(self.depth[prereq_id])
+                values.append(float("inf") if depth == UNREACHABLE else depth)
+            elif not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node[1]))
+            else:
+                children = [values.pop() for _ in node[1]]
+                values.append(max(children) if node[0] == AND else min(children))
+
+        depth = values.pop()
+        return UNREACHABLE if depth == float("inf") else int(depth) + 1
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.index
+
+    def _id(self, code: str) -> int:
+        course_id = self.index.get(code)
+        if course_id is None:
+            raise LookupError(f"{code} is not in the prerequisite graph.")
+        return course_id
+
+    def topological_order(self) -> list[str]:
+        """
+        ### every course code, each after all of its prereqs (cycle members end up adjacent)
+        """
+        return [self.codes[course_id] for course_id in self.order]
+
+    def direct_prereqs(self, code: str) -> list[str]:
+        return [self.codes[prereq_id] for prereq_id in self.requires[self._id(code)]]
+
+    def direct_unlocks(self, code: str) -> list[str]:
+        return [self.codes[course_id] for course_id in self.unlocks[self._id(code)]]
+
+    def upstream(self, code: str) -> list[str]:
+        """
+        ### every course anywhere in code's prereq tree (either side of an "or" included)
+        """
+        return [self.codes[course_id] for course_id in bitset_indices(self.ancestors[self._id(code)])]
+
+    def downstream(self, code: str) -> list[str]:
+        """
+        ### every course that has code anywhere in its prereq tree
+        """
+        return [self.codes[course_id] for course_id in bitset_indices(self.descendants[self._id(code)])]
+
+    def is_upstream(self, prereq: str, code: str) -> bool:
+        """
+        ### O(1): is prereq anywhere in code's prereq tree
+        """
+        prereq_id = self._id(prereq)
+        word = self.ancestors[self._id(code), prereq_id // 64]
+        return bool(word >> np.uint64(prereq_id % 64) & np.uint64(1))
+
+    def chain_depth(self, code: str) -> int:
+        """
+        ### O(1): prereq levels below code (0 = no prereqs, UNREACHABLE = blocked by a cycle)
+        """
+        return int(self.depth[self._id(code)])
+
+
+@register_derived("prereq_graph")
+def build_prereq_graph(catalog: CourseCatalog) -> PrereqGraph:
+    return PrereqGraph(catalog.derived("prereqs"))
+
+
+# closure/depth checks against a plain recursive walk + build time on a synthetic catalog-sized graph
+if __name__ == "__main__":
+    import time
+    import random
+    from scripts.catalog import DATA_FILE, load_catalog
+    from scripts.prereqs import traverse_pre_reqs
+
+    catalog = load_catalog(DATA_FILE)
+    graph = catalog.derived("prereq_graph")
+    print(f"{len(graph)} courses | cycles: {graph.cycles}")
+    print(f"upstream of CS277: {graph.upstream('CS277')} | chain depth: {graph.chain_depth('CS277')}")
+
+    position = {course_id: i for i, course_id in enumerate(graph.order)}
+    for course_id, prereq_ids in enumerate(graph.requires):
+        assert all(position[prereq_id] < position[course_id] for prereq_id in prereq_ids)
+
+    def walk(code, seen):
+        for prereq in graph.direct_prereqs(code):
+            if prereq not in seen:
+                seen.add(prereq)
+                walk(prereq, seen)
+        return seen
+
+    for code in graph.codes:
+        assert set(graph.upstream(code)) == walk(code, set()), code
+        # traverse_pre_reqs only lists upstream courses that have prereqs of their own
+        if code in catalog.codes():
+            assert set(traverse_pre_reqs(code, catalog=catalog)) - {code} <= set(graph.upstream(code))
+        for prereq in graph.upstream(code):
+            assert code in graph.downstream(prereq)
+    print("topological order, ancestor and descendant sets agree with a recursive walk")
+
+    # cycle detection on a tiny hand-made store
+    cyclic = PrereqGraph(PrereqStore({
+        "A101": ("course", "B101", "C"),
+        "B101": ("and", (("course", "A101", "C"), ("course", "C101", "C"))),
+        "C101": None,
+        "D101": ("or", (("course", "A101", "C"), ("course", "C101", "C"))),
+    }))
+    assert cyclic.cycles == [["A101", "B101"]]
+    assert cyclic.chain_depth("A101") == UNREACHABLE and cyclic.chain_depth("D101") == 1
+    assert cyclic.is_upstream("A101", "A101") and cyclic.downstream("C101") == ["A101", "B101", "D101"]
+    print("cycle detection ok")
+
+    # random catalog-sized DAG: each course needs an and/or of up to 4 earlier courses
+    rng = random.Random(7)
+    size = 10_000
+    asts = {}
+    for i in range(size):
+        earlier = rng.sample(range(i), min(i, rng.randint(0, 4)))
+        leaves = [("course", f"C{j:05d}", "C") for j in earlier]
+        asts[f"C{i:05d}"] = None if not leaves else leaves[0] if len(leaves) == 1 else (rng.choice(["and", "or"]), tuple(leaves))
+
+    started = time.perf_counter()
+    big = PrereqGraph(PrereqStore(asts))
+    build_ms = (time.perf_counter() - started) * 1000
+
+    runs = 10_000
+    started = time.perf_counter()
+    for _ in range(runs):
+        big.is_upstream("C00010", "C09999")
+        big.chain_depth("C09999")
+    lookup_us = (time.perf_counter() - started) / runs * 1e6
+    print(f"{size} courses | build: {build_ms:.1f}ms | upstream check + depth lookup: {lookup_us:.2f}us"
+          f" | bitsets: {big.ancestors.nbytes * 2 / 1e6:.1f}MB | nbytes(): {big.nbytes() / 1e6:.1f}MB")
+    assert big.nbytes() > big.ancestors.nbytes + big.descendants.nbytes
@@ -0,0 +1,242 @@
+import re
+import sys
+
+"""
+Hand-written tokenizer + precedence parser for the scraped prereqs strings.
+
+It accepts exactly what the pyparsing grammar in prereq_store.build_grammar
+accepts and returns the same AST, without building ParseResults first:
+
+    expr     := and_expr ("or" and_expr)*
+    and_expr := atom ("and" atom)*
+    atom     := course | "(" expr ")"
+    course   := letters digits "Minimum Grade:" letters
+
+Like pyparsing's parseString it reads the longest prefix that fits and ignores
+the rest (so a trailing "(CS 501 may be taken concurrently)" note just ends the
+parse), and only fails when the string doesn't start with a course or a group.
+"""
+
+COURSE = "course"
+AND = "and"
+OR = "or"
+GROUP = "group"
+
+# token kinds
+LETTERS = 0
+DIGITS = 1
+CHAR = 2
+END = 3
+
+# Keyword("and") can't touch any of these on either side
+KEYWORD_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_$")
+
+# skips the whitespace pyparsing skips (" \n\t\r") before each token
+_TOKEN = re.compile(r"[ \n\t\r]*(?:([A-Za-z]+)|([0-9]+)|(.))", re.S)
+
+
+class PrereqSyntaxError(ValueError):
+    """
+    ### the prereqs string doesn't start with a course or a parenthesized group
+    """
+
+
+def tokenize(text: str) -> tuple[list[int], list[str], list[int]]:
+    """
+    ### prereqs string -> (kinds, texts, starts), one entry per token plus an END entry
+    runs of letters and of digits are single tokens, anything else is one character
+    """
+    kinds = []
+    texts = []
+    starts = []
+    for match in _TOKEN.finditer(text):
+        if match.lastindex is None:
+            # only trailing whitespace left
+            break
+        kinds.append(match.lastindex - 1)
+        texts.append(match.group(match.lastindex))
+        starts.append(match.start(match.lastindex))
+
+    kinds.append(END)
+    texts.append("")
+    starts.append(len(text))
+    return kinds, texts, starts
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.kinds, self.texts, self.starts = tokenize(text)
+
+    def keyword(self, i: int, word: str) -> bool:
+        # Keyword(word): whole token, not glued to letters/digits/_/$ on either side
+        if self.kinds[i] != LETTERS or self.texts[i] != word:
+            return False
+        start = self.starts[i]
+        end = start + len(word)
+        text = self.text
+        return (start == 0 or text[start - 1] not in KEYWORD_CHARS) and (end >= len(text) or text[end] not in KEYWORD_CHARS)
+
+    def grade_literal(self, i: int) -> bool:
+        # Literal("Minimum Grade:") is matched character for character (one space, no space before ":")
+        if self.texts[i] != "Minimum" or self.texts[i + 1] != "Grade" or self.kinds[i] != LETTERS:
+            return False
+        grade_start = self.starts[i] + len("Minimum ")
+        return (
+            self.starts[i + 1] == grade_start
+            and self.text[grade_start - 1] == " "
+            and self.kinds[i + 2] == CHAR
+            and self.texts[i + 2] == ":"
+            and self.starts[i + 2] == grade_start + len("Grade")
+        )
+
+    def course(self, i: int):
+        kinds = self.kinds
+        if kinds[i] != LETTERS or kinds[i + 1] != DIGITS:
+            return None
+        if kinds[i + 2] != LETTERS or not self.grade_literal(i + 2) or kinds[i + 5] != LETTERS:
+            return None
+        texts = self.texts
+        return (COURSE, sys.intern(texts[i] + texts[i + 1]), sys.intern(texts[i + 5])), i + 6
+
+    def atom(self, i: int):
+        parsed = self.course(i)
+        if parsed is not None:
+            return parsed
+
+        if self.kinds[i] != CHAR or self.texts[i] != "(":
+            return None
+        parsed = self.expr(i + 1)
+        if parsed is None:
+            return None
+        node, i = parsed
+        if self.kinds[i] != CHAR or self.texts[i] != ")":
+            return None
+        return (GROUP, node), i + 1
+
+    def and_expr(self, i: int):
+        parsed = self.atom(i)
+        if parsed is None:
+            return None
+        node, i = parsed
+        terms = [node]
+
+        # ZeroOrMore(and + atom): a dangling "and" is left unread, not an error
+        while self.keyword(i, AND):
+            parsed = self.atom(i + 1)
+            if parsed is None:
+                break
+            node, i = parsed
+            terms.append(node)
+
+        return (terms[0] if len(terms) == 1 else (AND, tuple(terms))), i
+
+    def expr(self, i: int):
+        parsed = self.and_expr(i)
+        if parsed is None:
+            return None
+        node, i = parsed
+        terms = [node]
+
+        while self.keyword(i, OR):
+            parsed = self.and_expr(i + 1)
+            if parsed is None:
+                break
+            node, i = parsed
+            terms.append(node)
+
+        return (terms[0] if len(terms) == 1 else (OR, tuple(terms))), i
+
+
+def parse(text: str) -> tuple | None:
+    """
+    ### prereqs string -> AST; None for an empty string
+    raises PrereqSyntaxError when the string doesn't start with a course or "("
+    """
+    if not text:
+        return None
+
+    parsed = _Parser(text).expr(0)
+    if parsed is None:
+        raise PrereqSyntaxError(f"Expected a course or '(' at the start of {text!r}")
+    return parsed[0]
+
+
+# equivalence fuzzing against the pyparsing reference + parser benchmark
+if __name__ == "__main__":
+    import time
+    import random
+    import pyparsing as pp
+    from scripts.catalog import DATA_FILE, load_catalog
+    from scripts.prereq_store import PRE_REQ_GRAMMAR, compile_pre_reqs, to_structured
+    from scripts.prereqs import structure_pre_reqs
+
+    def reference(text):
+        if not text:
+            return None, None
+        try:
+            parsed = PRE_REQ_GRAMMAR.parseString(text)
+        except pp.ParseException:
+            return "error", None
+        return compile_pre_reqs(parsed), structure_pre_reqs(parsed)
+
+    def fast(text):
+        try:
+            ast = parse(text)
+        except PrereqSyntaxError:
+            return "error", None
+        return ast, to_structured(ast)
+
+    catalog = load_catalog(DATA_FILE)
+    strings = sorted({text for code in catalog.codes() for text in catalog.values_for(code, "prereqs") if text})
+
+    for text in strings:
+        assert fast(text) == reference(text), text
+    print(f"{len(strings)} catalog pre-req strings: same AST and structured form as pyparsing")
+
+    # mutations of real strings: truncation, dropped/duplicated/swapped tokens, glued or odd spacing
+    rng = random.Random(13)
+    pieces = ["and", "or", "(", ")", " ", "  ", "\t", "Minimum Grade:", "Minimum  Grade:", "Minimum Grade :",
+              "CS", "171", "C", "D-", "andor", "and5", "_", "$", "x", ":", "\xa0", "\n"]
+
+    def mutate(text):
+        for _ in range(rng.randint(1, 4)):
+            choice = rng.random()
+            position = rng.randint(0, len(text))
+            if choice < 0.25:
+                text = text[:position]
+            elif choice < 0.5:
+                text = text[:position] + rng.choice(pieces) + text[position:]
+            elif choice < 0.7:
+                end = min(len(text), position + rng.randint(1, 6))
+                text = text[:position] + text[end:]
+            elif choice < 0.85:
+                text = text + rng.choice([" and ", " or ", " and (", ")"]) + rng.choice(strings)
+            else:
+                text = text.replace(" ", rng.choice(["", "  ", "\n", " "]), rng.randint(1, 3))
+        return text
+
+    fuzzed = 0
+    errors = 0
+    for _ in range(50_000):
+        text = mutate(rng.choice(strings))
+        expected = reference(text)
+        assert fast(text) == expected, repr(text)
+        fuzzed += 1
+        errors += expected[0] == "error"
+    print(f"{fuzzed} fuzzed strings ({errors} rejected by both): identical results")
+
+    runs = 20
+    started = time.perf_counter()
+    for _ in range(runs):
+        for text in strings:
+            compile_pre_reqs(PRE_REQ_GRAMMAR.parseString(text))
+    pyparsing_ms = (time.perf_counter() - started) / runs * 1000
+
+    started = time.perf_counter()
+    for _ in range(runs):
+        for text in strings:
+            parse(text)
+    fast_ms = (time.perf_counter() - started) / runs * 1000
+    print(f"all {len(strings)} strings | pyparsing: {pyparsing_ms:.2f}ms | hand-written: {fast_ms:.2f}ms"
+          f" ({pyparsing_ms / fast_ms:.0f}x)")
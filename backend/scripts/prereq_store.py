@@ -0,0 +1,301 @@
+import os
+import sys
+import json
+import logging
+import pyparsing as pp
+from scripts.catalog import CourseCatalog, load_catalog, deep_bytes, register_derived
+from scripts import prereq_parser
+from scripts.prereq_parser import COURSE, AND, OR, GROUP, PrereqSyntaxError
+
+"""
+Prerequisite ASTs compiled once per catalog snapshot.
+
+Every course's prereqs string ("CS 260  Minimum Grade: C and (MATH 201  Minimum
+Grade: C or ENGR 231  Minimum Grade: D)") is parsed a single time when the catalog
+loads and kept as a small tuple tree:
+
+    ("course", "CS260", "C")        one required course + minimum grade
+    ("and", (node, node, ...))      every child required
+    ("or", (node, node, ...))       any child is enough
+    ("group", node)                 a parenthesized sub-expression (kept so the
+                                    legacy list form can be rebuilt exactly)
+
+A course without prereqs maps to None. The store can be saved next to the json
+data file (<name>.prereqs.json) so a worker loading an unchanged catalog doesn't
+have to parse anything at all.
+
+Strings are parsed by the hand-written parser in scripts/prereq_parser.py; set
+PREREQ_PARSER=pyparsing to go through the reference pyparsing grammar instead.
+"""
+
+# "fast" (hand-written parser) or "pyparsing" (reference grammar below)
+PREREQ_PARSER = os.environ.get("PREREQ_PARSER", "fast")
+
+# what either parser raises for a string that doesn't start with a course or "("
+PARSE_ERRORS = (pp.ParseException, PrereqSyntaxError)
+
+logger = logging.getLogger(__name__)
+
+
+def build_grammar() -> pp.ParserElement:
+    """
+    ### pyparsing grammar for the scraped prereqs strings. Ex: INFO 212  Minimum Grade: D
+    """
+    course_id = pp.Word(pp.alphas) + pp.Word(pp.nums)
+    # make sure that INFO 212 -> INFO212 (no spaces)
+    course_id.setParseAction(lambda tokens: [tokens[0] + tokens[1]])
+
+    grade_req = pp.Literal("Minimum Grade:") + pp.Word(pp.alphas)
+
+    # we take a string and turn each our vocab into a nested list
+    course_format = pp.Group(course_id + grade_req)
+
+    # must be leading word and exact match
+    keyword_and = pp.Keyword("and")
+    keyword_or = pp.Keyword("or")
+
+    # declare the fact we'll use recursive grammar w/ Forward Obj
+    expr = pp.Forward()
+
+    # this handles exact expression like: 'course or (any expression within grammar)'
+    atom = course_format | pp.Group(pp.Suppress("(") + expr + pp.Suppress(")"))
+
+    # handles any format like: 'A and B and C'
+    and_expr = atom + pp.ZeroOrMore(keyword_and + atom)
+
+    # handles multiple and expression and multiple or expression with nested and
+    expr << and_expr + pp.ZeroOrMore(keyword_or + and_expr)
+    return expr
+
+
+# built once at import; parse actions are stateless so every thread can share it
+PRE_REQ_GRAMMAR = build_grammar()
+
+
+def compile_pre_reqs(parsed: pp.ParseResults) -> tuple:
+    """
+    ### pyparsing output -> AST ("and" binds tighter than "or", like the grammar)
+    """
+    terms = [[]]
+    for item in parsed:
+        if isinstance(item, str):
+            if item == OR:
+                terms.append([])
+            continue
+
+        if len(item) >= 3 and item[1] == "Minimum Grade:":
+            terms[-1].append((COURSE, sys.intern(item[0]), sys.intern(item[2])))
+        else:
+            terms[-1].append((GROUP, compile_pre_reqs(item)))
+
+    ands = [term[0] if len(term) == 1 else (AND, tuple(term)) for term in terms]
+    return ands[0] if len(ands) == 1 else (OR, tuple(ands))
+
+
+def parse_pre_req_string(text: str, parser: str | None = None) -> tuple | None:
+    """
+    ### prereqs string -> AST; None for an empty string
+    raises one of PARSE_ERRORS when the string doesn't start with a course or "("
+
+    #### args:
+    - parser: "fast" or "pyparsing"; defaults to PREREQ_PARSER
+    """
+    if not text:
+        return None
+    if (parser or PREREQ_PARSER) == "pyparsing":
+        return compile_pre_reqs(PRE_REQ_GRAMMAR.parseString(text))
+    return prereq_parser.parse(text)
+
+
+def strip_groups(node: tuple | None) -> tuple | None:
+    """
+    ### the same AST without "group" wrappers (what evaluators care about)
+    """
+    if node is None or node[0] == COURSE:
+        return node
+    if node[0] == GROUP:
+        return strip_groups(node[1])
+    return (node[0], tuple(strip_groups(child) for child in node[1]))
+
+
+def ast_courses(node: tuple | None):
+    """
+    ### every course code mentioned in an AST, left to right (repeats included)
+    """
+    if node is None:
+        return
+    if node[0] == COURSE:
+        yield node[1]
+    elif node[0] == GROUP:
+        yield from ast_courses(node[1])
+    else:
+        for child in node[1]:
+            yield from ast_courses(child)
+
+
+def to_structured(node: tuple | None) -> list | None:
+    """
+    ### AST -> the flat list form structure_pre_reqs produces and can_take_course reads
+    ex. [{'course': 'CS260', 'grade': 'C'}, 'and', [{...}, 'or', {...}]]
+    """
+    if node is None:
+        return None
+
+    if node[0] == COURSE:
+        return [{"course": node[1], "grade": node[2]}]
+
+    if node[0] == GROUP:
+        return [to_structured(node[1])]
+
+    result = []
+    for i, child in enumerate(node[1]):
+        if i:
+            result.append(node[0])
+        if child[0] == GROUP:
+            result.append(to_structured(child[1]))
+        else:
+            # courses and the and-terms of an "or" sit inline, like the grammar's flat output
+            result.extend(to_structured(child))
+    return result
+
+
+def _freeze(node):
+    # json lists -> the tuples the AST is made of
+    if isinstance(node, list):
+        return tuple(_freeze(item) for item in node)
+    return node
+
+
+def prereq_store_path(json_path: str) -> str:
+    """
+    ### where the persisted prereq store for a json data file lives (right next to it)
+    """
+    return os.path.splitext(json_path)[0] + ".prereqs.json"
+
+
+class PrereqStore:
+    """
+    ### every course's compiled prereq AST for one catalog
+    - asts: course code -> AST (None when the course has no prereqs)
+    - checksum: checksum of the catalog the ASTs were compiled from
+
+    #### args:
+    - asts: course code -> AST
+    - checksum: source catalog checksum (used to tell if a saved store is stale)
+    """
+
+    def __init__(self, asts: dict[str, tuple | None], checksum: str | None = None):
+        self.asts = asts
+        self.checksum = checksum
+
+    def nbytes(self) -> int:
+        """
+        ### rough resident size in bytes
+        """
+        return deep_bytes(self.asts)
+
+    @classmethod
+    def from_catalog(cls, catalog: CourseCatalog) -> "PrereqStore":
+        """
+        ### parses every course's prereqs once (sections sharing a string share one parse)
+        like parse_pre_reqs, the first section whose string parses decides the course's prereqs
+        """
+        parsed = {}
+        asts = {}
+
+        for code in catalog.codes():
+            for text in catalog.values_for(code, "prereqs"):
+                if text not in parsed:
+                    try:
+                        parsed[text] = parse_pre_req_string(text)
+                    except PARSE_ERRORS as e:
+                        logger.warning(f"Could not parse pre-reqs for {code}: {e}")
+                        parsed[text] = e
+
+                if not isinstance(parsed[text], PARSE_ERRORS):
+                    asts[code] = parsed[text]
+                    break
+            else:
+                asts[code] = None
+
+        return cls(asts, checksum=catalog.checksum)
+
+    @classmethod
+    def load(cls, path: str) -> "PrereqStore":
+        with open(path) as store_file:
+            data = json.load(store_file)
+        return cls(
+            {code: _freeze(ast) for code, ast in data["asts"].items()},
+            checksum=data.get("checksum"),
+        )
+
+    def save(self, path: str):
+        """
+        ### writes the store as json (temp file + rename so readers never see half of it)
+        """
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as store_file:
+            json.dump({"checksum": self.checksum, "asts": self.asts}, store_file, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    def get(self, course_code: str) -> tuple | None:
+        """
+        ### the AST for a course; None when it has no prereqs (or isn't in the catalog)
+        """
+        return self.asts.get(course_code)
+
+    def __contains__(self, course_code: str) -> bool:
+        return course_code in self.asts
+
+    def __len__(self):
+        return len(self.asts)
+
+
+@register_derived("prereqs")
+def build_prereq_store(catalog: CourseCatalog) -> PrereqStore:
+    # a store saved next to the json for this exact catalog skips parsing entirely
+    if catalog.source and catalog.checksum:
+        path = prereq_store_path(catalog.source)
+        try:
+            store = PrereqStore.load(path)
+            if store.checksum == catalog.checksum:
+                return store
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Could not read prereq store {path}: {e}")
+
+    return PrereqStore.from_catalog(catalog)
+
+
+def write_prereq_store(json_path: str) -> str:
+    """
+    ### build step: compiles and saves the prereq store next to the json; returns the path written
+    """
+    path = prereq_store_path(json_path)
+    PrereqStore.from_catalog(load_catalog(json_path)).save(path)
+    return path
+
+
+# save/load round trip + the loader picking up a saved store for an unchanged catalog
+if __name__ == "__main__":
+    import time
+    import shutil
+    import tempfile
+    from scripts.catalog import DATA_FILE
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = shutil.copy(DATA_FILE, os.path.join(temp_dir, "catalog.json"))
+
+        started = time.perf_counter()
+        store = PrereqStore.from_catalog(load_catalog(source))
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        write_prereq_store(source)
+        started = time.perf_counter()
+        loaded = build_prereq_store(load_catalog(source))
+        load_ms = (time.perf_counter() - started) * 1000
+
+        assert loaded.asts == store.asts and loaded.checksum == store.checksum
+        with_prereqs = sum(ast is not None for ast in store.asts.values())
+        print(f"{len(store)} courses ({with_prereqs} with pre-reqs) | compile: {compile_ms:.2f}ms | load saved store: {load_ms:.2f}ms")
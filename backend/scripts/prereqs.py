@@ -1,74 +1,44 @@
-import os
-import json
 import pyparsing as pp
-from dotenv import load_dotenv
-load_dotenv()
+from scripts.catalog import CourseCatalog, get_catalog
+from scripts.prereq_store import PRE_REQ_GRAMMAR, ast_courses, to_structured
+from scripts import prereq_eval
 
-# global env that stores location of json data
-DATA_FILE = os.getenv("DATA_FILE")
 
-
-def parse_pre_reqs(user_course: str) -> pp.ParseResults | None:
+def parse_pre_reqs(user_course: str, catalog: CourseCatalog | None = None, term=None) -> pp.ParseResults | None:
     """
     ### Organizes a user's pre-reqs in a structured dictionary
         Each entry in the dictionary is from the json file containing
         all courses, algorithm checks at first for pre-reqs; if it finds more 
         pre-reqs inside pre-reqs it makes a new entry in dictionary with
         a recursive approach. Separates each entry by 'or' and 'and' course reqs.
-    """
-
-   # define grammar for JSON data. Ex: INFO 212  Minimum Grade: D
-    course_id = pp.Word(pp.alphas) + pp.Word(pp.nums)
-    # make sure that INFO 212 -> INFO212 (no spaces)
-    course_id.setParseAction(lambda tokens: [tokens[0] + tokens[1]])
-
-    grade_req = pp.Literal("Minimum Grade:") + pp.Word(pp.alphas)
-
-    # we take a string and turn each our vocab into a nested list
-    course_format = pp.Group(course_id + grade_req)
-
-    # must be leading word and exact match
-    keyword_and = pp.Keyword("and")
-    keyword_or = pp.Keyword("or")
-
-    # declare the fact we'll use recursive grammar w/ Forward Obj
-    expr = pp.Forward()
 
-    # this handles exact expression like: 'course or (any expression within grammar)'
-    atom = course_format | pp.Group(pp.Suppress("(") + expr + pp.Suppress(")"))
+    the grammar is built once (prereq_store.PRE_REQ_GRAMMAR); the catalog's
+    compiled ASTs (catalog.derived("prereqs")) are what the request path uses
 
-    # handles any format like: 'A and B and C'; 
-    and_expr = atom + pp.ZeroOrMore(keyword_and + atom)
-
-    # handles multiple and expression and multiple or expression with nested and
-    expr << and_expr + pp.ZeroOrMore(keyword_or + and_expr)
-
-    # open the json file turn all data into string then into python dict
-    with open(DATA_FILE) as data_file:
-        course_content = data_file.read()
-        course_data = json.loads(course_content)
-
-        # we loop through the json data key and value pairs with the value being the dict
-        for crn, pre_req_dict in course_data.items():
-            # use string concatenation get course with same subject code and number
-            if user_course ==  pre_req_dict["subject_code"]+pre_req_dict["course_number"]:
+    #### args:
+    - catalog: catalog snapshot to read from; defaults to the live one
+    - term: term id whose catalog to use when no snapshot is passed (None = current term)
+    """
+    catalog = catalog or get_catalog(term)
 
-                # find that same course's pre-reqs 
-                user_course_prereqs = pre_req_dict["prereqs"]
+    # look up every section of the course in the catalog's code index
+    for section in catalog.sections_for(user_course):
+        # find that same course's pre-reqs 
+        user_course_prereqs = section.prereqs
 
-                # if there is no pre-reqs return 'None'
-                if len(user_course_prereqs) == 0: 
-                    return None
+        # if there is no pre-reqs return 'None'
+        if len(user_course_prereqs) == 0: 
+            return None
 
-                # parse the pre-reqs string
-                try:
-                    parsed = expr.parseString(user_course_prereqs)
-                    return parsed
-                
-                # print it out to flask server specific error (should never happen)
-                except pp.ParseException:
-                    # Handle parsing errors
-                    print(f"Error parsing pre-reqs for {user_course}")
+        # parse the pre-reqs string
+        try:
+            parsed = PRE_REQ_GRAMMAR.parseString(user_course_prereqs)
+            return parsed
+        
+        # print it out to flask server specific error (should never happen)
+        except pp.ParseException:
+            # Handle parsing errors
+            print(f"Error parsing pre-reqs for {user_course}")
                 
 
 def structure_pre_reqs(all_course_pre_reqs: dict) -> dict:
@@ -99,21 +69,51 @@ def structure_pre_reqs(all_course_pre_reqs: dict) -> dict:
     return result
 
 
-def traverse_pre_reqs(parsed_nested_pre_reqs: list, all_course_pre_reqs: dict) -> dict[list]:
+def traverse_pre_reqs(target_course: str, catalog: CourseCatalog | None = None, term=None) -> dict[list]:
     """
-    ### Recursively structure each pp.ParseResult object into a structured dictionary
-    add the pre-reqs to each entry until len of pre-reqs is 0 
+    ### Structured dictionary of a course's pre-reqs, their pre-reqs and so on
+    walks the catalog's compiled prereq ASTs (in memory, nothing is parsed) and returns
+    {course: structured pre-reqs} with the target first, in the same format as before
 
     #### args:
-    - parsed_nested_pre_reqs: nested list of pp.ParseResult objects that will be parsed 
-    through and added to dictionary with course name as key and the pre-reqs as values
+    - target_course: course code ex. "CS277"
+    - catalog: catalog snapshot to read from; defaults to the live one
+    - term: term id whose catalog to use when no snapshot is passed (None = current term)
+    """
+    catalog = catalog or get_catalog(term)
+    store = catalog.derived("prereqs")
+
+    all_course_pre_reqs = {target_course: to_structured(store.get(target_course))}
+
+    # depth first, so courses are added in the order the old recursive walk found them
+    stack = [iter(list(ast_courses(store.get(target_course))))]
+    while stack:
+        pre_req = next(stack[-1], None)
+        if pre_req is None:
+            stack.pop()
+            continue
+
+        # courses without pre-reqs (or already added) don't get an entry of their own
+        pre_req_ast = store.get(pre_req)
+        if pre_req_ast is None or pre_req in all_course_pre_reqs:
+            continue
+
+        all_course_pre_reqs[pre_req] = to_structured(pre_req_ast)
+        stack.append(iter(list(ast_courses(pre_req_ast))))
+
+    return all_course_pre_reqs
+
+
+def traverse_parsed_pre_reqs(parsed_nested_pre_reqs: list, all_course_pre_reqs: dict, catalog: CourseCatalog | None = None) -> dict[list]:
+    """
+    ### the original recursive walk that re-parses every pre-req; kept as the reference for the equivalence check
     """
 
     # iterating through our list that has nested lists
     for pre_req in parsed_nested_pre_reqs:
         # check if it is a nested list (always will be); our base case
         if isinstance(pre_req, pp.ParseResults):
-            traverse_pre_reqs(pre_req, all_course_pre_reqs)
+            traverse_parsed_pre_reqs(pre_req, all_course_pre_reqs, catalog)
 
         # get to string in nested list w/ course-code and course-num
         else:
@@ -121,7 +121,7 @@ def traverse_pre_reqs(parsed_nested_pre_reqs: list, all_course_pre_reqs: dict) -
             try:
                 int(pre_req[-3:])
                 # store this new nested list of pre_reqs as a value in the course's dict of pre-reqs
-                new_pre_req = parse_pre_reqs(pre_req)
+                new_pre_req = parse_pre_reqs(pre_req, catalog=catalog)
                 
                 # if what should be an messy nested list is empty: go back to top level
                 if new_pre_req is None:
@@ -133,7 +133,7 @@ def traverse_pre_reqs(parsed_nested_pre_reqs: list, all_course_pre_reqs: dict) -
                     clean_prereq = structure_pre_reqs(new_pre_req)
                     all_course_pre_reqs[pre_req] = clean_prereq
                     # this allows us to continue going deeper into the pre-reqs of a pre-req
-                    traverse_pre_reqs(new_pre_req, all_course_pre_reqs)
+                    traverse_parsed_pre_reqs(new_pre_req, all_course_pre_reqs, catalog)
 
             # if this doesn't work skip entry ('min grade will be skipped')
             except:
@@ -276,7 +276,27 @@ def check_pre_req_list(
                     return True
                 # Otherwise, check the other side
                 return check_pre_req_list(pre_req_list, completed_courses, all_course_pre_reqs, index + 2)
-    
+
+    # If we have a parenthesized group ex. (CS 172 or ECE 105); it counts as one requirement
+    elif isinstance(current, list):
+        group_satisfied = check_pre_req_list(current, completed_courses, all_course_pre_reqs)
+
+        # If we're at the end or no operator follows
+        if index + 1 >= len(pre_req_list) or not isinstance(pre_req_list[index + 1], str):
+            return group_satisfied
+
+        operator = pre_req_list[index + 1]
+
+        if operator == "and":
+            if not group_satisfied:
+                return False
+            return check_pre_req_list(pre_req_list, completed_courses, all_course_pre_reqs, index + 2)
+
+        elif operator == "or":
+            if group_satisfied:
+                return True
+            return check_pre_req_list(pre_req_list, completed_courses, all_course_pre_reqs, index + 2)
+
     # If we have a logical operator
     elif isinstance(current, str) and current in ["and", "or"]:
         # Skip operators, they're handled with the course before them
@@ -287,7 +307,7 @@ def check_pre_req_list(
         return check_pre_req_list(pre_req_list, completed_courses, all_course_pre_reqs, index + 1)
 
 # get course crn via course name
-def get_course_crn(course_name: str, find_all=False) -> int:
+def get_course_crn(course_name: str, find_all=False, catalog: CourseCatalog | None = None, term=None) -> int:
     """
     ### uses the course name to get the course crn for ML model
     - loops through data file to find the course name inputted by user
@@ -299,45 +319,31 @@ def get_course_crn(course_name: str, find_all=False) -> int:
 
     - find_all=True (defaulted at false) but if True this will return a list
     with a specific course's entire CRNs
+
+    - catalog: catalog snapshot to read from; defaults to the live one
+    - term: term id whose catalog to use when no snapshot is passed (None = current term)
     """
-    with open(DATA_FILE) as data_file:
-        course_content = data_file.read()
-        course_data = json.loads(course_content)
-        
-        # empty string until crn found
-        course_crn = ""
-        
-        # store all crns found into list if find_all=True
-        course_crns = []
-    
-        # we loop through the json data key and value pairs with the value being the dict
-        for crn, course in course_data.items():
-            # use string concatenation get course with same subject code and number
-            if course_name ==  course["subject_code"]+course["course_number"]:
-                # simply get the crn
-                course_crn = int(course["crn"])
-
-                # if you want all crn here it will append value that it found 
-                if find_all:
-                    course_crns.append(course_crn)
-                    continue
+    catalog = catalog or get_catalog(term)
+
+    # every section of the course straight from the catalog's code index
+    course_crns = [section.crn for section in catalog.sections_for(course_name)]
 
     # if our list is empty then raise error where course not found
     if find_all and not course_crns:
         raise LookupError("Course CRNS not found.")
     
     # this case is if find_all == False
-    if not find_all and not course_crn:
+    if not find_all and not course_crns:
         raise LookupError("Course CRN not found.")
 
     if find_all:
         return course_crns
     
-    return course_crn
+    return course_crns[0]
     
 
 
-def get_crns_info(crns: list[int]) -> list[dict]:
+def get_crns_info(crns: list[int], catalog: CourseCatalog | None = None, term=None) -> list[dict]:
     """
     ### find each json data object associated with each entry of list and store in list pd dictionaries
     - loops through file full of data
@@ -347,18 +353,19 @@ def get_crns_info(crns: list[int]) -> list[dict]:
     - crns: list of one specific course's entire crns, goal is to get each 
     time slot, lecturer, and any type of data for just one course through
     all of its crns 
+
+    - catalog: catalog snapshot to read from; defaults to the live one
+    - term: term id whose catalog to use when no snapshot is passed (None = current term)
     """
-    with open(DATA_FILE) as data_file:
-        course_content = data_file.read()
-        course_data = json.loads(course_content)
-
-        # store one course's entire data in a list of all of its crns data
-        crns_data = []
-        for our_crn in crns:
-            for crn, data in course_data.items():
-                # store one the entire data found for one crn in list 
-                if int(crn) == our_crn:
-                    crns_data.append(data)
+    catalog = catalog or get_catalog(term)
+
+    # store one course's entire data in a list of all of its crns data
+    crns_data = []
+    for our_crn in crns:
+        # hash lookup instead of scanning the whole catalog per crn
+        section = catalog.get(our_crn)
+        if section is not None:
+            crns_data.append(section.to_dict())
 
     if not crns_data:
         raise LookupError("Could not find any data under these CRNs.")
@@ -367,65 +374,36 @@ def get_crns_info(crns: list[int]) -> list[dict]:
                 
 
 
-def is_course_available(target_course: str, completed_courses: list) -> bool:
+def is_course_available(target_course: str, completed_courses: list, catalog: CourseCatalog | None = None, term=None) -> bool:
     """
     ### takes a simple target course and completed user pre-reqs list to evaluate if a user is eligible to take course
-    - creates structured dictionary of pre-reqs
-    - performs all functions to evaluate this 
+    - runs the catalog's iterative prereq evaluator (scripts/prereq_eval.py) over the compiled ASTs
+    - same answer as can_take_course on traverse_pre_reqs' structure, without the recursion
 
     #### args:
     - target_course: string of course subject code and subject numbers for ex. "CS164"
     - completed_courses: list of strings that contain same format as user's taken pre-reqs
+    - catalog: catalog snapshot to read from; defaults to the live one
+    - term: term id whose catalog to use when no snapshot is passed (None = current term)
     """
-
-    # use py parse to initially parse course pre-reqs
-    parsed_target_pre_reqs = parse_pre_reqs(target_course)
-
-    # initialize algorithm by setting up our custom data structure
-    structured_pre_reqs = {
-        target_course: parsed_target_pre_reqs
-    }
-
-    # make a 'tree' like structure of ALL of the pre-req's for a course
-    all_target_pre_reqs = traverse_pre_reqs(
-        parsed_nested_pre_reqs=parsed_target_pre_reqs, 
-        all_course_pre_reqs=structured_pre_reqs
-    )
-
-    # save boolean value of whether a user can or can't take a course via pre-reqs
-    pre_req_eligibility = can_take_course(
-        course_to_check=target_course,
-        completed_courses=completed_courses,
-        all_course_pre_reqs=all_target_pre_reqs
-    )
-
-    # set this up so if user doesn't have necessary pre-reqs just stop function 
-    if pre_req_eligibility is False:
-        return False
-    
-
-
-    return pre_req_eligibility
-    
-
-
-    
-
-
-
+    catalog = catalog or get_catalog(term)
+    return catalog.derived("prereq_evaluator").can_take(target_course, completed_courses)
 
 
 # testing functions
 if __name__ == "__main__":
-    pp_parsed_pre_reqs = parse_pre_reqs("CS277")    
-    print(f"Parsed but not structured top-level pre-reqs:{pp_parsed_pre_reqs}\n")
+    import time
+    import random
+    from scripts.catalog import DATA_FILE, load_catalog
+    from scripts.prereq_store import PrereqStore, parse_pre_req_string
+    from scripts import prereq_graph
 
-    # put the course in a new dict to contain all pre-reqs 
-    structured_pre_reqs = {
-        "CS277": pp_parsed_pre_reqs
-    }
+    catalog = load_catalog(DATA_FILE)
 
-    all_course_pre_reqs = traverse_pre_reqs(pp_parsed_pre_reqs, structured_pre_reqs)
+    pp_parsed_pre_reqs = parse_pre_reqs("CS277", catalog=catalog)
+    print(f"Parsed but not structured top-level pre-reqs:{pp_parsed_pre_reqs}\n")
+
+    all_course_pre_reqs = traverse_pre_reqs("CS277", catalog=catalog)
 
     # print the pre-reqs for a specific course in ordered 
     for key, value in all_course_pre_reqs.items():
@@ -440,12 +418,117 @@ if __name__ == "__main__":
     ]
 
     for course in test_cases:
-        print(f"pre-req test case: {course}\nSatisfies: {can_take_course("CS277", course, all_course_pre_reqs)}\n")
+        print(f"pre-req test case: {course}\nSatisfies: {can_take_course('CS277', course, all_course_pre_reqs)}\n")
+        assert is_course_available("CS277", course, catalog=catalog) == can_take_course("CS277", course, all_course_pre_reqs)
+
+    # parenthesized groups: each one is a single requirement (before, check_pre_req_list skipped them)
+    def grade(code):
+        return f"{code[:-3]} {code[-3:]}  Minimum Grade: C"
+
+    group_store = PrereqStore({
+        "AA100": None, "BB100": None, "CC100": None, "DD100": None, "EE100": None,
+        "XX200": parse_pre_req_string(f"({grade('AA100')} or {grade('BB100')}) and ({grade('CC100')} or {grade('DD100')})"),
+        "YY200": parse_pre_req_string(f"{grade('EE100')} and ({grade('AA100')} or {grade('BB100')})"),
+        "ZZ200": parse_pre_req_string(f"({grade('AA100')} and {grade('BB100')}) or ({grade('CC100')} and {grade('DD100')})"),
+        "WW300": parse_pre_req_string(f"({grade('XX200')}) or {grade('EE100')}"),
+    })
+    group_structures = {code: to_structured(ast) for code, ast in group_store.asts.items() if ast is not None}
+    group_evaluator = prereq_eval.PrereqEvaluator(group_store)
+    group_cases = [
+        ("XX200", [], False),
+        ("XX200", ["AA100"], False),
+        ("XX200", ["AA100", "DD100"], True),
+        ("XX200", ["BB100", "CC100"], True),
+        ("YY200", ["AA100"], False),
+        ("YY200", ["EE100"], False),
+        ("YY200", ["EE100", "BB100"], True),
+        ("ZZ200", ["AA100", "CC100"], False),
+        ("ZZ200", ["CC100", "DD100"], True),
+        ("WW300", ["XX200"], False),  # XX200 only counts when its own prereqs hold
+        ("WW300", ["XX200", "AA100", "DD100"], True),
+        ("WW300", ["EE100"], True),
+    ]
+    for course, completed, expected in group_cases:
+        assert can_take_course(course, completed, group_structures) == expected, (course, completed)
+        assert group_evaluator.can_take(course, completed) == expected, (course, completed)
+    print(f"{len(group_cases)} parenthesized group cases: recursive and iterative evaluators as expected")
+
+    # randomized differential test: iterative evaluator vs. the recursive one, every course in the catalog
+    rng = random.Random(42)
+    universe = sorted(catalog.derived("prereq_graph").codes)
+    structures = {code: traverse_pre_reqs(code, catalog=catalog) for code in catalog.codes()}
+    evaluator = catalog.derived("prereq_evaluator")
+    trials = 0
+    for _ in range(300):
+        completed = rng.sample(universe, rng.randint(0, len(universe)))
+        for code, structure in structures.items():
+            assert evaluator.can_take(code, completed) == can_take_course(code, completed, structure), (code, completed)
+            trials += 1
+    print(f"{trials} random (course, completed courses) pairs: iterative evaluator identical to can_take_course")
+
+    # deep chains: C1 <- C2 <- ... each course needing the one before (or a shared diamond), all completed
+    def chain_store(length, diamond=False):
+        asts = {"C0": None, "D0": None}
+        for i in range(1, length):
+            previous = ("course", f"C{i - 1}", "C")
+            asts[f"C{i}"] = ("and", (previous, ("course", f"D{i - 1}", "C"))) if diamond else previous
+            asts[f"D{i}"] = ("and", (previous, ("course", f"D{i - 1}", "C"))) if diamond else None
+        return PrereqStore(asts)
+
+    for length, diamond in ((18, True), (5000, False)):
+        store = chain_store(length, diamond)
+        chain = {code: to_structured(ast) for code, ast in store.asts.items() if ast is not None}
+        target = f"C{length - 1}"
+        completed = set(store.asts) - {target}
+
+        started = time.perf_counter()
+        try:
+            legacy = can_take_course(target, completed, chain)
+            legacy_ms = f"{(time.perf_counter() - started) * 1000:.1f}ms"
+        except RecursionError:
+            legacy, legacy_ms = None, "RecursionError"
+
+        started = time.perf_counter()
+        answer = prereq_eval.PrereqEvaluator(store).can_take(target, completed)
+        iterative_ms = (time.perf_counter() - started) * 1000
+        assert legacy in (None, answer)
+        print(f"{'diamond' if diamond else 'linear'} chain of {length} | recursive: {legacy_ms} | iterative: {iterative_ms:.2f}ms | answer: {answer}")
+
+    # the compiled ASTs give the same structures as re-parsing every time, for every course in the catalog
+    checked = 0
+    for code in catalog.codes():
+        parsed = parse_pre_reqs(code, catalog=catalog)
+        if parsed is None:
+            continue
+        assert traverse_pre_reqs(code, catalog=catalog) == traverse_parsed_pre_reqs(parsed, {code: parsed}, catalog), code
+        checked += 1
+    print(f"{checked} courses: compiled prereq walk identical to re-parsing")
+
+    runs = 20
+    started = time.perf_counter()
+    for _ in range(runs):
+        for code in catalog.codes():
+            parsed = parse_pre_reqs(code, catalog=catalog)
+            if parsed is not None:
+                traverse_parsed_pre_reqs(parsed, {code: parsed}, catalog)
+    parse_ms = (time.perf_counter() - started) / runs * 1000
+
+    started = time.perf_counter()
+    for _ in range(runs):
+        for code in catalog.codes():
+            traverse_pre_reqs(code, catalog=catalog)
+    store_ms = (time.perf_counter() - started) / runs * 1000
+
+    started = time.perf_counter()
+    PrereqStore.from_catalog(catalog)
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"every course's pre-req tree | re-parsing: {parse_ms:.2f}ms | compiled ASTs: {store_ms:.2f}ms | one-time compile: {build_ms:.2f}ms")
+
     # example usage
-    course_crns = get_course_crn(course_name="CS172", find_all=True)
+    course_crns = get_course_crn(course_name="CS172", find_all=True, catalog=catalog)
     print(course_crns)
 
     # only use method for crns list not string of a crn
-    course_info = get_crns_info(course_crns)
+    course_info = get_crns_info(course_crns, catalog=catalog)
     for course in course_info:
-        print(f"Course info:\n{course}\n")
\ No newline at end of file
+        print(f"Course info:\n{course}\n")
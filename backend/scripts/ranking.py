@@ -0,0 +1,649 @@
+import os
+import heapq
+import pickle
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from scripts.catalog import DAYS, CourseCatalog, get_catalog
+from scripts.conflicts import DAY_SLOTS, SLOT_MINUTES, SLOTS_PER_DAY
+from scripts.filters import INSTRUCTION_FILTERS, INSTRUCTION_METHODS, METHOD_OTHER, SIZE_LIMITS, TIME_WINDOWS
+from scripts.schedules import DEFAULT_SCHEDULES, MAX_SCHEDULES, NODE_LIMIT, ScheduleProblem
+
+"""
+Top-k schedule ranking by the student's preferences.
+
+The get-interests filters (class_time, class_size, instruction_type) and
+UserPreferences.user_timing are soft preferences here instead of hard
+filters. A schedule's score is integer points, so sums are exact whatever
+order sections were picked in:
+
+    + per section: meets in a preferred time window, preferred class size,
+      preferred instruction method,
+      the model's success probability for the student's gpa
+    - per day on campus (any meeting that day)
+    - per five-minute slot of gap between classes on the same day
+
+The search is the same backtracking as scripts/schedules.py (fewest options
+first, forward checking on occupancy masks) turned into branch and bound:
+the k best schedules so far sit in a min-heap, and a branch is dropped when
+even its upper bound can't beat the worst of them. The bound is the points
+picked so far, plus the best option left in every open slot, minus the days
+already on campus (and the most new days any open slot forces). Gaps only
+count once a schedule is complete, since filling a slot can close a gap.
+Ties go to the schedule with the smaller CRNs (in slot order), so the same
+bundle always ranks the same way.
+
+Big bundles can be searched in parallel: the top levels of the search tree
+become partitions (each one a few sections fixed), each partition's top-k is
+searched in a worker process, and the per-partition lists are merged. The
+problem and its points are pickled once per request into a shared memory
+block; a partition task only carries the block's name and its fixed
+sections, and each worker unpickles a request the first time it sees it.
+Partitions can't share a heap, so each one prunes against a floor: the
+k-th best score among schedules earlier partitions already found. How a
+bundle is cut and which results feed each floor never depend on the worker
+count, and the merge sorts on (score, crns), so one worker or many return the
+same schedules in the same order.
+"""
+
+# worker processes in the shared search pool
+SCHEDULE_WORKERS = int(os.getenv("SCHEDULE_WORKERS", str(os.cpu_count() or 1)))
+
+# a parallel search cuts a bundle into at least this many partitions (when it has that many
+# combinations), independent of the worker count so the output never depends on it
+PARTITIONS = 64
+
+# options a parallel search tries serially first to find a score floor every partition prunes against
+SEED_NODES = 2000
+
+# partition i is given a floor from the results of partitions before i - PARTITION_WINDOW, so up to
+# this many run at once; fixed (not the worker count) so the floors, and the output, never vary
+PARTITION_WINDOW = 16
+
+# default points; any of them can be overridden per request
+WEIGHTS = {
+    "time": 100,      # section starts in a preferred time window (or has no meeting time)
+    "size": 50,       # section's max enrollment is a preferred class size
+    "method": 50,     # section is taught the preferred way (online / in person)
+    "success": 200,   # times the model's success probability
+    "day": 150,       # taken off for every day on campus
+    "gap": 5,         # taken off for every five idle minutes between classes (60 an hour)
+}
+
+# UserPreferences.user_timing button -> class_time window
+USER_TIMING = {
+    "early": "Morning",
+    "morning": "Morning",
+    "afternoon": "Afternoon",
+    "night": "Evening",
+    "late": "Evening",
+    "night/late": "Evening",
+    "evening": "Evening",
+}
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def day_bits(mask: int) -> int:
+    """
+    ### occupancy mask -> one bit per day it meets on (Monday first)
+    """
+    bits = 0
+    for i in range(len(DAYS)):
+        if mask >> (i * SLOTS_PER_DAY) & DAY_SLOTS:
+            bits |= 1 << i
+    return bits
+
+
+def gap_slots(mask: int) -> int:
+    """
+    ### idle five-minute slots between the first and last class of every day in a schedule's mask
+    """
+    gaps = 0
+    for i in range(len(DAYS)):
+        day = mask >> (i * SLOTS_PER_DAY) & DAY_SLOTS
+        if day:
+            first = (day & -day).bit_length() - 1
+            gaps += day.bit_length() - first - day.bit_count()
+    return gaps
+
+
+class SchedulePreferences:
+    """
+    ### what the student would like their schedule to look like, as points per section
+
+    #### args:
+    - class_time: "Morning" | "Afternoon" | "Evening" or a list of them
+    - class_size: "Small" | "Large" or a list of them
+    - instruction_type: "Online" | "In Person"
+    - probabilities: crn -> the model's success probability for this student
+    - weights: overrides for WEIGHTS (day and gap are penalties and can't be negative)
+    """
+
+    def __init__(self, class_time=None, class_size=None, instruction_type: str | None = None,
+                 probabilities: dict[int, float] | None = None, weights: dict | None = None):
+        self.windows = [TIME_WINDOWS[name] for name in _as_list(class_time) if name in TIME_WINDOWS]
+        self.sizes = [SIZE_LIMITS[name] for name in _as_list(class_size) if name in SIZE_LIMITS]
+        self.method = INSTRUCTION_FILTERS.get(instruction_type.lower()) if instruction_type else None
+        self.probabilities = probabilities or {}
+
+        self.weights = dict(WEIGHTS)
+        for name, value in (weights or {}).items():
+            if name not in WEIGHTS:
+                raise ValueError(f"unknown weight {name!r}; expected one of {tuple(WEIGHTS)}")
+            self.weights[name] = int(value)
+        check_penalties(self.weights["day"], self.weights["gap"])
+
+    @classmethod
+    def from_user_timing(cls, user_timing: str | None, **kwargs) -> "SchedulePreferences":
+        """
+        ### preferences whose time window comes from the saved UserPreferences.user_timing
+        (used when the request doesn't name a class_time itself)
+        """
+        if not kwargs.get("class_time") and user_timing:
+            kwargs["class_time"] = [
+                USER_TIMING[timing.strip().lower()]
+                for timing in user_timing.split(",") if timing.strip().lower() in USER_TIMING
+            ]
+        return cls(**kwargs)
+
+    def section_points(self, section) -> int:
+        weights = self.weights
+        points = 0
+        if self.windows and (
+            section.start_min < 0
+            or any(low <= section.start_min < high for low, high in self.windows)
+        ):
+            points += weights["time"]
+        if self.sizes and any(low <= section.capacity <= high for low, high in self.sizes):
+            points += weights["size"]
+        if self.method is not None and (
+            INSTRUCTION_METHODS.get(section.instruction_method.strip().lower(), METHOD_OTHER) == self.method
+        ):
+            points += weights["method"]
+        probability = self.probabilities.get(section.crn)
+        if probability is not None:
+            points += round(weights["success"] * probability)
+        return points
+
+    def points(self, problem: ScheduleProblem, catalog: CourseCatalog) -> dict[int, int]:
+        """
+        ### crn -> points for every section option in the problem
+        """
+        return {
+            crn: self.section_points(catalog.get(crn))
+            for _, _, options in problem.slots for crn, _ in options
+        }
+
+
+def check_penalties(day_penalty: int, gap_penalty: int):
+    """
+    ### raises ValueError for a negative day or gap penalty
+    the search's bound takes points off for days and never for gaps, which is only an upper bound
+    while neither can add points
+    """
+    if day_penalty < 0 or gap_penalty < 0:
+        raise ValueError(f"day and gap weights can't be negative (got day={day_penalty}, gap={gap_penalty})")
+
+
+def schedule_score(crns, masks: dict[int, int], points: dict[int, int], day_penalty: int, gap_penalty: int) -> dict:
+    """
+    ### {"score", "points", "days", "gap_minutes"} for one complete schedule
+    """
+    union = 0
+    for crn in crns:
+        union |= masks[crn]
+    section_points = sum(points[crn] for crn in crns)
+    days = day_bits(union).bit_count()
+    gaps = gap_slots(union)
+    return {
+        "score": section_points - day_penalty * days - gap_penalty * gaps,
+        "points": section_points,
+        "days": days,
+        "gap_minutes": gaps * SLOT_MINUTES,
+    }
+
+
+def top_schedules(
+        problem: ScheduleProblem,
+        points: dict[int, int],
+        k: int = DEFAULT_SCHEDULES,
+        day_penalty: int = WEIGHTS["day"],
+        gap_penalty: int = WEIGHTS["gap"],
+        node_limit: int | None = NODE_LIMIT,
+        fixed: dict[int, int] | None = None,
+        floor: int | None = None,
+    ) -> tuple[list[tuple[int, tuple[int, ...]]], dict]:
+    """
+    ### ([(score, crns in slot order)] best first, stats) for the k best conflict-free schedules
+    stats: "nodes" (options tried), "pruned" (branches cut by the bound), "complete"
+    (false when the node limit stopped the search, so the ranking may be missing schedules)
+
+    #### args:
+    - problem: the bundle's slots
+    - points: crn -> points for that section (SchedulePreferences.points)
+    - k: how many schedules to keep
+    - day_penalty / gap_penalty: points off per day on campus / per idle five-minute slot (not negative)
+    - node_limit: stop after trying this many options (None = no limit)
+    - fixed: slot index -> the only crn that slot may use (how a search is partitioned)
+    - floor: a score the k-th best schedule is known to reach; branches bound below it are
+    dropped before the heap is full (fewer than k may come back when fewer reach it)
+    """
+    check_penalties(day_penalty, gap_penalty)
+    stats = {"nodes": 0, "pruned": 0, "complete": True}
+    slots = problem.slots
+    if not slots or k <= 0:
+        return [], stats
+
+    fixed = fixed or {}
+    open_slots = []
+    for index, (_, _, options) in enumerate(slots):
+        if index in fixed:
+            options = tuple(option for option in options if option[0] == fixed[index])
+        if not options:
+            return [], stats
+        # best options first so the heap fills with good schedules early and the bound bites sooner
+        scored = [(crn, mask, points[crn], day_bits(mask)) for crn, mask in options]
+        scored.sort(key=lambda option: (-option[2], option[0]))
+        open_slots.append((index, scored))
+
+    chosen = [0] * len(slots)
+    # min-heap of (score, negated crns): the root is the worst kept schedule, and among
+    # equal scores the one with the larger crns
+    heap = []
+
+    def bound(picked, days, open_slots):
+        best = picked
+        forced = 0
+        for _, options in open_slots:
+            best += max(option[2] for option in options)
+            forced = max(forced, min((option[3] & ~days).bit_count() for option in options))
+        return best - day_penalty * (days.bit_count() + forced)
+
+    def extend(open_slots, picked, days, union):
+        if not open_slots:
+            score = picked - day_penalty * days.bit_count() - gap_penalty * gap_slots(union)
+            key = (score, tuple(-crn for crn in chosen))
+            if floor is not None and score < floor:
+                pass
+            elif len(heap) < k:
+                heapq.heappush(heap, key)
+            elif key > heap[0]:
+                heapq.heapreplace(heap, key)
+            return True
+
+        # nothing below the floor gets into the heap, so a full heap's worst is at least the floor
+        worst = heap[0][0] if len(heap) == k else floor
+        if worst is not None and bound(picked, days, open_slots) < worst:
+            stats["pruned"] += 1
+            return True
+
+        position = min(range(len(open_slots)), key=lambda i: len(open_slots[i][1]))
+        index, options = open_slots[position]
+        rest = open_slots[:position] + open_slots[position + 1:]
+
+        for crn, mask, option_points, option_days in options:
+            stats["nodes"] += 1
+            if node_limit is not None and stats["nodes"] > node_limit:
+                return False
+
+            remaining = []
+            for other_index, other_options in rest:
+                compatible = [option for option in other_options if not option[1] & mask] if mask else other_options
+                if not compatible:
+                    break
+                remaining.append((other_index, compatible))
+            else:
+                chosen[index] = crn
+                if not extend(remaining, picked + option_points, days | option_days, union | mask):
+                    return False
+        return True
+
+    stats["complete"] = extend(open_slots, 0, 0, 0)
+    ranked = sorted(heap, reverse=True)
+    return [(score, tuple(-crn for crn in negated)) for score, negated in ranked], stats
+
+
+def _expand(problem: ScheduleProblem, count: int) -> list[tuple[dict[int, int], list]]:
+    # (fixed sections, open slots with the options still compatible with them) per partition
+    parts = [({}, [(index, options) for index, (_, _, options) in enumerate(problem.slots)])]
+    while len(parts) < count:
+        expanded = []
+        for fixed, open_slots in parts:
+            if not open_slots:
+                expanded.append((fixed, open_slots))
+                continue
+            position = min(range(len(open_slots)), key=lambda i: len(open_slots[i][1]))
+            index, options = open_slots[position]
+            rest = open_slots[:position] + open_slots[position + 1:]
+            for crn, mask in options:
+                remaining = []
+                for other_index, other_options in rest:
+                    compatible = [option for option in other_options if not option[1] & mask] if mask else other_options
+                    if not compatible:
+                        break
+                    remaining.append((other_index, compatible))
+                else:
+                    expanded.append(({**fixed, index: crn}, remaining))
+
+        # every partition is already a whole schedule (or none are left): nothing more to split
+        if len(expanded) == len(parts):
+            break
+        parts = expanded
+    return parts
+
+
+def partition(problem: ScheduleProblem, count: int = PARTITIONS) -> list[dict[int, int]]:
+    """
+    ### fixed-section dicts (slot index -> crn) that split the search tree into at least count pieces
+    the top levels of the serial search expanded breadth first (same slot order, same
+    forward checking), so the partitions cover exactly the tree top_schedules walks
+    and dead branches never become partitions
+    """
+    return [fixed for fixed, _ in _expand(problem, count)]
+
+
+def _search_partition(problem, points, k, day_penalty, gap_penalty, node_limit, fixed, floor):
+    return top_schedules(problem, points, k, day_penalty, gap_penalty, node_limit, fixed, floor)
+
+
+# the requests this worker process has unpickled, by shared memory block name (oldest first)
+_worker_requests = {}
+WORKER_REQUESTS = 4
+
+
+def _search_shared(name, size, node_limit, fixed, floor):
+    # module level so worker processes can unpickle it; the request is read from shared memory once per worker
+    request = _worker_requests.get(name)
+    if request is None:
+        block = shared_memory.SharedMemory(name)
+        try:
+            request = pickle.loads(block.buf[:size])
+        finally:
+            block.close()
+        # concurrent requests share the pool, so keep a few rather than just the last one
+        while len(_worker_requests) >= WORKER_REQUESTS:
+            _worker_requests.pop(next(iter(_worker_requests)))
+        _worker_requests[name] = request
+    problem, points, k, day_penalty, gap_penalty = request
+    return top_schedules(problem, points, k, day_penalty, gap_penalty, node_limit, fixed, floor)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def search_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    ### this process's pool of search processes (one per worker count), started on first use and reused
+    spawned rather than forked, since the app runs catalog watcher threads
+    """
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pools[workers]
+
+
+def parallel_top_schedules(
+        problem: ScheduleProblem,
+        points: dict[int, int],
+        k: int = DEFAULT_SCHEDULES,
+        day_penalty: int = WEIGHTS["day"],
+        gap_penalty: int = WEIGHTS["gap"],
+        node_limit: int | None = NODE_LIMIT,
+        workers: int = SCHEDULE_WORKERS,
+    ) -> tuple[list[tuple[int, tuple[int, ...]]], dict]:
+    """
+    ### same as top_schedules, with the partitions searched across worker processes
+    node_limit is shared out evenly between the partitions; stats add "partitions",
+    "skipped" (partitions whose bound couldn't reach the floor) and "workers"
+
+    #### args:
+    - workers: processes to search with (1 = every partition in this process)
+    """
+    # partitions don't see each other's heaps, so they prune against a floor instead: the k-th
+    # best score among schedules already found (a short serial search first, then the partitions
+    # that finished), which the final k-th best can only be above
+    seed, _ = top_schedules(problem, points, k, day_penalty, gap_penalty, node_limit=SEED_NODES)
+    best = seed if len(seed) == k else []
+
+    # most promising partitions first so the floor rises early
+    parts = []
+    for fixed, open_slots in _expand(problem, PARTITIONS):
+        bound = sum(points[crn] for crn in fixed.values())
+        bound += sum(max(points[crn] for crn, _ in options) for _, options in open_slots)
+        parts.append((bound, fixed))
+    parts.sort(key=lambda part: -part[0])
+    budget = None if node_limit is None else -(-node_limit // max(len(parts), 1))
+
+    pool = search_pool(workers) if workers > 1 and len(parts) > 1 else None
+    block = None
+    if pool is not None:
+        request = pickle.dumps((problem, points, k, day_penalty, gap_penalty), pickle.HIGHEST_PROTOCOL)
+        block = shared_memory.SharedMemory(create=True, size=len(request))
+        block.buf[:len(request)] = request
+    results = [None] * len(parts)
+    pending = {}
+    stats = {"nodes": 0, "pruned": 0, "complete": True, "partitions": len(parts), "skipped": 0, "workers": workers}
+    seen = 0
+
+    def fold(result):
+        nonlocal best
+        ranked, partition_stats = result
+        # the seed's schedules get found again by their partitions; count each once
+        best = sorted(set(best).union(ranked), key=lambda item: (-item[0], item[1]))[:k]
+        stats["nodes"] += partition_stats["nodes"]
+        stats["pruned"] += partition_stats["pruned"]
+        stats["complete"] = stats["complete"] and partition_stats["complete"]
+
+    try:
+        for i, (bound, fixed) in enumerate(parts):
+            # partition i sees exactly the results before i - PARTITION_WINDOW, whoever finished first
+            while seen < i - PARTITION_WINDOW:
+                fold(results[seen] or pending.pop(seen).result())
+                seen += 1
+            floor = best[-1][0] if len(best) == k else None
+
+            if floor is not None and bound < floor:
+                stats["skipped"] += 1
+                results[i] = ([], {"nodes": 0, "pruned": 0, "complete": True})
+            elif pool is None:
+                results[i] = _search_partition(problem, points, k, day_penalty, gap_penalty, budget, fixed, floor)
+            else:
+                pending[i] = pool.submit(_search_shared, block.name, len(request), budget, fixed, floor)
+
+        while seen < len(parts):
+            fold(results[seen] or pending.pop(seen).result())
+            seen += 1
+    finally:
+        # all results are in unless a partition raised; then drop what hasn't started
+        for future in pending.values():
+            future.cancel()
+        if block is not None:
+            block.close()
+            block.unlink()
+
+    # (score, crns) is a total order, so the merge is the same whichever partition finished first
+    return best, stats
+
+
+def rank_schedules(
+        courses: list[str],
+        preferences: SchedulePreferences | None = None,
+        k: int = DEFAULT_SCHEDULES,
+        catalog: CourseCatalog | None = None,
+        term=None,
+        workers: int = 1,
+    ) -> dict:
+    """
+    ### the k best conflict-free schedules for a bundle of courses under the student's preferences
+    returns {"schedules": [{"score", "points", "days", "gap_minutes", "sections": [...]}],
+    "count", "missing", "complete", "nodes", "pruned"}
+
+    #### args:
+    - courses: course codes ex. ["CS 171", "MATH121"]
+    - preferences: what to score on (None = only days on campus and gaps)
+    - k: how many schedules to return (capped at MAX_SCHEDULES)
+    - catalog: catalog snapshot to read from; defaults to the live one
+    - term: term id whose catalog to use when no snapshot is passed (None = current term)
+    - workers: search processes (more than 1 = parallel_top_schedules)
+    """
+    catalog = catalog or get_catalog(term)
+    preferences = preferences or SchedulePreferences()
+    problem = ScheduleProblem.from_catalog(courses, catalog)
+    points = preferences.points(problem, catalog)
+    day_penalty, gap_penalty = preferences.weights["day"], preferences.weights["gap"]
+
+    k = min(k, MAX_SCHEDULES)
+    if workers > 1:
+        ranked, stats = parallel_top_schedules(problem, points, k, day_penalty, gap_penalty, workers=workers)
+    else:
+        ranked, stats = top_schedules(problem, points, k, day_penalty, gap_penalty)
+    masks = {crn: mask for _, _, options in problem.slots for crn, mask in options}
+    found = [
+        {**schedule_score(crns, masks, points, day_penalty, gap_penalty), "sections": problem.describe(crns)}
+        for _, crns in ranked
+    ]
+    return {"schedules": found, "count": len(found), "missing": problem.missing, **stats}
+
+
+# branch and bound vs. scoring every conflict-free schedule + how much of the tree the bound skips
+if __name__ == "__main__":
+    import time
+    import random
+    from scripts.catalog import DATA_FILE, load_catalog
+    from scripts.conflicts import occupancy_mask
+    from scripts.schedules import generate_schedules
+
+    def exhaustive(problem, points, k, day_penalty=WEIGHTS["day"], gap_penalty=WEIGHTS["gap"]):
+        masks = {crn: mask for _, _, options in problem.slots for crn, mask in options}
+        scored = [
+            (schedule_score(crns, masks, points, day_penalty, gap_penalty)["score"], crns)
+            for crns in generate_schedules(problem, node_limit=None)
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored[:k]
+
+    catalog = load_catalog(DATA_FILE)
+    preferences = SchedulePreferences.from_user_timing("afternoon", class_size="Small", instruction_type="In Person")
+    bundle = ["CS171", "CS172", "CS260", "CS265", "CS270"]
+    problem = ScheduleProblem.from_catalog(bundle, catalog)
+    points = preferences.points(problem, catalog)
+    ranked, stats = top_schedules(problem, points, k=5, node_limit=None)
+    assert ranked == exhaustive(problem, points, 5)
+    best = rank_schedules(bundle, preferences, k=1, catalog=catalog)["schedules"][0]
+    print(f"{bundle}: top 5 match scoring every schedule | best: {best}")
+
+    def synthetic_problem(courses, components, sections, rng):
+        # sections meet 1-3 days a week for 50-110 minutes between 8:00 and 20:00, worth 0-400 points
+        slots = []
+        points = {}
+        crn = 10000
+        for course in range(courses):
+            for component in range(components):
+                options = []
+                for _ in range(sections):
+                    days = sum(1 << day for day in rng.sample(range(5), rng.randint(1, 3)))
+                    start = rng.randrange(8 * 60, 18 * 60, 30)
+                    options.append((crn, occupancy_mask(days, start, start + rng.choice((50, 80, 110)))))
+                    points[crn] = rng.randrange(0, 400, 10)
+                    crn += 1
+                slots.append((f"C{course}", f"part {component}", tuple(options)))
+        return ScheduleProblem(tuple(slots)), points
+
+    rng = random.Random(3)
+    for _ in range(30):
+        problem, points = synthetic_problem(rng.randint(2, 4), rng.randint(1, 2), rng.randint(3, 6), rng)
+        k = rng.randint(1, 20)
+        expected = exhaustive(problem, points, k)
+        assert top_schedules(problem, points, k, node_limit=None)[0] == expected
+        assert parallel_top_schedules(problem, points, k, node_limit=None, workers=1)[0] == expected
+    print("30 synthetic bundles: top-k (serial and partitioned) matches scoring every schedule (ties included)")
+
+    # any day / gap weights a request may send, from none to far heavier than the section points
+    for _ in range(60):
+        problem, points = synthetic_problem(rng.randint(2, 4), rng.randint(1, 2), rng.randint(3, 6), rng)
+        k = rng.randint(1, 20)
+        day_penalty, gap_penalty = rng.choice((0, 1, 150, 1000)), rng.choice((0, 1, 5, 50))
+        expected = exhaustive(problem, points, k, day_penalty, gap_penalty)
+        assert top_schedules(problem, points, k, day_penalty, gap_penalty, node_limit=None)[0] == expected
+        assert parallel_top_schedules(problem, points, k, day_penalty, gap_penalty, node_limit=None, workers=1)[0] == expected
+    print("60 synthetic bundles with random day / gap weights: top-k matches scoring every schedule")
+
+    # negative penalties would reward days / gaps, which the bound doesn't account for: refused
+    for weights in ({"day": -150}, {"gap": -5}):
+        for search in (lambda: SchedulePreferences(weights=weights), lambda: top_schedules(
+                problem, points, 5, weights.get("day", 0), weights.get("gap", 0), node_limit=None)):
+            try:
+                search()
+            except ValueError:
+                continue
+            raise AssertionError(f"{weights} accepted")
+    print("negative day / gap weights are rejected")
+
+    print(f"{'bundle':>14} {'combinations':>12} {'schedules':>9} | {'score all':>10} | {'top 10 (nodes, pruned)':>30}")
+    for courses, components, sections in ((4, 2, 6), (4, 2, 8), (5, 2, 7), (5, 2, 9)):
+        problem, points = synthetic_problem(courses, components, sections, rng)
+        total = sum(1 for _ in generate_schedules(problem, node_limit=None))
+        started = time.perf_counter()
+        everything = exhaustive(problem, points, 10)
+        all_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        ranked, stats = top_schedules(problem, points, 10, node_limit=None)
+        top_ms = (time.perf_counter() - started) * 1000
+        assert ranked == everything
+        print(f"{courses:>4}x{components}x{sections:<7} {problem.combinations():>12.2e} {total:>9} | {all_ms:>8.0f}ms |"
+              f" {top_ms:>8.0f}ms ({stats['nodes']} nodes, {stats['pruned']} pruned)")
+
+    # parallel: same output for any worker count, and how well the partitions would spread over 8 cores
+    # (the "free cores" figures are a projection: in-process partition timings packed onto n cores, not a
+    # measured pool run; they include the work inflation, partitions redoing what one serial search shares)
+    print(f"\nparallel search ({os.cpu_count()} cores here)")
+    search_partition = _search_partition
+    for courses, components, sections in ((5, 2, 9), (6, 2, 8)):
+        problem, points = synthetic_problem(courses, components, sections, rng)
+        started = time.perf_counter()
+        serial, _ = top_schedules(problem, points, 10, node_limit=None)
+        serial_s = time.perf_counter() - started
+
+        # in-process run with every partition timed (same floors a pool gets), then packed onto n cores longest first
+        partition_seconds = []
+
+        def _search_partition(*args):
+            started = time.perf_counter()
+            result = search_partition(*args)
+            partition_seconds.append(time.perf_counter() - started)
+            return result
+
+        ranked, stats = parallel_top_schedules(problem, points, 10, node_limit=None, workers=1)
+        _search_partition = search_partition
+        assert ranked == serial
+        partition_seconds.sort(reverse=True)
+        inflation = sum(partition_seconds) / serial_s
+        request = pickle.dumps((problem, points, 10, WEIGHTS["day"], WEIGHTS["gap"]), pickle.HIGHEST_PROTOCOL)
+        task = pickle.dumps((_search_shared, ("psm_0123456789abcdef", len(request), None, {0: 0, 1: 0}, 0)))
+        print(f"{courses}x{components}x{sections}: serial {serial_s:.2f}s ({problem.combinations():.1e} combinations) |"
+              f" {stats['partitions']} partitions ({stats['skipped']} skipped), {sum(partition_seconds):.2f}s of work"
+              f" ({inflation:.2f}x serial), largest {partition_seconds[0]:.3f}s |"
+              f" request {len(request) / 1024:.1f}KB shared once, ~{len(task)}B per task")
+
+        # cut off by the node limit the result isn't the true top 10, but it's still the same for every worker count
+        limited = parallel_top_schedules(problem, points, 10, node_limit=20_000, workers=1)[0]
+        for workers in (1, 2, 4, 8):
+            started = time.perf_counter()
+            ranked, stats = parallel_top_schedules(problem, points, 10, node_limit=None, workers=workers)
+            wall = time.perf_counter() - started
+            assert ranked == serial, workers
+            assert parallel_top_schedules(problem, points, 10, node_limit=20_000, workers=workers)[0] == limited
+
+            cores = [0.0] * workers
+            for seconds in partition_seconds:
+                cores[cores.index(min(cores))] += seconds
+            print(f"  {workers} workers: {wall:.2f}s measured | projected {max(cores):.2f}s with {workers} free cores"
+                  f" ({serial_s / max(cores):.1f}x serial at {inflation:.2f}x the work) | same top 10 as serial,"
+                  f" with or without a node limit")
@@ -0,0 +1,254 @@
+from itertools import islice
+from scripts.catalog import CourseCatalog, get_catalog
+from scripts.search import normalize_code
+
+"""
+Conflict-free schedule generation for a bundle of courses.
+
+A course needs one section of every component it's offered with (Lecture,
+Lab, Recitation/Discussion, ...; the catalog lists each as its own CRN), so
+every (course, component) pair is a slot with its sections as options. The
+search picks one option per slot by backtracking:
+    - each option carries its weekly occupancy bitmask (scripts/conflicts.py)
+    - after a pick, every open slot drops the options that collide with it
+      (one AND each) and the branch is abandoned as soon as a slot runs dry
+    - the open slot with the fewest options left is filled next
+
+so dead ends are cut at the first conflict instead of after building a whole
+cross product. Schedules come out of a generator one at a time, which lets a
+request stop after the first few (or stream them) and caps the total work
+with a node limit.
+"""
+
+# most schedules one request gets back, and the default
+MAX_SCHEDULES = 500
+DEFAULT_SCHEDULES = 50
+
+# options tried before a search gives up, so a bundle with no answer can't pin a worker
+NODE_LIMIT = 200_000
+
+
+class ScheduleProblem:
+    """
+    ### the slots for one bundle of courses, with everything the search needs as plain data
+    - slots: tuple of (course code, component, ((crn, occupancy mask), ...))
+    - missing: requested codes with no sections in the catalog
+
+    #### args:
+    - slots / missing: see above (build with ScheduleProblem.from_catalog)
+    """
+
+    def __init__(self, slots: tuple, missing: list[str] | None = None):
+        self.slots = slots
+        self.missing = missing or []
+
+    @classmethod
+    def from_catalog(cls, courses: list[str], catalog: CourseCatalog) -> "ScheduleProblem":
+        occupancy = catalog.derived("occupancy")
+        slots = []
+        missing = []
+        for code in dict.fromkeys(normalize_code(course) for course in courses):
+            sections = catalog.sections_for(code)
+            if not sections:
+                missing.append(code)
+                continue
+
+            components = {}
+            for section in sections:
+                components.setdefault(section.instruction_type, []).append(
+                    (section.crn, occupancy.masks[section.crn])
+                )
+            slots.extend((code, component, tuple(options)) for component, options in components.items())
+
+        return cls(tuple(slots), missing)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def combinations(self) -> int:
+        """
+        ### size of the unpruned cross product
+        """
+        total = 1
+        for _, _, options in self.slots:
+            total *= len(options)
+        return total
+
+    def describe(self, crns: tuple[int, ...]) -> list[dict]:
+        """
+        ### one schedule (crns in slot order) -> [{"course", "component", "crn"}]
+        """
+        return [
+            {"course": course, "component": component, "crn": crn}
+            for (course, component, _), crn in zip(self.slots, crns)
+        ]
+
+
+def generate_schedules(
+        problem: ScheduleProblem,
+        node_limit: int | None = NODE_LIMIT,
+        fixed: dict[int, int] | None = None,
+        stats: dict | None = None,
+    ):
+    """
+    ### lazily yields every conflict-free schedule as a tuple of crns in slot order
+
+    #### args:
+    - problem: the bundle's slots
+    - node_limit: stop after trying this many options (None = no limit)
+    - fixed: slot index -> the only crn that slot may use (how a search is partitioned)
+    - stats: dict whose "complete" is set to False when the node limit stops the search
+    """
+    slots = problem.slots
+    if not slots:
+        return
+
+    chosen = [0] * len(slots)
+    nodes = 0
+    fixed = fixed or {}
+
+    open_slots = []
+    for index, (_, _, options) in enumerate(slots):
+        if index in fixed:
+            options = tuple(option for option in options if option[0] == fixed[index])
+        if not options:
+            return
+        open_slots.append((index, options))
+
+    def extend(open_slots):
+        nonlocal nodes
+        if not open_slots:
+            yield tuple(chosen)
+            return
+
+        # fewest options left first; ties keep slot order so output is deterministic
+        position = min(range(len(open_slots)), key=lambda i: len(open_slots[i][1]))
+        index, options = open_slots[position]
+        rest = open_slots[:position] + open_slots[position + 1:]
+
+        for crn, mask in options:
+            nodes += 1
+            if node_limit is not None and nodes > node_limit:
+                if stats is not None:
+                    stats["complete"] = False
+                return
+
+            # forward check: drop what collides with this pick, give up when a slot is left empty
+            remaining = []
+            for other_index, other_options in rest:
+                compatible = [option for option in other_options if not option[1] & mask] if mask else other_options
+                if not compatible:
+                    break
+                remaining.append((other_index, compatible))
+            else:
+                chosen[index] = crn
+                yield from extend(remaining)
+
+    yield from extend(open_slots)
+
+
+def find_schedules(
+        courses: list[str],
+        limit: int = DEFAULT_SCHEDULES,
+        catalog: CourseCatalog | None = None,
+        term=None,
+    ) -> tuple[ScheduleProblem, object, dict]:
+    """
+    ### (problem, generator of up to limit schedules as [{"course", "component", "crn"}], stats)
+    nothing is searched until the generator is iterated; stats are final once it's exhausted:
+    "complete" (false when the node limit stopped the search, so schedules may be missing) and
+    "truncated" (true when the search found more than limit schedules)
+
+    #### args:
+    - courses: course codes ex. ["CS 171", "MATH121"]
+    - limit: most schedules to produce (capped at MAX_SCHEDULES)
+    - catalog: catalog snapshot to read from; defaults to the live one
+    - term: term id whose catalog to use when no snapshot is passed (None = current term)
+    """
+    catalog = catalog or get_catalog(term)
+    problem = ScheduleProblem.from_catalog(courses, catalog)
+    limit = min(limit, MAX_SCHEDULES)
+    stats = {"complete": True, "truncated": False}
+
+    def described():
+        # one schedule past the limit is searched for, only to tell whether there were more
+        for count, crns in enumerate(generate_schedules(problem, stats=stats)):
+            if count == limit:
+                stats["truncated"] = True
+                return
+            yield problem.describe(crns)
+
+    return problem, described(), stats
+
+
+# equivalence with a brute-force cross product + time to first / all schedules on big bundles
+if __name__ == "__main__":
+    import time
+    import random
+    from itertools import product
+    from scripts.catalog import DATA_FILE, load_catalog
+    from scripts.conflicts import occupancy_mask
+
+    def brute_force(problem):
+        found = []
+        for picks in product(*(options for _, _, options in problem.slots)):
+            if all(not a[1] & b[1] for i, a in enumerate(picks) for b in picks[i + 1:]):
+                found.append(tuple(crn for crn, _ in picks))
+        return found
+
+    catalog = load_catalog(DATA_FILE)
+    bundle = ["CS171", "CS172", "CS260", "CS265", "CS270"]
+    problem = ScheduleProblem.from_catalog(bundle, catalog)
+    found = list(generate_schedules(problem, node_limit=None))
+    assert sorted(found) == sorted(brute_force(problem))
+    print(f"{bundle}: {len(problem)} slots, {problem.combinations()} combinations -> {len(found)} conflict-free (matches brute force)")
+    print("first:", problem.describe(found[0]))
+
+    def synthetic_problem(courses, components, sections, rng):
+        # sections meet 1-3 days a week for 50-110 minutes between 8:00 and 20:00
+        slots = []
+        crn = 10000
+        for course in range(courses):
+            for component in range(components):
+                options = []
+                for _ in range(sections):
+                    days = sum(1 << day for day in rng.sample(range(5), rng.randint(1, 3)))
+                    start = rng.randrange(8 * 60, 18 * 60, 30)
+                    options.append((crn, occupancy_mask(days, start, start + rng.choice((50, 80, 110)))))
+                    crn += 1
+                slots.append((f"C{course}", f"part {component}", tuple(options)))
+        return ScheduleProblem(tuple(slots))
+
+    # truncated only when there were more than limit schedules; complete only when the node limit wasn't hit
+    for limit in (len(found) - 1, len(found), len(found) + 1):
+        _, listed, stats = find_schedules(bundle, limit=limit, catalog=catalog)
+        assert len(list(listed)) == min(limit, len(found)) and stats == {"complete": True, "truncated": limit < len(found)}, (limit, stats)
+    stats = {"complete": True}
+    assert len(list(generate_schedules(problem, node_limit=10, stats=stats))) < len(found) and not stats["complete"]
+    print(f"limit {len(found) - 1}/{len(found)}/{len(found) + 1}: truncated True/False/False; node limit 10: incomplete")
+
+    rng = random.Random(2)
+    small = synthetic_problem(3, 2, 5, rng)
+    assert sorted(generate_schedules(small, node_limit=None)) == sorted(brute_force(small))
+    print("synthetic 3x2x5 bundle matches brute force")
+
+    for courses, components, sections in ((4, 2, 12), (5, 2, 20), (5, 3, 24), (6, 3, 30)):
+        problem = synthetic_problem(courses, components, sections, rng)
+        started = time.perf_counter()
+        schedules = generate_schedules(problem, node_limit=None)
+        next(schedules, None)
+        first_ms = (time.perf_counter() - started) * 1000
+        hundred = 1 + sum(1 for _ in islice(schedules, 99))
+        hundred_ms = (time.perf_counter() - started) * 1000
+        print(f"{courses} courses x {components} components x {sections} sections ({problem.combinations():.2e} combinations)"
+              f" | first: {first_ms:.2f}ms | first {hundred}: {hundred_ms:.2f}ms")
+
+    problem = synthetic_problem(4, 2, 6, rng)
+    started = time.perf_counter()
+    total = sum(1 for _ in generate_schedules(problem, node_limit=None))
+    search_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    brute = len(brute_force(problem))
+    brute_ms = (time.perf_counter() - started) * 1000
+    assert total == brute
+    print(f"all {total} schedules of {problem.combinations():.2e} combinations | backtracking: {search_ms:.0f}ms | cross product: {brute_ms:.0f}ms")
@@ -0,0 +1,191 @@
+import re
+import heapq
+from collections import Counter
+from scripts.catalog import CourseCatalog, deep_bytes, register_derived
+
+"""
+Course search behind the scheduler search bar.
+
+Built once per catalog snapshot:
+    - a prefix trie over normalized course codes ("cs 17" -> CS171, CS172, CS175)
+    - a character trigram index over course titles for typo tolerant title search
+
+Memory stays bounded: each trie node keeps at most MAX_PER_NODE course ids and
+trigrams shared by more than MAX_POSTING courses are only used as a last resort,
+so a keystroke never has to walk a huge posting list.
+"""
+
+MAX_PER_NODE = 25
+MAX_POSTING = 2000
+MIN_TITLE_SCORE = 0.3
+
+_NON_ALNUM = re.compile(r"[^A-Z0-9]")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_code(text: str) -> str:
+    """
+    ### "cs 172" / "CS-172" -> "CS172"
+    """
+    return _NON_ALNUM.sub("", text.upper())
+
+
+def title_grams(text: str) -> set[str]:
+    """
+    ### character trigrams of a lowercased title, padded so word starts/ends count
+    """
+    text = " " + _NON_WORD.sub(" ", text.lower()).strip() + " "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrieNode:
+    __slots__ = ("children", "courses")
+
+    def __init__(self):
+        self.children = {}
+        self.courses = []
+
+
+class CourseSearchIndex:
+    """
+    ### prefix + fuzzy title search over every course code in a catalog
+    results are one entry per course code (not per section)
+    """
+
+    def __init__(self, catalog: CourseCatalog):
+        # course ids are positions in these lists; codes sorted so prefix results read in order
+        self.codes = sorted(catalog.codes())
+        self.titles = []
+        self.subjects = []
+        self.numbers = []
+        self.section_counts = []
+
+        self.root = TrieNode()
+        self.grams = {}
+        self.gram_counts = []
+
+        for course_id, code in enumerate(self.codes):
+            sections = catalog.sections_for(code)
+            first = sections[0]
+            self.titles.append(first.course_title)
+            self.subjects.append(first.subject_code)
+            self.numbers.append(first.course_number)
+            self.section_counts.append(len(sections))
+
+            # codes arrive sorted, so each node's first MAX_PER_NODE ids are its best prefix matches
+            node = self.root
+            for char in normalize_code(code):
+                node = node.children.setdefault(char, TrieNode())
+                if len(node.courses) < MAX_PER_NODE:
+                    node.courses.append(course_id)
+
+            grams = title_grams(first.course_title)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.grams.setdefault(gram, []).append(course_id)
+
+        # tuples are smaller than lists once the index is frozen
+        self.grams = {gram: tuple(posting) for gram, posting in self.grams.items()}
+
+    def nbytes(self) -> int:
+        """
+        ### rough resident size in bytes
+        """
+        return deep_bytes(self.codes, self.titles, self.subjects, self.numbers, self.section_counts, self.root, self.grams, self.gram_counts)
+
+    def prefix_matches(self, query: str) -> list[tuple[float, int]]:
+        """
+        ### (score, course id) for codes starting with the normalized query
+        an exact code scores 1.0; shorter prefixes score lower
+        """
+        prefix = normalize_code(query)
+        if not prefix:
+            return []
+
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        return [
+            (1.0 if len(self.codes[course_id]) == len(prefix) else 0.5 + 0.5 * len(prefix) / len(self.codes[course_id]), course_id)
+            for course_id in node.courses
+        ]
+
+    def title_matches(self, query: str) -> list[tuple[float, int]]:
+        """
+        ### (score, course id) for titles sharing enough trigrams with the query (dice coefficient)
+        a typo only breaks the few trigrams around it, so "programing" still finds "Programming"
+        """
+        query_grams = title_grams(query)
+        if not query_grams:
+            return []
+
+        # rare grams first; very common grams only when nothing rarer is in the query
+        postings = [self.grams[gram] for gram in query_grams if gram in self.grams]
+        selective = [posting for posting in postings if len(posting) <= MAX_POSTING]
+
+        shared = Counter()
+        for posting in selective or postings:
+            shared.update(posting)
+
+        matches = []
+        for course_id, count in shared.items():
+            score = 2 * count / (len(query_grams) + self.gram_counts[course_id])
+            if score >= MIN_TITLE_SCORE:
+                matches.append((score, course_id))
+        return matches
+
+    def search(self, query: str, k: int = 10) -> list[dict]:
+        """
+        ### top-k courses for a search bar query, best first
+        code prefix matches and fuzzy title matches are merged by best score per course
+        """
+        best = {}
+        for score, course_id in self.prefix_matches(query) + self.title_matches(query):
+            if score > best.get(course_id, 0):
+                best[course_id] = score
+
+        top = heapq.nsmallest(k, best.items(), key=lambda item: (-item[1], self.codes[item[0]]))
+        return [
+            {
+                "course": self.codes[course_id],
+                "subject_code": self.subjects[course_id],
+                "course_number": self.numbers[course_id],
+                "course_title": self.titles[course_id],
+                "sections": self.section_counts[course_id],
+                "score": round(score, 4),
+            }
+            for course_id, score in top
+        ]
+
+
+@register_derived("search_index")
+def build_search_index(catalog: CourseCatalog) -> CourseSearchIndex:
+    return CourseSearchIndex(catalog)
+
+
+# example queries + per-keystroke latency on a synthetic 50k-section catalog
+if __name__ == "__main__":
+    import time
+    from scripts.catalog import DATA_FILE, load_catalog
+    from scripts.filters import synthetic_catalog
+
+    catalog = load_catalog(DATA_FILE)
+    index = catalog.derived("search_index")
+    for query in ["cs 17", "CS172", "info1", "computer programing", "data strucures", "databse"]:
+        print(query, "->", [(result["course"], result["course_title"], result["score"]) for result in index.search(query, k=5)])
+
+    big = synthetic_catalog(catalog, 50_000)
+    started = time.perf_counter()
+    big_index = CourseSearchIndex(big)
+    print(f"\n{len(big_index.codes)} courses indexed in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    keystrokes = ["c", "cs", "cs ", "cs 1", "cs 17", "cs 172", "p", "pr", "pro", "prog", "progr", "programing"]
+    runs = 50
+    started = time.perf_counter()
+    for _ in range(runs):
+        for query in keystrokes:
+            big_index.search(query, k=10)
+    print(f"avg per keystroke: {(time.perf_counter() - started) / (runs * len(keystrokes)) * 1000:.3f}ms")
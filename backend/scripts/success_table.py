@@ -0,0 +1,204 @@
+import os
+import numpy as np
+
+"""
+Precomputed success probabilities: every CRN x every gpa interval the model tells apart.
+
+The model's only student input is gpa; every other feature is fixed per CRN.
+Its trees only ever ask "is gpa above t", so the model is constant between
+consecutive gpa split thresholds (the edges): column j of the table holds its
+answer for GPAs in (edges[j - 1], edges[j]], with the first and last columns
+open ended. `flask model table` evaluates the model once per column for every
+CRN and stores the result as a compact matrix, one row per CRN:
+
+    float32: 4 bytes a cell, the model's own probability to ~1e-7 (the default)
+    float16: 2 bytes a cell, error <= 0.00025
+    uint8:   1 byte a cell, probability * 255 rounded (error <= 1/510)
+
+A prediction is then a dict lookup for the row and a binary search of the
+edges for the column. GPAs are compared as float32, the way the trees compare
+them, so the lookup lands in the same interval the model would for any gpa:
+on a threshold, between two, or outside [0, 4].
+
+This module only needs numpy; building the table from the model lives in
+scripts/model.py.
+"""
+
+# storage dtype -> the factor probabilities are multiplied by before storing
+DTYPES = {"float32": 1.0, "float16": 1.0, "uint8": 255.0}
+
+
+def column_gpas(edges) -> np.ndarray:
+    """
+    ### one gpa inside each column's interval, to evaluate the model at
+    the largest float32 at or below every edge, then the smallest one above the last edge
+    (float32 values, so the model sees exactly these GPAs)
+    """
+    edges = np.asarray(edges, dtype=np.float64)
+    below = edges.astype(np.float32)
+    below = np.where(below > edges, np.nextafter(below, np.float32(-np.inf)), below)
+
+    above = np.float32(edges[-1]) if len(edges) else np.float32(0)
+    if len(edges) and above <= edges[-1]:
+        above = np.nextafter(above, np.float32(np.inf))
+
+    gpas = np.append(below, above).astype(np.float64)
+    if (np.searchsorted(edges, gpas, side="left") != np.arange(len(gpas))).any():
+        raise ValueError("edges must be increasing with a float32 gpa between every two")
+    return gpas
+
+
+class SuccessTable:
+    """
+    ### success probability for every CRN in every gpa interval between the model's thresholds
+    - crns: CRNs (str) in row order
+    - table: (len(crns), len(edges) + 1) matrix of probabilities * scale in dtype
+    - edges: the model's gpa split thresholds, increasing (column_gpas shows where each column is)
+    - trained_at: the model artifact's trained_at, so a table outliving its model is noticed
+
+    #### args:
+    - see above (build with SuccessTable.from_columns)
+    """
+
+    def __init__(self, crns: list[str], table: np.ndarray, edges, trained_at: str | None = None):
+        self.crns = list(crns)
+        self.table = table
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.trained_at = trained_at
+        self.scale = DTYPES[table.dtype.name]
+        self.rows = {crn: row for row, crn in enumerate(self.crns)}
+        if table.shape[1] != len(self.edges) + 1:
+            raise ValueError(f"a table with {len(self.edges)} edges needs {len(self.edges) + 1} columns, not {table.shape[1]}")
+
+    @classmethod
+    def from_columns(cls, crns: list[str], probabilities: np.ndarray, edges,
+                     dtype: str = "float32", trained_at: str | None = None) -> "SuccessTable":
+        """
+        ### stores a float64 (crns x columns) probability matrix, evaluated at column_gpas(edges), as dtype
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {tuple(DTYPES)}, not {dtype!r}")
+        if dtype == "uint8":
+            table = np.rint(probabilities * DTYPES[dtype]).astype(np.uint8)
+        else:
+            table = probabilities.astype(dtype)
+        return cls(crns, table, edges, trained_at)
+
+    def __len__(self):
+        return len(self.crns)
+
+    def __contains__(self, crn) -> bool:
+        return str(crn) in self.rows
+
+    def column(self, gpa: float) -> int:
+        """
+        ### the column gpa falls in: how many edges it's above, compared as float32 like the trees do
+        """
+        return int(np.searchsorted(self.edges, np.float32(gpa), side="left"))
+
+    def lookup(self, gpa: float, crns) -> list:
+        """
+        ### success probability for each CRN at gpa, lined up with crns (None for unknown CRNs)
+
+        #### args:
+        - gpa: the student's gpa
+        - crns: CRNs (int or str)
+        """
+        keys = [str(crn) for crn in crns]
+        rows = np.array([self.rows.get(key, -1) for key in keys], dtype=np.int64)
+        known = rows >= 0
+
+        values = self.table[rows[known], self.column(gpa)].astype(np.float64)
+        values /= self.scale
+
+        probabilities = [None] * len(keys)
+        found = iter(values.tolist())
+        for i in np.flatnonzero(known).tolist():
+            probabilities[i] = next(found)
+        return probabilities
+
+    def memory_report(self) -> dict:
+        """
+        ### {"crns", "columns", "dtype", "table_bytes", "float64_bytes", "index_bytes"}
+        index_bytes is a rough size of the crn -> row dict
+        """
+        return {
+            "crns": len(self.crns),
+            "columns": self.table.shape[1],
+            "dtype": self.table.dtype.name,
+            "table_bytes": self.table.nbytes,
+            "float64_bytes": self.table.size * 8,
+            # dict slot + the crn string per row
+            "index_bytes": sum(len(crn) + 49 + 2 * 8 for crn in self.crns),
+        }
+
+    def save(self, path: str) -> str:
+        """
+        ### writes the table as an .npz (temp file + rename, so a worker never reads half of one)
+        """
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            crns=np.array(self.crns),
+            table=self.table,
+            edges=self.edges,
+            trained_at=np.array(self.trained_at or ""),
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "SuccessTable":
+        """
+        ### reads a table written by save
+        raises ValueError for a table from before tables were keyed on the model's thresholds
+        """
+        with np.load(path) as data:
+            if "edges" not in data:
+                raise ValueError(f"{path} is an old fixed-grid success table; rebuild it with `flask model table`")
+            return cls(
+                data["crns"].tolist(),
+                data["table"],
+                data["edges"],
+                str(data["trained_at"]) or None,
+            )
+
+
+# table vs. the model at random GPAs and on / next to every threshold, per dtype, + lookup latency
+if __name__ == "__main__":
+    import time
+    from scripts import model
+
+    artifact = model.get_artifact(train_missing=True)
+    compiled = model.export_compiled_model(artifact)
+    crns = list(artifact["courses"]['crn'])
+
+    for dtype in DTYPES:
+        table = model.build_success_table(artifact, dtype)
+        report = model.check_success_table(table, artifact)
+        bound = {"float32": 1e-6, "float16": 0.00025, "uint8": 1 / 510}[dtype]
+        assert report["max_error"] <= bound, (dtype, report)
+        memory = table.memory_report()
+        print(f"{dtype:>7}: {memory['crns']} CRNs x {memory['columns']} columns, {memory['table_bytes'] / 1024:.1f}KB |"
+              f" max error {report['max_error']:.2e} over {report['samples']} lookups"
+              f" | probability_score changed in {report['percent_changed'] * 100:.2f}%")
+
+    # float32 lookups against the compiled model the app would otherwise run, at every column's edges
+    table = model.build_success_table(artifact)
+    edges = table.edges
+    gpas = np.concatenate([edges, np.nextafter(edges.astype(np.float32), np.float32(np.inf)), [-1.0, 0.0, 4.0, 5.0]])
+    difference = max(np.abs(np.array(table.lookup(gpa, crns)) - np.array(compiled.predict(gpa, crns))).max() for gpa in gpas)
+    assert difference < 1e-6, difference
+    print(f"{len(gpas)} GPAs on and just past every threshold: max |table - compiled model| = {difference:.2e}")
+
+    def per_call(function, runs):
+        function()
+        started = time.perf_counter()
+        for _ in range(runs):
+            function()
+        return (time.perf_counter() - started) / runs * 1e6
+
+    for size in (1, 50, len(crns)):
+        batch = crns[:size]
+        print(f"{size:>4} CRNs: table {per_call(lambda: table.lookup(3.1, batch), 1000):5.0f}us"
+              f" | compiled model {per_call(lambda: compiled.predict(3.1, batch), 1000):5.0f}us")
@@ -0,0 +1,178 @@
+from scripts.catalog import CourseCatalog, get_catalog, deep_bytes, register_derived
+from scripts.eligibility import EligibilityIndex
+from scripts.prereq_graph import bitset_indices
+from scripts.search import normalize_code
+
+"""
+"What does taking this course unlock": the prereq graph read backwards.
+
+Built once per catalog snapshot from the prereq graph, so a request is a dict
+lookup instead of parsing every course's prereqs:
+    - direct: courses whose prereqs string mentions the course
+    - transitive: courses with the course anywhere in their prereq tree
+
+Given what a student already completed, newly eligible courses are the ones
+that taking the course would open up right now. Only courses needing one that
+starts to count can change: the course itself, plus any completed course that
+was waiting on it. So just their direct unlocks' clauses are checked (with and
+without it).
+"""
+
+DIRECT = "direct"
+TRANSITIVE = "transitive"
+MODES = (DIRECT, TRANSITIVE)
+
+
+class UnlocksIndex:
+    """
+    ### precomputed reverse prerequisites for every course code in a catalog
+    - direct / transitive: course code -> tuple of course codes it unlocks (sorted)
+
+    #### args:
+    - eligibility: the catalog's EligibilityIndex (its graph is the one read backwards)
+    """
+
+    def __init__(self, eligibility: EligibilityIndex):
+        self.eligibility = eligibility
+        graph = eligibility.graph
+        codes = graph.codes
+
+        self.direct = {
+            code: tuple(codes[course_id] for course_id in sorted(graph.unlocks[course_id]))
+            for course_id, code in enumerate(codes)
+        }
+        self.transitive = {
+            code: tuple(codes[course_id] for course_id in bitset_indices(graph.descendants[course_id]))
+            for course_id, code in enumerate(codes)
+        }
+
+    def nbytes(self) -> int:
+        """
+        ### rough resident size in bytes
+        """
+        return deep_bytes(self.direct, self.transitive)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.direct
+
+    def unlocks(self, code: str, mode: str = DIRECT) -> tuple[str, ...]:
+        """
+        ### courses code unlocks; raises LookupError for a code the catalog never mentions
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, not {mode!r}")
+        table = self.direct if mode == DIRECT else self.transitive
+        if code not in table:
+            raise LookupError(f"{code} is not in the prerequisite graph.")
+        return table[code]
+
+    def newly_eligible(self, code: str, completed_codes) -> tuple[list[str], list[str]]:
+        """
+        ### (offered courses taking code would make eligible, completed codes not in the catalog)
+        courses already eligible or already completed aren't "newly" eligible
+        """
+        index = self.eligibility
+        graph = index.graph
+        course_id = graph._id(code)
+
+        completed, unknown = index.mask(completed_codes)
+        completed_ids = index.ids_of(completed).tolist()
+        before = index.standing_ids(completed_ids)
+        after = index.standing_ids(completed_ids + [course_id])
+
+        # only courses needing one that just started to count can change
+        done = set(completed_ids)
+        candidates = sorted({
+            unlocked_id for joined in after - before for unlocked_id in graph.unlocks[joined]
+            if index.offered[unlocked_id] and unlocked_id != course_id and unlocked_id not in done
+        })
+        newly = [
+            graph.codes[unlocked_id] for unlocked_id in candidates
+            if index.meets(unlocked_id, after) and not index.meets(unlocked_id, before)
+        ]
+        return newly, unknown
+
+
+@register_derived("unlocks")
+def build_unlocks_index(catalog: CourseCatalog) -> UnlocksIndex:
+    return UnlocksIndex(catalog.derived("eligibility"))
+
+
+def course_unlocks(
+        course: str,
+        mode: str = DIRECT,
+        completed_courses: list[str] | None = None,
+        catalog: CourseCatalog | None = None,
+        term=None,
+    ) -> dict:
+    """
+    ### what taking a course unlocks
+    returns {"course", "mode", "unlocks": [course codes]} plus, when completed_courses
+    is given, "newly_eligible" and "unknown" (completed codes not in the catalog)
+
+    #### args:
+    - course: course code ex. "CS 171"
+    - mode: "direct" (its prereqs mention the course) or "transitive" (anywhere downstream)
+    - completed_courses: course codes the student has passed
+    - catalog: catalog snapshot to read from; defaults to the live one
+    - term: term id whose catalog to use when no snapshot is passed (None = current term)
+    """
+    catalog = catalog or get_catalog(term)
+    index = catalog.derived("unlocks")
+
+    code = normalize_code(course)
+    result = {"course": code, "mode": mode, "unlocks": list(index.unlocks(code, mode))}
+
+    if completed_courses is not None:
+        codes = [normalize_code(completed) for completed in completed_courses]
+        result["newly_eligible"], result["unknown"] = index.newly_eligible(code, codes)
+
+    return result
+
+
+# reverse index vs. a scan over every course's prereqs + newly-eligible vs. two full eligibility passes
+if __name__ == "__main__":
+    import time
+    import random
+    from scripts.catalog import DATA_FILE, load_catalog
+    from scripts.prereq_store import ast_courses
+
+    catalog = load_catalog(DATA_FILE)
+    index = catalog.derived("unlocks")
+    eligibility = index.eligibility
+    graph = eligibility.graph
+    store = catalog.derived("prereqs")
+    print("CS171 unlocks:", course_unlocks("cs 171", catalog=catalog)["unlocks"])
+    print("after CS171, taking CS172 opens:", course_unlocks("CS172", completed_courses=["CS171"], catalog=catalog))
+
+    for code in graph.codes:
+        mentions = sorted(other for other, ast in store.asts.items() if code in set(ast_courses(ast)))
+        assert list(index.direct[code]) == mentions, code
+        assert list(index.transitive[code]) == sorted(graph.downstream(code)), code
+    print(f"{len(graph)} courses: direct/transitive unlocks match a scan over every course's pre-reqs")
+
+    rng = random.Random(5)
+    for _ in range(2000):
+        completed = set(rng.sample(graph.codes, rng.randint(0, 30)))
+        code = rng.choice(graph.codes)
+        row = eligibility.mask(completed)[0]
+        before = eligibility.evaluate(row) & eligibility.offered
+        after = eligibility.evaluate(eligibility.mask(completed | {code})[0]) & eligibility.offered
+        expected = [
+            other for course_id, other in enumerate(graph.codes)
+            if after[course_id] and not before[course_id] and other not in completed and other != code
+        ]
+        assert index.newly_eligible(code, completed)[0] == expected, (code, completed)
+    print("2000 random completed sets: newly eligible matches two full eligibility passes")
+
+    runs = 2000
+    started = time.perf_counter()
+    for _ in range(runs):
+        course_unlocks("CS171", mode=TRANSITIVE, completed_courses=["CS171", "MATH121"], catalog=catalog)
+    print(f"course_unlocks with newly eligible: {(time.perf_counter() - started) / runs * 1e6:.1f}us per request")
+
+    started = time.perf_counter()
+    for _ in range(20):
+        for code in catalog.codes():
+            [other for other, ast in store.asts.items() if code in set(ast_courses(ast))]
+    print(f"scanning every course's pre-reqs instead: {(time.perf_counter() - started) / 20 / len(catalog.codes()) * 1e6:.1f}us per request")